@@ -0,0 +1,264 @@
+###########################################################
+# Module to render phase portraits from the command line, #
+# without any graphical interface, as described by a job  #
+# file                                                    #
+#                                                         #
+# Author: Olivier Bouillot                                #
+# Email: olivier.bouillot@u-pem.fr                        #
+# Creation Date: october 2026                             #
+#                                                         #
+# Modifications:                                          #
+# --------------                                          #
+#                                                         #
+#                                                         #
+# Next modifications to do:                               #
+# -------------------------                               #
+#                                                         #
+#   * Share the memo between the worker processes         #
+#                                                         #
+###########################################################
+
+
+import os
+import sys
+import json
+import logging
+import argparse
+from fractions import Fraction
+from multiprocessing import Pool
+from time import time
+from RiemannSphere import RiemannSphere
+from PhasePortrait import PhasePortrait
+from CacheTool import load_function
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+
+""" Module which renders the phase portraits described by a job file, without
+any graphical interface: the ipywidgets package is never imported. It is run
+by the command line:
+    python -m PhasePortrait render jobs [--processes n] [--summary path]
+    python BatchRender.py render jobs [--processes n] [--summary path]
+where jobs is the path of a .toml file (or of a .json file with the same
+structure), whose [[job]] tables describe the phase portraits:
+
+    [defaults]
+    cache = "sqlite:values.sqlite"
+
+    [[job]]
+    name = "zeta"
+    function = "SpecialFunctions:zeta"
+    left_below = [-20, -20]
+    right_upper = [20, 20]
+    resolution = 10
+    output = "zeta.png"
+
+* function is the function name of the module module, given by
+  "module:name", where the module is searched in the current directory too.
+* left_below and right_upper are the corners of the window, whose components
+  are numbers or Strings of fractions such as "1/3".
+* cache is the path of a SQLite database, or the URL of a cache (see
+  the CacheBackends module), where the values are recovered and saved.
+* output is the path of the .png file of the phase portrait.
+* the optional keys of JOB_OPTIONS are given to the PhasePortrait class. With
+  memo = true, the values are kept in the memo SHARED_MEMO (see the ValueMemo
+  module), shared by the jobs of the same function rendered in the same
+  process.
+The keys of the [defaults] table are used by the jobs which do not give them.
+
+The jobs are rendered one after the other, or by n worker processes which
+share the caches. The command prints, and writes in the summary file if one
+is given, a JSON list of the summaries of the jobs (see the render_job
+function), and fails if a job has failed.
+"""
+
+
+# Optional keys of a job given to the PhasePortrait class
+JOB_OPTIONS = ("precision", "backend", "certified", "compiled", "vectorized",
+               "layout", "memo", "grid", "checkpoint", "version",
+               "buffer_size")
+
+
+def silent_logger():
+    """ Create a logger which records nothing, so that only the summaries
+    are printed
+
+    :return value: logging.Logger
+    """
+    logger = logging.getLogger("BatchRender")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    return logger
+
+
+def load_jobs(path):
+    """ Read the jobs of a job file
+
+    :param path: String, the path of a .toml or .json file
+    :return value: list of dictionnaries, the jobs completed by the defaults
+
+    :raised error: ValueError when a job has no function, corners, resolution
+                   or output
+    """
+    if path.endswith(".json"):
+        with open(path) as file:
+            content = json.load(file)
+    else:
+        if tomllib is None:
+            raise ValueError("The job files .toml need Python 3.11, " +
+                             "use a .json job file")
+        with open(path, "rb") as file:
+            content = tomllib.load(file)
+    defaults = content.get('defaults', {})
+    jobs = []
+    for (k, job) in enumerate(content.get('job', [])):
+        job = dict(defaults, **job)
+        job.setdefault('name', "job " + str(k))
+        for key in ('function', 'left_below', 'right_upper', 'resolution',
+                    'output'):
+            if key not in job:
+                raise ValueError("The job " + job['name'] + " has no " + key)
+        jobs.append(job)
+    return jobs
+
+
+def corner(components):
+    """ Convert the components of a corner of a window
+
+    :param components: pair of numbers or of Strings of fractions
+    :return value: RiemannSphere complex number
+
+    >>> corner([-1, "1/3"]), corner([0.5, 2])
+    (-1 + 1/3 i, 0.5 + 2 i)
+    """
+    return RiemannSphere(*[Fraction(t) if isinstance(t, str) else t
+                           for t in components])
+
+
+def render_job(job):
+    """ Render the phase portrait of a job, and save it
+
+    :param job: dictionnary
+    :return value: dictionnary, the summary of the job, with the keys 'name',
+                   'output', 'size', 'compute_duration', 'draw_duration',
+                   'save_duration', 'duration' (in seconds), 'statistics'
+                   (see the as_dict method of the CacheStatistics class),
+                   'memo' (see the stats method of the ValueMemo class, or
+                   None) and 'error' (the representation of the raised
+                   exception, or None)
+    """
+    summary = {'name': job['name'], 'output': job['output'], 'size': None,
+               'compute_duration': None, 'draw_duration': None,
+               'save_duration': None, 'duration': None, 'statistics': None,
+               'memo': None, 'error': None}
+    options = {key: job[key] for key in JOB_OPTIONS if key in job}
+    t_0 = time()
+    try:
+        portrait = PhasePortrait(load_function(job['function']),
+                                 corner(job['left_below']),
+                                 corner(job['right_upper']),
+                                 job['resolution'],
+                                 database=job.get('cache', ""),
+                                 data_logger=silent_logger(), **options)
+        t_1 = time()
+        directory = os.path.dirname(job['output'])
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if portrait.grid is not None:
+            t_2 = t_1
+            portrait.save_by_strips("", job['output'])
+        else:
+            portrait.draw()
+            t_2 = time()
+            portrait.save("", job['output'])
+        t_3 = time()
+        summary.update({'size': list(portrait.size),
+                        'compute_duration': t_1 - t_0,
+                        'draw_duration': t_2 - t_1,
+                        'save_duration': t_3 - t_2,
+                        'statistics': portrait.statistics.as_dict()})
+        if portrait.memo is not None:
+            summary['memo'] = portrait.memo.stats()
+    except Exception as error:
+        summary['error'] = repr(error)
+    summary['duration'] = time() - t_0
+    return summary
+
+
+def render_jobs(jobs, nb_of_processes=1):
+    """ Render the phase portraits of jobs
+
+    :param jobs: list of dictionnaries
+    :param nb_of_processes: int, the number of worker processes, or 1 to
+                            render the jobs in the current process, where
+                            they can share the memo SHARED_MEMO (see
+                            the ValueMemo module)
+    :return value: list of the summaries of the jobs
+
+    >>> import tempfile
+    >>> directory = tempfile.mkdtemp()
+    >>> jobs = [{'name': "window " + str(k),
+    ...          'function': "CacheStressTest:stress_function",
+    ...          'left_below': [k, 0], 'right_upper': [k + 1, 1],
+    ...          'resolution': 16,
+    ...          'cache': os.path.join(directory, "values.sqlite"),
+    ...          'output': os.path.join(directory, str(k) + ".png")}
+    ...         for k in range(2)]
+    >>> for summary in render_jobs(jobs):
+    ...     print(summary['name'], summary['size'], summary['error'],
+    ...           summary['statistics']['misses'])
+    window 0 [17, 17] None 289
+    window 1 [17, 17] None 272
+    >>> for summary in render_jobs(jobs, 2):
+    ...     print(summary['name'], summary['statistics']['misses'])
+    window 0 0
+    window 1 0
+    >>> render_jobs([dict(jobs[0], function="CacheStressTest:unknown")]
+    ...             )[0]['error'].startswith("AttributeError")
+    True
+    """
+    if nb_of_processes <= 1:
+        return [render_job(job) for job in jobs]
+    with Pool(nb_of_processes) as pool:
+        return pool.map(render_job, jobs)
+
+
+def main(arguments):
+    """ Run a command line
+
+    :param arguments: list of Strings
+    :return value: list of the summaries of the jobs
+    """
+    parser = argparse.ArgumentParser(prog="PhasePortrait")
+    commands = parser.add_subparsers(dest="command", required=True)
+    command = commands.add_parser("render")
+    command.add_argument("jobs")
+    command.add_argument("--processes", type=int, default=1)
+    command.add_argument("--summary")
+    options = parser.parse_args(arguments)
+    summaries = render_jobs(load_jobs(options.jobs), options.processes)
+    if options.summary is not None:
+        with open(options.summary, "w") as file:
+            json.dump(summaries, file, indent=2)
+    return summaries
+
+
+def run(arguments):
+    """ Run a command line, print the summaries of the jobs, and exit with
+    the status 1 if a job has failed
+
+    :param arguments: list of Strings
+    """
+    summaries = main(arguments)
+    print(json.dumps(summaries, indent=2))
+    sys.exit(int(any(summary['error'] is not None for summary in summaries)))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        run(sys.argv[1:])
+    else:
+        from doctest import testmod
+        testmod()
@@ -0,0 +1,1043 @@
+###########################################################
+# Module to define the caches where the tiles of values   #
+# of a function are saved: in memory, in a SQLite         #
+# database, or in a directory of NumPy files              #
+#                                                         #
+# Author: Olivier Bouillot                                #
+# Email: olivier.bouillot@u-pem.fr                        #
+# Creation Date: october 2026                             #
+#                                                         #
+# Modifications:                                          #
+# --------------                                          #
+#                                                         #
+# 10/2026    The caches can be shared by several          #
+#            processes                                    #
+# 10/2026    Read-only caches, and the LayeredCache class #
+#            of a writable cache over a read-only one     #
+# 10/2026    Size budget of the caches, eviction of       #
+#            the least recently used or least valuable    #
+#            tiles, and compaction                        #
+# 10/2026    Count the bytes read and written, and        #
+#            the duration of the decoding of the tiles    #
+#                                                         #
+# Next modifications to do:                               #
+# -------------------------                               #
+#                                                         #
+#                                                         #
+###########################################################
+
+
+import os
+import json
+import hashlib
+from urllib.parse import parse_qsl
+from collections import OrderedDict
+from contextlib import contextmanager
+from time import time
+import numpy as np
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+from Database import connect, create_tables, find_function_id, begin_write
+from Database import has_tables, compact_database, TILE_SCHEMA_VERSION
+from Database import register_function, register_provenance
+from TileStore import TILE_SIZE, TILE_DTYPE, SELECT_TILE, INSERT_TILE
+from TileStore import TOUCH_TILE
+from TileStore import encode_tile, decode_tile, read_tiles
+
+
+""" Module which defines the caches of tiles of values (see the TileStore
+module), behind the common interface of the TileCache class:
+* get_tile, which reads a tile, and get_tiles, which reads the tiles of
+  a window.
+* put_tile, which saves a tile, and flush, which makes the saved tiles
+  durable.
+* contains, which checks if a tile is saved.
+* stats, which describes the activity of the cache: the numbers of tiles
+  found, not found and saved, the bytes read and written, and the duration
+  of the decoding of the tiles read.
+* evict, which removes tiles until the size of the cache is within a budget,
+  and compact, which removes the unused data of the cache.
+* transaction, a context manager which makes the reads and the writes of
+  tiles it contains atomic, with respect to the other processes sharing
+  the cache: the TileWriter class merges tiles in transactions.
+A read-only cache, whose read_only attribute is True, raises a ValueError
+when a tile is saved.
+
+A cache can be given a budget, in bytes, which is enforced when it is
+closed, by evicting tiles with one of the EVICTION_POLICIES:
+* "lru", the least recently used tiles are evicted first.
+* "cost", the least valuable tiles are evicted first, i.e. the tiles whose
+  estimated cost of computation (see the TileWriter class of the TileStore
+  module) per byte is the lowest.
+
+A tile is identified by the identity of the function (see the FunctionIdentity
+module), the resolution, and its coordinates. It is saved with the precision
+and the algorithm of its values, and a tile is only read for a precision at
+most its own.
+
+The caches are:
+* MemoryCache, a least recently used cache in memory.
+* SQLiteCache, the ValueTile table of a SQLite database.
+* NpyDirectoryCache, a directory of .npy files, which are memory-mapped
+  when they are read.
+* LayeredCache, a writable cache, for instance of a user, over a read-only
+  cache, for instance shared by a team on a network filesystem: the tiles
+  are read in both caches, and saved in the writable one.
+
+The SQLite and directory caches can be shared by several processes: their
+readers never wait, and their transactions wait for each other, thanks to
+the write lock of the database (see the Database module) or to the FileLock
+of the directory.
+
+The open_cache function opens a cache described by an URL:
+* "memory:" or "memory:name", the memory cache of this name, shared by
+  the whole process.
+* "sqlite:path", the SQLite database of this path.
+* "npy:path", the directory of this path.
+The options "?mode=ro" (read-only), "?immutable=1" (read-only, and
+the SQLite database is read without any lock since it is assumed not to
+be modified), "?max_bytes=n" (the budget) and "?policy=lru" or
+"?policy=cost" (the eviction policy) can follow the path, and "~" is expanded in the paths. The URL
+"base|overlay" describes the LayeredCache of the cache overlay over
+the cache base, for instance
+    "sqlite:/shared/zeta.sqlite?immutable=1|sqlite:~/zeta.sqlite".
+"""
+
+
+# Number of tiles kept by a memory cache
+MEMORY_TILES = 1024
+
+# Schemes of the URLs of the caches
+CACHE_SCHEMES = ("memory", "sqlite", "npy")
+
+# Memory caches of the process, by name
+MEMORY_CACHES = {}
+
+# Policies of eviction of the tiles of a cache whose size exceeds its budget
+EVICTION_POLICIES = ("lru", "cost")
+
+
+class TileCache(object):
+    """ Interface of the caches of tiles of values
+
+    :attribute nb_of_hits: int, the number of tiles found by get_tile
+    :attribute nb_of_misses: int, the number of tiles not found by get_tile
+    :attribute nb_of_puts: int, the number of tiles saved by put_tile
+    :attribute nb_of_evictions: int, the number of evicted tiles
+    :attribute bytes_read: int, the size of the tiles read
+    :attribute bytes_written: int, the size of the tiles saved
+    :attribute decode_duration: float, the duration in seconds of
+                                the decoding of the tiles read
+    :attribute read_only: boolean, which indicates if no tile can be saved
+    :attribute max_bytes: int, the budget of the cache in bytes, or None
+    :attribute policy: String, the eviction policy, in EVICTION_POLICIES
+    """
+
+    def __init__(self, read_only=False, max_bytes=None, policy="lru"):
+        if policy not in EVICTION_POLICIES:
+            raise ValueError("Unknown eviction policy " + str(policy) +
+                             ": the known policies are " +
+                             ", ".join(EVICTION_POLICIES))
+        self.nb_of_hits = 0
+        self.nb_of_misses = 0
+        self.nb_of_puts = 0
+        self.nb_of_evictions = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.decode_duration = 0.0
+        self.read_only = read_only
+        self.max_bytes = max_bytes
+        self.policy = policy
+
+    def get_tile(self, identity, resolution, tile_x, tile_y, precision=0):
+        """ Read a tile
+
+        :param identity: String, the identity of the function
+        :param resolution: int
+        :param tile_x: int
+        :param tile_y: int
+        :param precision: int, the minimal precision in bits of the values
+        :return value: pair (values, presence) of TILE_SIZE x TILE_SIZE arrays,
+                       or None if the tile is not saved with at least
+                       the precision
+        """
+        raise NotImplementedError
+
+    def get_tiles(self, identity, resolution, x_range, y_range, precision=0):
+        """ Read the tiles intersecting the window of the lattice
+        [X_min, X_max] x [Y_min, Y_max]
+
+        :param identity: String, the identity of the function
+        :param resolution: int
+        :param x_range: pair of int (X_min, X_max)
+        :param y_range: pair of int (Y_min, Y_max)
+        :param precision: int, the minimal precision in bits of the values
+        :return value: generator of quadruplets (tile_x, tile_y, values,
+                       presence)
+        """
+        for tile_x in range(x_range[0] // TILE_SIZE,
+                            x_range[1] // TILE_SIZE + 1):
+            for tile_y in range(y_range[0] // TILE_SIZE,
+                                y_range[1] // TILE_SIZE + 1):
+                tile = self.get_tile(identity, resolution, tile_x, tile_y,
+                                     precision)
+                if tile is not None:
+                    yield (tile_x, tile_y) + tile
+
+    def put_tile(self, identity, resolution, tile_x, tile_y, values, presence,
+                 precision, algorithm, cost=None):
+        """ Save a tile, which replaces the saved one
+
+        :param identity: String, the identity of the function
+        :param resolution: int
+        :param tile_x: int
+        :param tile_y: int
+        :param values: TILE_SIZE x TILE_SIZE array of complex numbers
+        :param presence: TILE_SIZE x TILE_SIZE array of booleans
+        :param precision: int, the precision in bits of the values
+        :param algorithm: String, the algorithm used to compute the values
+        :param cost: float, the estimated duration in seconds of
+                     the computation of the values, or None
+        """
+        raise NotImplementedError
+
+    def contains(self, identity, resolution, tile_x, tile_y, precision=0):
+        """ Check if a tile is saved with at least a precision
+
+        :return value: boolean
+        """
+        raise NotImplementedError
+
+    def flush(self):
+        """ Make the saved tiles durable """
+        pass
+
+    @contextmanager
+    def transaction(self):
+        """ Context manager which makes the reads and the writes of tiles it
+        contains atomic, with respect to the other processes sharing
+        the cache. The saved tiles are durable at its exit
+        """
+        yield self
+        self.flush()
+
+    def close(self):
+        """ Make the saved tiles durable, enforce the budget, and release
+        the resources """
+        self.enforce_budget()
+        self.flush()
+
+    def stats(self):
+        """ Describe the activity of the cache
+
+        :return value: dictionnary
+        """
+        return {'hits': self.nb_of_hits, 'misses': self.nb_of_misses,
+                'puts': self.nb_of_puts, 'evictions': self.nb_of_evictions,
+                'bytes_read': self.bytes_read,
+                'bytes_written': self.bytes_written,
+                'decode_duration': self.decode_duration}
+
+    def tile_entries(self):
+        """ Describe the saved tiles
+
+        :return value: iterable of quadruplets (key, size, accessed, cost),
+                       where key identifies the tile for delete_tiles, size
+                       is its size in bytes, accessed the date of its last
+                       access and cost the estimated duration in seconds of
+                       the computation of its values ; accessed and cost may
+                       be None
+        """
+        raise NotImplementedError
+
+    def delete_tiles(self, keys):
+        """ Delete saved tiles
+
+        :param keys: list of keys given by tile_entries
+        """
+        raise NotImplementedError
+
+    def size(self):
+        """ Compute the size of the saved tiles
+
+        :return value: int, in bytes
+        """
+        return sum(entry[1] for entry in self.tile_entries())
+
+    def evict(self, max_bytes=None, policy=None):
+        """ Evict tiles, in a transaction, until the size of the saved tiles
+        is at most a budget
+
+        :param max_bytes: int, the budget in bytes ; by default, the budget
+                          of the cache
+        :param policy: String, in EVICTION_POLICIES ; by default, the policy
+                       of the cache
+        :return value: pair of int, the number of evicted tiles and their
+                       size in bytes
+
+        :raised error: ValueError when the cache is read-only, or
+                       the policy is unknown
+        """
+        self.check_writable()
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        policy = self.policy if policy is None else policy
+        if policy == "lru":
+            def order(entry):
+                return entry[2] or 0
+        elif policy == "cost":
+            def order(entry):
+                return ((entry[3] or 0) / max(entry[1], 1), entry[2] or 0)
+        else:
+            raise ValueError("Unknown eviction policy " + str(policy))
+        with self.transaction():
+            entries = sorted(self.tile_entries(), key=order)
+            size = sum(entry[1] for entry in entries)
+            evicted = []
+            freed = 0
+            for entry in entries:
+                if size - freed <= max_bytes:
+                    break
+                evicted.append(entry[0])
+                freed += entry[1]
+            if evicted:
+                self.delete_tiles(evicted)
+        self.nb_of_evictions += len(evicted)
+        return (len(evicted), freed)
+
+    def enforce_budget(self):
+        """ Evict tiles if the size of a writable cache exceeds its budget """
+        if self.max_bytes is not None and not self.read_only:
+            self.evict()
+
+    def compact(self):
+        """ Remove the unused data of the cache
+
+        :return value: pair of int, the sizes in bytes of the cache before
+                       and after the compaction
+        """
+        self.flush()
+        size = self.size()
+        return (size, size)
+
+    def check_writable(self):
+        """ Check that tiles can be saved in the cache
+
+        :raised error: ValueError when the cache is read-only
+        """
+        if self.read_only:
+            raise ValueError("The cache " + str(getattr(self, 'path', '')) +
+                             " is read-only")
+
+    def count(self, tile):
+        """ Count a hit or a miss
+
+        :param tile: the tile read, or None
+        :return value: the tile
+        """
+        if tile is None:
+            self.nb_of_misses += 1
+        else:
+            self.nb_of_hits += 1
+        return tile
+
+
+class MemoryCache(TileCache):
+    """ Least recently used cache of tiles in memory
+
+    :attribute max_tiles: int, the maximal number of tiles
+    :attribute tiles: OrderedDict whose keys are (identity, resolution,
+                      tile_x, tile_y) and whose values are (values, presence,
+                      precision, algorithm, cost), from the least to the most
+                      recently used
+
+    >>> cache = MemoryCache(max_tiles=2)
+    >>> values = np.zeros((TILE_SIZE, TILE_SIZE), dtype=complex)
+    >>> presence = np.ones((TILE_SIZE, TILE_SIZE), dtype=bool)
+    >>> for tile_x in range(3):
+    ...     cache.put_tile("f", 10, tile_x, 0, values, presence, 53, "float")
+    >>> cache.contains("f", 10, 0, 0), cache.contains("f", 10, 2, 0)
+    (False, True)
+    >>> cache.contains("f", 10, 2, 0, precision=64)
+    False
+    >>> cache.get_tile("f", 10, 1, 0) is None
+    False
+    >>> statistics = cache.stats()
+    >>> statistics['hits'], statistics['puts'], statistics['tiles']
+    (1, 3, 2)
+    >>> statistics['evictions'], statistics['bytes_read']
+    (1, 69632)
+    >>> cache.evict(max_bytes=cache.size() // 2)
+    (1, 69632)
+    >>> cache.contains("f", 10, 1, 0), cache.contains("f", 10, 2, 0)
+    (True, False)
+    """
+
+    def __init__(self, max_tiles=MEMORY_TILES, max_bytes=None, policy="lru"):
+        """ Constructor of the class
+
+        :param max_tiles: int, the maximal number of tiles
+        :param max_bytes: int, the budget in bytes, or None
+        :param policy: String, the eviction policy, in EVICTION_POLICIES
+        """
+        TileCache.__init__(self, max_bytes=max_bytes, policy=policy)
+        self.max_tiles = max_tiles
+        self.tiles = OrderedDict()
+
+    def get_tile(self, identity, resolution, tile_x, tile_y, precision=0):
+        key = (identity, resolution, tile_x, tile_y)
+        entry = self.tiles.get(key)
+        if entry is None or entry[2] < precision:
+            return self.count(None)
+        self.tiles.move_to_end(key)
+        self.bytes_read += entry[0].nbytes + entry[1].nbytes
+        return self.count(entry[:2])
+
+    def put_tile(self, identity, resolution, tile_x, tile_y, values, presence,
+                 precision, algorithm, cost=None):
+        key = (identity, resolution, tile_x, tile_y)
+        self.tiles[key] = (np.array(values, dtype=TILE_DTYPE),
+                           np.array(presence, dtype=bool),
+                           precision, algorithm, cost)
+        self.tiles.move_to_end(key)
+        self.nb_of_puts += 1
+        self.bytes_written += self.tiles[key][0].nbytes + \
+            self.tiles[key][1].nbytes
+        while len(self.tiles) > self.max_tiles:
+            self.tiles.popitem(last=False)
+            self.nb_of_evictions += 1
+
+    def contains(self, identity, resolution, tile_x, tile_y, precision=0):
+        entry = self.tiles.get((identity, resolution, tile_x, tile_y))
+        return entry is not None and entry[2] >= precision
+
+    def stats(self):
+        result = TileCache.stats(self)
+        result['tiles'] = len(self.tiles)
+        return result
+
+    def tile_entries(self):
+        # The tiles are ordered from the least to the most recently used
+        for (rank, (key, entry)) in enumerate(self.tiles.items()):
+            yield (key, entry[0].nbytes + entry[1].nbytes, rank, entry[4])
+
+    def delete_tiles(self, keys):
+        for key in keys:
+            self.tiles.pop(key, None)
+
+
+class SQLiteCache(TileCache):
+    """ Cache of tiles in the ValueTile table of a SQLite database (see
+    the Database and TileStore modules). The saved tiles are committed
+    by flush.
+
+    :attribute path: String, the path of the database
+    :attribute connection: Connection object
+    :attribute empty: boolean, which indicates if the tables of a read-only
+                      database have not been created
+    :attribute accessed: dictionnary whose keys are (function id, resolution,
+                         tile_x, tile_y) and whose values are the dates of
+                         the accesses to the tiles not yet written
+    :attribute function_ids: dictionnary whose keys are the identities of
+                             the functions and whose values are their ids
+    :attribute provenance_ids: dictionnary whose keys are the pairs
+                               (precision, algorithm) and whose values are
+                               the ids of the blocks of values saved by
+                               the cache
+
+    >>> import tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), "values.sqlite")
+    >>> cache = SQLiteCache(path)
+    >>> values = np.zeros((TILE_SIZE, TILE_SIZE), dtype=complex)
+    >>> presence = np.ones((TILE_SIZE, TILE_SIZE), dtype=bool)
+    >>> cache.put_tile("f", 10, 0, 0, values, presence, 53, "float")
+    >>> cache.close()
+    >>> cache = SQLiteCache(path)
+    >>> cache.contains("f", 10, 0, 0), cache.contains("g", 10, 0, 0)
+    (True, False)
+    >>> int(cache.get_tile("f", 10, 0, 0)[1].sum())
+    4096
+    >>> cache.get_tile("f", 10, 0, 0, precision=64) is None
+    True
+    >>> cache.close()
+    >>> cache = SQLiteCache(path, immutable=True)
+    >>> cache.contains("f", 10, 0, 0)
+    True
+    >>> try:
+    ...     cache.put_tile("f", 10, 1, 0, values, presence, 53, "float")
+    ... except ValueError as error:
+    ...     print(str(error).endswith("is read-only"))
+    True
+    """
+
+    def __init__(self, path, read_only=False, immutable=False,
+                 max_bytes=None, policy="lru"):
+        """ Constructor of the class, which creates the database and its
+        tables if they do not exist, unless the database is read-only
+
+        :param path: String, the path of the database
+        :param read_only: boolean
+        :param immutable: boolean, which indicates that the database is
+                          read-only and is not modified by an other process,
+                          so that it is read without any lock
+        :param max_bytes: int, the budget in bytes, or None
+        :param policy: String, the eviction policy, in EVICTION_POLICIES
+        """
+        TileCache.__init__(self, read_only or immutable, max_bytes, policy)
+        self.path = path
+        self.connection = connect(path, read_only=read_only,
+                                  immutable=immutable)
+        if self.read_only:
+            self.empty = not has_tables(self.connection.cursor(),
+                                        TILE_SCHEMA_VERSION)
+        else:
+            create_tables(self.connection.cursor())
+            self.connection.commit()
+            self.empty = False
+        self.function_ids = {}
+        self.provenance_ids = {}
+        self.accessed = {}
+
+    def function_id(self, identity, register=False):
+        """ Give the id of the identity of a function
+
+        :param identity: String
+        :param register: boolean, which indicates if an unknown identity
+                         has to be registered
+        :return value: int, or None if the identity is unknown
+        """
+        if self.empty:
+            return None
+        if identity not in self.function_ids:
+            cursor = self.connection.cursor()
+            if register:
+                function_id = register_function(cursor, identity)
+            else:
+                function_id = find_function_id(cursor, identity)
+            if function_id is None:
+                return None
+            self.function_ids[identity] = function_id
+        return self.function_ids[identity]
+
+    def get_tile(self, identity, resolution, tile_x, tile_y, precision=0):
+        function_id = self.function_id(identity)
+        if function_id is None:
+            return self.count(None)
+        cursor = self.connection.cursor()
+        cursor.execute(SELECT_TILE, (function_id, resolution, tile_x, tile_y))
+        row = cursor.fetchone()
+        if row is None or row[2] < precision:
+            return self.count(None)
+        self.touch(function_id, resolution, tile_x, tile_y)
+        return self.count(self.decode(row[0], row[1]))
+
+    def get_tiles(self, identity, resolution, x_range, y_range, precision=0):
+        function_id = self.function_id(identity)
+        if function_id is None:
+            return
+        for (tile_x, tile_y, presence, data) in \
+                read_tiles(self.connection.cursor(), function_id, resolution,
+                           x_range, y_range, precision):
+            self.nb_of_hits += 1
+            self.touch(function_id, resolution, tile_x, tile_y)
+            yield (tile_x, tile_y) + self.decode(presence, data)
+
+    def decode(self, presence, data):
+        """ Decode the BLOBs of a tile read, and count them
+
+        :param presence: bytes
+        :param data: bytes
+        :return value: pair (values, presence)
+        """
+        t_0 = time()
+        tile = decode_tile(presence, data)
+        self.decode_duration += time() - t_0
+        self.bytes_read += len(presence) + len(data)
+        return tile
+
+    def touch(self, function_id, resolution, tile_x, tile_y):
+        """ Record the access to a tile, which is written with the next
+        saved tiles, or when the cache is flushed """
+        if not self.read_only:
+            self.accessed[function_id, resolution, tile_x, tile_y] = time()
+
+    def write_accesses(self):
+        """ Write the recorded accesses, in the current transaction """
+        if self.accessed:
+            self.connection.executemany(TOUCH_TILE,
+                                        [(accessed,) + key for (key, accessed)
+                                         in self.accessed.items()])
+            self.accessed = {}
+
+    def put_tile(self, identity, resolution, tile_x, tile_y, values, presence,
+                 precision, algorithm, cost=None):
+        self.check_writable()
+        cursor = self.connection.cursor()
+        function_id = self.function_id(identity, register=True)
+        blobs = encode_tile(values, presence)
+        if (precision, algorithm) not in self.provenance_ids:
+            self.provenance_ids[precision, algorithm] = \
+                register_provenance(cursor, precision, algorithm)
+        cursor.execute(INSERT_TILE, (function_id, resolution, tile_x, tile_y,
+                                     self.provenance_ids[precision,
+                                                         algorithm]) +
+                       blobs + (time(), cost))
+        self.nb_of_puts += 1
+        self.bytes_written += len(blobs[0]) + len(blobs[1])
+
+    def contains(self, identity, resolution, tile_x, tile_y, precision=0):
+        function_id = self.function_id(identity)
+        if function_id is None:
+            return False
+        cursor = self.connection.cursor()
+        cursor.execute(SELECT_TILE, (function_id, resolution, tile_x, tile_y))
+        row = cursor.fetchone()
+        return row is not None and row[2] >= precision
+
+    def flush(self):
+        if self.accessed:
+            begin_write(self.connection)
+            self.write_accesses()
+        self.connection.commit()
+
+    @contextmanager
+    def transaction(self):
+        self.check_writable()
+        begin_write(self.connection)
+        try:
+            yield self
+            self.write_accesses()
+        except BaseException:
+            self.connection.rollback()
+            raise
+        self.connection.commit()
+
+    def close(self):
+        self.enforce_budget()
+        self.flush()
+        self.connection.close()
+
+    def tile_entries(self):
+        if self.empty:
+            return []
+        cursor = self.connection.cursor()
+        cursor.execute('''SELECT rowid, LENGTH(presence) + LENGTH(data),
+                                 accessed, cost
+                          FROM ValueTile''')
+        return cursor.fetchall()
+
+    def delete_tiles(self, keys):
+        self.connection.executemany('''DELETE FROM ValueTile WHERE rowid = ?''',
+                                    [(key,) for key in keys])
+
+    def compact(self):
+        self.check_writable()
+        self.flush()
+        return compact_database(self.connection)
+
+    def stats(self):
+        result = TileCache.stats(self)
+        if self.empty:
+            result['tiles'], result['bytes'] = 0, None
+            return result
+        cursor = self.connection.cursor()
+        cursor.execute('''SELECT COUNT(*),
+                                 SUM(LENGTH(presence) + LENGTH(data))
+                          FROM ValueTile''')
+        result['tiles'], result['bytes'] = cursor.fetchone()
+        return result
+
+
+class NpyDirectoryCache(TileCache):
+    """ Cache of tiles in a directory of NumPy files: the tile (tile_x, tile_y)
+    of a function, for a resolution, is saved in the files
+    <hash of the identity>/<resolution>/<tile_x>_<tile_y>.npy, which contains
+    its values, and <tile_x>_<tile_y>.json, which contains their precision,
+    algorithm and date. The values which have not been computed are NaN,
+    as in the Vectorized module. The .npy files are memory-mapped when they
+    are read, and the files are written atomically. The transactions hold
+    the FileLock of the file .lock of the directory. The date of the last
+    access of a tile is the access date of its .json file.
+
+    :attribute path: String, the path of the directory
+
+    >>> import tempfile
+    >>> path = tempfile.mkdtemp()
+    >>> cache = NpyDirectoryCache(path)
+    >>> values = np.full((TILE_SIZE, TILE_SIZE), np.nan, dtype=complex)
+    >>> values[0, 1] = 1 + 2j
+    >>> cache.put_tile("f", 10, -1, 0, values, ~np.isnan(values), 53, "float")
+    >>> tile_values, presence = cache.get_tile("f", 10, -1, 0)
+    >>> complex(tile_values[0, 1]), int(presence.sum())
+    ((1+2j), 1)
+    >>> cache.contains("f", 10, 0, 0), cache.contains("f", 10, -1, 0, 64)
+    (False, False)
+    >>> NpyDirectoryCache(path, read_only=True).contains("f", 10, -1, 0)
+    True
+    """
+
+    def __init__(self, path, read_only=False, max_bytes=None, policy="lru"):
+        """ Constructor of the class, which creates the directory if it
+        does not exist, unless the cache is read-only
+
+        :param path: String, the path of the directory
+        :param read_only: boolean
+        :param max_bytes: int, the budget in bytes, or None
+        :param policy: String, the eviction policy, in EVICTION_POLICIES
+        """
+        TileCache.__init__(self, read_only, max_bytes, policy)
+        self.path = path
+        if not read_only:
+            os.makedirs(path, exist_ok=True)
+
+    def tile_path(self, identity, resolution, tile_x, tile_y):
+        """ Compute the path of the files of a tile, without extension
+
+        :return value: String
+        """
+        digest = hashlib.sha256(identity.encode()).hexdigest()[:16]
+        return os.path.join(self.path, digest, str(resolution),
+                            str(tile_x) + "_" + str(tile_y))
+
+    def metadata(self, identity, resolution, tile_x, tile_y):
+        """ Read the precision, the algorithm and the date of a tile
+
+        :return value: dictionnary, or None if the tile is not saved
+        """
+        try:
+            with open(self.tile_path(identity, resolution, tile_x,
+                                     tile_y) + ".json") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def get_tile(self, identity, resolution, tile_x, tile_y, precision=0):
+        metadata = self.metadata(identity, resolution, tile_x, tile_y)
+        if metadata is None or metadata['precision'] < precision:
+            return self.count(None)
+        path = self.tile_path(identity, resolution, tile_x, tile_y)
+        try:
+            values = np.load(path + ".npy", mmap_mode='r')
+        except (OSError, ValueError):
+            return self.count(None)
+        t_0 = time()
+        presence = ~np.isnan(values)
+        self.decode_duration += time() - t_0
+        self.bytes_read += values.nbytes
+        if not self.read_only:
+            try:
+                os.utime(path + ".json")
+            except OSError:
+                pass
+        return self.count((values, presence))
+
+    def put_tile(self, identity, resolution, tile_x, tile_y, values, presence,
+                 precision, algorithm, cost=None):
+        self.check_writable()
+        path = self.tile_path(identity, resolution, tile_x, tile_y)
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, os.pardir,
+                                   "identity.txt"), "w") as file:
+                file.write(identity)
+        values = np.where(presence, values, np.nan).astype(TILE_DTYPE)
+        temporary = path + "." + str(os.getpid()) + ".tmp"
+        with open(temporary, "wb") as file:
+            np.save(file, values)
+        os.replace(temporary, path + ".npy")
+        with open(temporary, "w") as file:
+            json.dump({'precision': precision, 'algorithm': algorithm,
+                       'timestamp': time(), 'cost': cost}, file)
+        os.replace(temporary, path + ".json")
+        self.nb_of_puts += 1
+        self.bytes_written += values.nbytes
+
+    def contains(self, identity, resolution, tile_x, tile_y, precision=0):
+        metadata = self.metadata(identity, resolution, tile_x, tile_y)
+        return metadata is not None and metadata['precision'] >= precision
+
+    @contextmanager
+    def transaction(self):
+        self.check_writable()
+        with FileLock(os.path.join(self.path, ".lock")):
+            yield self
+
+    def files(self):
+        """ List the files of the tiles
+
+        :return value: generator of the paths of the files
+        """
+        for (directory, _, names) in os.walk(self.path):
+            if directory != self.path:
+                for name in names:
+                    if name != "identity.txt":
+                        yield os.path.join(directory, name)
+
+    def tile_entries(self):
+        for path in self.files():
+            if path.endswith(".json"):
+                path = path[:-len(".json")]
+                try:
+                    status = os.stat(path + ".json")
+                    size = status.st_size + os.path.getsize(path + ".npy")
+                    with open(path + ".json") as file:
+                        cost = json.load(file).get('cost')
+                except (OSError, ValueError):
+                    continue
+                yield (path, size, status.st_atime, cost)
+
+    def delete_tiles(self, keys):
+        # The metadata are removed first: the tile is then not read anymore
+        for path in keys:
+            for extension in (".json", ".npy"):
+                try:
+                    os.remove(path + extension)
+                except OSError:
+                    pass
+
+    def compact(self):
+        """ Remove the temporary files left by interrupted writes, the files
+        of the incomplete tiles, and the empty directories """
+        before = sum(os.path.getsize(path) for path in self.files())
+        with self.transaction():
+            for path in list(self.files()):
+                base, extension = os.path.splitext(path)
+                other = {".json": ".npy", ".npy": ".json"}.get(extension)
+                if other is None or not os.path.isfile(base + other):
+                    os.remove(path)
+            for (directory, names, _) in os.walk(self.path, topdown=False):
+                if directory == self.path:
+                    continue
+                contents = os.listdir(directory)
+                if contents == [] or contents == ["identity.txt"]:
+                    for name in contents:
+                        os.remove(os.path.join(directory, name))
+                    os.rmdir(directory)
+        return (before, sum(os.path.getsize(path) for path in self.files()))
+
+
+class LayeredCache(TileCache):
+    """ Cache made of a writable cache, the overlay, over an other cache,
+    the base, which is usually read-only: the tiles are read in both caches,
+    the values of the overlay taking precedence, and they are saved in
+    the overlay. A base shared by several users, for instance on a network
+    filesystem, is then never modified, and each user saves the values they
+    compute in their own overlay.
+
+    :attribute base: TileCache
+    :attribute overlay: TileCache
+
+    >>> values = np.full((TILE_SIZE, TILE_SIZE), np.nan, dtype=complex)
+    >>> values[0, 0] = 1
+    >>> base = MemoryCache()
+    >>> base.put_tile("f", 10, 0, 0, values, ~np.isnan(values), 53, "float")
+    >>> base.read_only = True
+    >>> cache = LayeredCache(base, MemoryCache())
+    >>> values[0, 0], values[0, 1] = 2, 3
+    >>> cache.put_tile("f", 10, 0, 0, values, ~np.isnan(values), 53, "float")
+    >>> tile_values, presence = cache.get_tile("f", 10, 0, 0)
+    >>> complex(tile_values[0, 0]), complex(tile_values[0, 1])
+    ((2+0j), (3+0j))
+    >>> values[0, 2] = 4
+    >>> base.tiles["f", 10, 1, 0] = (values, ~np.isnan(values), 53, "float")
+    >>> [(x, int(p.sum())) for (x, y, v, p) in cache.get_tiles("f", 10,
+    ...                                                        (0, 100),
+    ...                                                        (0, 10))]
+    [(0, 2), (1, 3)]
+    """
+
+    def __init__(self, base, overlay):
+        """ Constructor of the class
+
+        :param base: TileCache
+        :param overlay: TileCache
+        """
+        TileCache.__init__(self, overlay.read_only)
+        self.base = base
+        self.overlay = overlay
+
+    def get_tile(self, identity, resolution, tile_x, tile_y, precision=0):
+        base = self.base.get_tile(identity, resolution, tile_x, tile_y,
+                                  precision)
+        overlay = self.overlay.get_tile(identity, resolution, tile_x, tile_y,
+                                        precision)
+        return self.count(merge_tiles(base, overlay))
+
+    def get_tiles(self, identity, resolution, x_range, y_range, precision=0):
+        tiles = {}
+        for (tile_x, tile_y, values, presence) in \
+                self.base.get_tiles(identity, resolution, x_range, y_range,
+                                    precision):
+            tiles[tile_x, tile_y] = (values, presence)
+        for (tile_x, tile_y, values, presence) in \
+                self.overlay.get_tiles(identity, resolution, x_range, y_range,
+                                       precision):
+            tiles[tile_x, tile_y] = merge_tiles(tiles.get((tile_x, tile_y)),
+                                                (values, presence))
+        for (key, tile) in tiles.items():
+            self.nb_of_hits += 1
+            yield key + tile
+
+    def put_tile(self, identity, resolution, tile_x, tile_y, values, presence,
+                 precision, algorithm, cost=None):
+        self.overlay.put_tile(identity, resolution, tile_x, tile_y, values,
+                              presence, precision, algorithm, cost)
+        self.nb_of_puts += 1
+
+    def contains(self, identity, resolution, tile_x, tile_y, precision=0):
+        return self.overlay.contains(identity, resolution, tile_x, tile_y,
+                                     precision) or \
+            self.base.contains(identity, resolution, tile_x, tile_y,
+                               precision)
+
+    def flush(self):
+        self.overlay.flush()
+
+    def transaction(self):
+        return self.overlay.transaction()
+
+    def close(self):
+        self.overlay.close()
+        self.base.close()
+
+    def evict(self, max_bytes=None, policy=None):
+        return self.overlay.evict(max_bytes, policy)
+
+    def compact(self):
+        return self.overlay.compact()
+
+    def stats(self):
+        result = TileCache.stats(self)
+        result['base'] = self.base.stats()
+        result['overlay'] = self.overlay.stats()
+        for key in ('bytes_read', 'bytes_written', 'decode_duration'):
+            result[key] = result['base'][key] + result['overlay'][key]
+        return result
+
+
+def merge_tiles(base, overlay):
+    """ Merge two tiles, the values of the second taking precedence
+
+    :param base: pair (values, presence), or None
+    :param overlay: pair (values, presence), or None
+    :return value: pair (values, presence), or None if both tiles are None
+    """
+    if base is None:
+        return overlay
+    if overlay is None:
+        return base
+    return (np.where(overlay[1], overlay[0], base[0]), overlay[1] | base[1])
+
+
+class FileLock(object):
+    """ Context manager which holds an exclusive lock on a file, shared by
+    the processes: it waits until the processes holding the lock release it
+
+    :attribute path: String, the path of the file, which is created if it
+                     does not exist
+    :attribute file: file object, opened while the lock is held
+
+    >>> import tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), ".lock")
+    >>> with FileLock(path):
+    ...     os.path.isfile(path)
+    True
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, "a+")
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        else:
+            self.file.seek(0)
+            locked = False
+            while not locked:
+                try:
+                    msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+                    locked = True
+                except OSError:
+                    pass
+        return self
+
+    def __exit__(self, *args):
+        if fcntl is not None:
+            fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        else:
+            self.file.seek(0)
+            msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        self.file.close()
+        self.file = None
+
+
+def is_cache_url(name):
+    """ Check if a name is the URL of a cache
+
+    :param name: String
+    :return value: boolean
+
+    >>> is_cache_url("npy:/tmp/values"), is_cache_url("values.sqlite")
+    (True, False)
+    >>> is_cache_url("sqlite:/shared/values.sqlite?mode=ro|memory:")
+    True
+    """
+    return name.split(":", 1)[0] in CACHE_SCHEMES and ":" in name
+
+
+def open_cache(url):
+    """ Open the cache described by an URL
+
+    :param url: String, "memory:", "memory:name", "sqlite:path" or "npy:path",
+                whose path may be followed by the options "?mode=ro" or
+                "?immutable=1", or "base|overlay" where base and overlay are
+                URLs of caches
+    :return value: TileCache
+
+    :raised error: ValueError when the scheme of the URL is unknown
+
+    >>> open_cache("memory:") is open_cache("memory:")
+    True
+    >>> import tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), "values.sqlite")
+    >>> open_cache("sqlite:" + path).close()
+    >>> cache = open_cache("sqlite:" + path + "?mode=ro|memory:user")
+    >>> type(cache).__name__, cache.base.read_only, cache.read_only
+    ('LayeredCache', True, False)
+    """
+    if "|" in url:
+        base, _, overlay = url.partition("|")
+        return LayeredCache(open_cache(base), open_cache(overlay))
+    scheme, _, path = url.partition(":")
+    path, _, query = path.partition("?")
+    options = dict(parse_qsl(query))
+    immutable = options.get('immutable') == "1"
+    read_only = options.get('mode') == "ro" or immutable
+    max_bytes = options.get('max_bytes')
+    if max_bytes is not None:
+        max_bytes = int(float(max_bytes))
+    policy = options.get('policy', "lru")
+    if scheme == "memory":
+        if path not in MEMORY_CACHES:
+            MEMORY_CACHES[path] = MemoryCache(max_bytes=max_bytes,
+                                              policy=policy)
+        return MEMORY_CACHES[path]
+    path = os.path.expanduser(path)
+    if scheme == "sqlite":
+        return SQLiteCache(path, read_only=read_only, immutable=immutable,
+                           max_bytes=max_bytes, policy=policy)
+    if scheme == "npy":
+        return NpyDirectoryCache(path, read_only=read_only,
+                                 max_bytes=max_bytes, policy=policy)
+    raise ValueError("Unknown cache " + url + ": the known schemes are " +
+                     ", ".join(CACHE_SCHEMES))
+
+
+if __name__ == '__main__':
+    from doctest import testmod
+    testmod()
@@ -0,0 +1,557 @@
+###########################################################
+# Module to export the values saved in a database into    #
+# compressed columnar files, and to import them into      #
+# an other database                                       #
+#                                                         #
+# Author: Olivier Bouillot                                #
+# Email: olivier.bouillot@u-pem.fr                        #
+# Creation Date: october 2026                             #
+#                                                         #
+# Modifications:                                          #
+# --------------                                          #
+#                                                         #
+#                                                         #
+# Next modifications to do:                               #
+# -------------------------                               #
+#                                                         #
+#   * Export the caches of tiles which are not SQLite     #
+#     databases                                           #
+#                                                         #
+###########################################################
+
+
+import sys
+import json
+import zipfile
+import argparse
+from time import time
+import numpy as np
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+from Database import connect, create_tables, begin_write
+from Database import register_function, register_provenance
+from TileStore import TILE_SIZE, SELECT_TILE, INSERT_TILE
+from TileStore import encode_tile, decode_tile
+from CacheTool import load_function
+from FunctionIdentity import function_identity
+
+
+""" Module which defines the export_values and import_values functions,
+which move the values saved in a SQLite database (see the Database module)
+to an other one, through a compressed columnar file:
+* a .npz file, i.e. a zip archive of .npy files, one per column of each
+  chunk of values.
+* a .parquet file, when the pyarrow module is installed, whose row groups
+  are the chunks of values.
+
+The values are streamed by chunks of CHUNK_SIZE points, or TILE_CHUNK_SIZE
+tiles: neither the export nor the import loads the whole database in memory.
+The values are exported with the identity of their function (see
+the FunctionIdentity module) and the precision, the algorithm and the date
+of their computation, so that they keep their meaning in the other database.
+The tiles are exported as they are saved, i.e. compressed (see the TileStore
+module), and are inserted as they are in a database which does not have
+them yet.
+
+A value replaces, when it is imported, the saved value of the same point only
+if its precision is at least the same ; a tile is merged with the saved tile
+as in the TileWriter class of the TileStore module.
+
+The export and the import are run without any graphical interface by:
+    python CacheExport.py export database file [--identity identity]
+                                               [--function module:name]
+                                               [--version version]
+                                               [--region a b c d]
+    python CacheExport.py import file database
+where the format of file is given by its extension, .npz or .parquet, and
+the region [a, b] + [c, d] * i restricts the exported values.
+"""
+
+
+# Number of points of a chunk
+CHUNK_SIZE = 65536
+
+# Number of tiles of a chunk
+TILE_CHUNK_SIZE = 256
+
+# Columns of the exported points and tiles
+POINT_COLUMNS = ('identity', 'precision', 'algorithm', 'timestamp',
+                 'multiplier', 'real', 'imaginary',
+                 'value_real', 'value_imaginary', 'infinite')
+TILE_COLUMNS = ('identity', 'precision', 'algorithm', 'timestamp',
+                'resolution', 'tile_x', 'tile_y', 'presence', 'data', 'cost')
+
+# Types of the numerical columns
+COLUMN_TYPES = {'precision': np.int64, 'timestamp': np.float64,
+                'multiplier': np.int64, 'real': np.int64,
+                'imaginary': np.int64, 'value_real': np.float64,
+                'value_imaginary': np.float64, 'infinite': np.int8,
+                'resolution': np.int64, 'tile_x': np.int64,
+                'tile_y': np.int64, 'cost': np.float64}
+
+# Columns of the strings, saved by their index in a dictionary of strings
+DICTIONARY_COLUMNS = ('identity', 'algorithm')
+
+# Columns of the BLOBs
+BLOB_COLUMNS = ('presence', 'data')
+
+SELECT_POINTS = '''SELECT identity, COALESCE(precision, 53),
+                          COALESCE(algorithm, 'unknown'),
+                          COALESCE(timestamp, 0),
+                          multiplier, real, imaginary,
+                          value_real, value_imaginary, infinite
+                   FROM PointValue
+                   JOIN Function ON Function.id = PointValue.function
+                   LEFT JOIN Provenance
+                     ON Provenance.id = PointValue.provenance
+                   WHERE 1'''
+
+SELECT_ALL_TILES = '''SELECT identity, COALESCE(precision, 53),
+                             COALESCE(algorithm, 'unknown'),
+                             COALESCE(timestamp, 0),
+                             resolution, tile_x, tile_y, presence, data, cost
+                      FROM ValueTile
+                      JOIN Function ON Function.id = ValueTile.function
+                      LEFT JOIN Provenance
+                        ON Provenance.id = ValueTile.provenance
+                      WHERE 1'''
+
+# A value only replaces a value computed with at most the same precision
+UPSERT_POINT_VALUE = '''INSERT INTO PointValue(function, multiplier, real,
+                                               imaginary, value_real,
+                                               value_imaginary, infinite,
+                                               provenance)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(function, multiplier, real, imaginary)
+                        DO UPDATE SET value_real = excluded.value_real,
+                                      value_imaginary = excluded.value_imaginary,
+                                      infinite = excluded.infinite,
+                                      provenance = excluded.provenance
+                        WHERE (SELECT precision FROM Provenance
+                               WHERE id = excluded.provenance) >=
+                              COALESCE((SELECT precision FROM Provenance
+                                        WHERE id = PointValue.provenance), 0)'''
+
+
+def region_conditions(identity, region):
+    """ Compute the conditions of the selection of the exported values
+
+    :param identity: String, the identity of the exported function, or None
+    :param region: quadruplet of numbers (a, b, c, d), which describes
+                   the region [a, b] + [c, d] * i, or None
+    :return value: pair (conditions of the points, conditions of the tiles),
+                   pairs (String, tuple of parameters)
+    """
+    points, tiles = "", ""
+    parameters = ()
+    if identity is not None:
+        points += " AND identity = ?"
+        tiles += " AND identity = ?"
+        parameters += (identity,)
+    point_parameters, tile_parameters = parameters, parameters
+    if region is not None:
+        a, b, c, d = (float(bound) for bound in region)
+        points += (" AND real >= multiplier * ? AND real <= multiplier * ?" +
+                   " AND imaginary >= multiplier * ?" +
+                   " AND imaginary <= multiplier * ?")
+        point_parameters += (a, b, c, d)
+        tiles += (" AND (tile_x + 1) * ? > resolution * ?" +
+                  " AND tile_x * ? <= resolution * ?" +
+                  " AND (tile_y + 1) * ? > resolution * ?" +
+                  " AND tile_y * ? <= resolution * ?")
+        tile_parameters += (TILE_SIZE, a, TILE_SIZE, b,
+                            TILE_SIZE, c, TILE_SIZE, d)
+    return ((points, point_parameters), (tiles, tile_parameters))
+
+
+def read_chunks(connection, identity=None, region=None):
+    """ Read the values of a database by chunks
+
+    :param connection: Connection object
+    :param identity: String, the identity of the exported function, or None
+                     for all the functions
+    :param region: quadruplet of numbers (a, b, c, d), which describes
+                   the region [a, b] + [c, d] * i, or None for the whole plane
+    :return value: generator of pairs (kind, rows), where kind is "point" or
+                   "tile", and rows is a list of tuples whose columns are
+                   POINT_COLUMNS or TILE_COLUMNS
+    """
+    points, tiles = region_conditions(identity, region)
+    for (kind, select, (conditions, parameters), size) in \
+            (("point", SELECT_POINTS, points, CHUNK_SIZE),
+             ("tile", SELECT_ALL_TILES, tiles, TILE_CHUNK_SIZE)):
+        cursor = connection.cursor()
+        cursor.execute(select + conditions, parameters)
+        rows = cursor.fetchmany(size)
+        while rows:
+            yield (kind, rows)
+            rows = cursor.fetchmany(size)
+
+
+class NpzWriter(object):
+    """ Class which writes chunks of values in a .npz file: the column c of
+    the n-th chunk of kind k is the array "k.n.c" ; the strings of
+    the identity and algorithm columns are saved by their index in
+    the arrays "identity" and "algorithm", and the BLOBs of the presence and
+    data columns are concatenated, with the array of their offsets "k.n.c#".
+
+    :attribute archive: ZipFile object
+    :attribute nb_of_chunks: dictionnary whose keys are the kinds of chunks,
+                             and whose values are their numbers
+    :attribute dictionaries: dictionnary whose keys are the names of
+                             the columns of strings, and whose values are
+                             dictionnaries giving the index of a string
+    """
+
+    def __init__(self, path):
+        """ Constructor of the class
+
+        :param path: String, the path of the file
+        """
+        self.archive = zipfile.ZipFile(path, "w",
+                                       compression=zipfile.ZIP_DEFLATED)
+        self.nb_of_chunks = {}
+        self.dictionaries = {column: {} for column in DICTIONARY_COLUMNS}
+
+    def write_array(self, name, array):
+        """ Write an array in the archive
+
+        :param name: String
+        :param array: NumPy array
+        """
+        with self.archive.open(name + ".npy", "w", force_zip64=True) as file:
+            np.lib.format.write_array(file, np.ascontiguousarray(array),
+                                      allow_pickle=False)
+
+    def write(self, kind, rows):
+        """ Write a chunk of values
+
+        :param kind: String, "point" or "tile"
+        :param rows: list of tuples
+        """
+        index = self.nb_of_chunks.get(kind, 0)
+        self.nb_of_chunks[kind] = index + 1
+        columns = POINT_COLUMNS if kind == "point" else TILE_COLUMNS
+        prefix = kind + "." + str(index).zfill(6) + "."
+        for (name, column) in zip(columns, zip(*rows)):
+            if name in DICTIONARY_COLUMNS:
+                dictionary = self.dictionaries[name]
+                array = np.array([dictionary.setdefault(text, len(dictionary))
+                                  for text in column], dtype=np.int64)
+            elif name in BLOB_COLUMNS:
+                offsets = np.cumsum([0] + [len(blob) for blob in column])
+                self.write_array(prefix + name + "#", offsets)
+                array = np.frombuffer(b"".join(column), dtype=np.uint8)
+            else:
+                array = np.array([np.nan if value is None else value
+                                  for value in column],
+                                 dtype=COLUMN_TYPES[name])
+            self.write_array(prefix + name, array)
+
+    def close(self):
+        """ Write the dictionaries of strings, and close the file """
+        for (name, dictionary) in self.dictionaries.items():
+            self.write_array(name, np.array(list(dictionary), dtype=str))
+        self.archive.close()
+
+
+def read_npz(path):
+    """ Read the chunks of values of a .npz file written by a NpzWriter
+
+    :param path: String, the path of the file
+    :return value: generator of pairs (kind, rows), as read_chunks
+    """
+    with np.load(path, allow_pickle=False) as archive:
+        dictionaries = {name: archive[name].tolist()
+                        for name in DICTIONARY_COLUMNS}
+        for (kind, columns) in (("point", POINT_COLUMNS),
+                                ("tile", TILE_COLUMNS)):
+            index = 0
+            while kind + "." + str(index).zfill(6) + ".identity" in archive:
+                prefix = kind + "." + str(index).zfill(6) + "."
+                values = []
+                for name in columns:
+                    array = archive[prefix + name]
+                    if name in DICTIONARY_COLUMNS:
+                        strings = dictionaries[name]
+                        values.append([strings[i] for i in array.tolist()])
+                    elif name in BLOB_COLUMNS:
+                        offsets = archive[prefix + name + "#"].tolist()
+                        data = array.tobytes()
+                        values.append([data[offsets[i]:offsets[i + 1]]
+                                       for i in range(len(offsets) - 1)])
+                    else:
+                        values.append([None if value != value else value
+                                       for value in array.tolist()])
+                yield (kind, list(zip(*values)))
+                index += 1
+
+
+class ParquetWriter(object):
+    """ Class which writes chunks of values in a .parquet file, as row groups
+    whose columns are the union of POINT_COLUMNS and TILE_COLUMNS, and
+    the kind of the values ; the columns of the other kind are null
+
+    :attribute writer: pyarrow.parquet.ParquetWriter object
+    """
+
+    def __init__(self, path):
+        """ Constructor of the class
+
+        :param path: String, the path of the file
+
+        :raised error: ImportError when pyarrow is not installed
+        """
+        if pyarrow is None:
+            raise ImportError("The pyarrow module is needed by " +
+                              "the Parquet files")
+        types = {np.int64: pyarrow.int64(), np.int8: pyarrow.int8(),
+                 np.float64: pyarrow.float64()}
+        fields = [pyarrow.field('kind', pyarrow.string())]
+        for name in POINT_COLUMNS + TILE_COLUMNS[4:]:
+            if name in DICTIONARY_COLUMNS:
+                field_type = pyarrow.dictionary(pyarrow.int32(),
+                                                pyarrow.string())
+            elif name in BLOB_COLUMNS:
+                field_type = pyarrow.binary()
+            else:
+                field_type = types[COLUMN_TYPES[name]]
+            fields.append(pyarrow.field(name, field_type))
+        self.schema = pyarrow.schema(fields)
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema,
+                                                    compression="zstd")
+
+    def write(self, kind, rows):
+        columns = POINT_COLUMNS if kind == "point" else TILE_COLUMNS
+        data = {name: [None] * len(rows) for name in self.schema.names}
+        data['kind'] = [kind] * len(rows)
+        for (name, column) in zip(columns, zip(*rows)):
+            data[name] = list(column)
+        self.writer.write_table(pyarrow.table(data, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def read_parquet(path):
+    """ Read the chunks of values of a .parquet file written by
+    a ParquetWriter
+
+    :param path: String, the path of the file
+    :return value: generator of pairs (kind, rows), as read_chunks
+
+    :raised error: ImportError when pyarrow is not installed
+    """
+    if pyarrow is None:
+        raise ImportError("The pyarrow module is needed by the Parquet files")
+    file = pyarrow.parquet.ParquetFile(path)
+    for batch in file.iter_batches(batch_size=CHUNK_SIZE):
+        data = batch.to_pydict()
+        for kind in ("point", "tile"):
+            columns = POINT_COLUMNS if kind == "point" else TILE_COLUMNS
+            selected = [i for (i, k) in enumerate(data['kind']) if k == kind]
+            if selected:
+                yield (kind, [tuple(data[name][i] for name in columns)
+                              for i in selected])
+
+
+def open_writer(path):
+    """ Open the writer of a file, given by its extension
+
+    :param path: String, the path of a .npz or .parquet file
+    :return value: NpzWriter or ParquetWriter
+
+    :raised error: ValueError when the extension is unknown
+    """
+    if path.endswith(".npz"):
+        return NpzWriter(path)
+    if path.endswith(".parquet"):
+        return ParquetWriter(path)
+    raise ValueError("Unknown format of " + path +
+                     ": the known extensions are .npz and .parquet")
+
+
+def read_file(path):
+    """ Read the chunks of values of a file, given by its extension
+
+    :param path: String, the path of a .npz or .parquet file
+    :return value: generator of pairs (kind, rows), as read_chunks
+
+    :raised error: ValueError when the extension is unknown
+    """
+    if path.endswith(".npz"):
+        return read_npz(path)
+    if path.endswith(".parquet"):
+        return read_parquet(path)
+    raise ValueError("Unknown format of " + path +
+                     ": the known extensions are .npz and .parquet")
+
+
+def export_values(database, path, identity=None, region=None):
+    """ Export the values of a database into a file. The database is opened
+    in read-only mode
+
+    :param database: String, the path of a SQLite database
+    :param path: String, the path of a .npz or .parquet file
+    :param identity: String, the identity of the exported function, or None
+                     for all the functions
+    :param region: quadruplet of numbers (a, b, c, d), which describes
+                   the region [a, b] + [c, d] * i, or None for the whole plane
+    :return value: dictionnary with the keys 'points' and 'tiles', the numbers
+                   of exported points and tiles
+
+    >>> import os, tempfile
+    >>> from RiemannSphere import RiemannSphere, INFTY
+    >>> from Database import ValueWriter, value_row
+    >>> from CacheBackends import SQLiteCache
+    >>> directory = tempfile.mkdtemp()
+    >>> source = os.path.join(directory, "source.sqlite")
+    >>> cache = SQLiteCache(source)
+    >>> values = np.zeros((TILE_SIZE, TILE_SIZE), dtype=complex)
+    >>> presence = np.ones((TILE_SIZE, TILE_SIZE), dtype=bool)
+    >>> cache.put_tile("f", 10, 0, 0, values + 1j, presence, 53, "float")
+    >>> cache.put_tile("f", 10, 5, 0, values, presence, 53, "float")
+    >>> cache.close()
+    >>> connection = connect(source)
+    >>> function_id = register_function(connection.cursor(), "f")
+    >>> provenance_id = register_provenance(connection.cursor(), 64, "mpmath")
+    >>> writer = ValueWriter(connection)
+    >>> for x in range(-3, 4):
+    ...     writer.add(value_row(function_id, provenance_id, x, 1,
+    ...                          RiemannSphere(x, 2)))
+    >>> writer.add(value_row(function_id, provenance_id, 0, 0, INFTY))
+    >>> writer.close()
+    >>> connection.close()
+    >>> export_values(source, os.path.join(directory, "values.npz"),
+    ...               region=(0, 5, 0, 5))
+    {'points': 5, 'tiles': 1}
+    >>> target = os.path.join(directory, "target.sqlite")
+    >>> import_values(os.path.join(directory, "values.npz"), target)
+    {'points': 5, 'tiles': 1}
+    >>> cache = SQLiteCache(target)
+    >>> complex(cache.get_tile("f", 10, 0, 0, precision=53)[0][3, 3])
+    1j
+    >>> cache.contains("f", 10, 5, 0)
+    False
+    >>> cache.connection.execute('''SELECT real, value_real, infinite,
+    ...                                    precision, algorithm
+    ...                             FROM PointValue JOIN Provenance
+    ...                               ON Provenance.id = provenance
+    ...                             ORDER BY real''').fetchall()
+    [(0, None, 1, 64, 'mpmath'), (0, 0.0, 0, 64, 'mpmath'), \
+(1, 1.0, 0, 64, 'mpmath'), (2, 2.0, 0, 64, 'mpmath'), (3, 3.0, 0, 64, 'mpmath')]
+    """
+    connection = connect(database, read_only=True)
+    writer = open_writer(path)
+    counts = {'points': 0, 'tiles': 0}
+    try:
+        for (kind, rows) in read_chunks(connection, identity, region):
+            writer.write(kind, rows)
+            counts[kind + "s"] += len(rows)
+    finally:
+        writer.close()
+        connection.close()
+    return counts
+
+
+def import_values(path, database):
+    """ Import the values of a file into a database, which is created if it
+    does not exist. Each chunk is imported in a transaction
+
+    :param path: String, the path of a .npz or .parquet file
+    :param database: String, the path of a SQLite database
+    :return value: dictionnary with the keys 'points' and 'tiles', the numbers
+                   of imported points and tiles
+    """
+    connection = connect(database)
+    cursor = connection.cursor()
+    create_tables(cursor)
+    connection.commit()
+    function_ids = {}
+    provenance_ids = {}
+    counts = {'points': 0, 'tiles': 0}
+    try:
+        for (kind, rows) in read_file(path):
+            begin_write(connection)
+            for row in rows:
+                if row[0] not in function_ids:
+                    function_ids[row[0]] = register_function(cursor, row[0])
+                if row[1:4] not in provenance_ids:
+                    provenance_ids[row[1:4]] = \
+                        register_provenance(cursor, *row[1:4])
+            if kind == "point":
+                cursor.executemany(UPSERT_POINT_VALUE,
+                                   [(function_ids[row[0]],) + tuple(row[4:]) +
+                                    (provenance_ids[row[1:4]],)
+                                    for row in rows])
+            else:
+                for row in rows:
+                    import_tile(cursor, function_ids[row[0]],
+                                provenance_ids[row[1:4]], row)
+            connection.commit()
+            counts[kind + "s"] += len(rows)
+    finally:
+        connection.close()
+    return counts
+
+
+def import_tile(cursor, function_id, provenance_id, row):
+    """ Import a tile, which is inserted as it is if the database does not
+    have it yet, and is merged with the saved tile otherwise
+
+    :param cursor: Cursor object, in a transaction holding the write lock
+    :param function_id: int
+    :param provenance_id: int, the id of the block of the imported tile
+    :param row: tuple, whose columns are TILE_COLUMNS
+    """
+    (_, precision, _, _, resolution, tile_x, tile_y, presence, data,
+     cost) = row
+    cursor.execute(SELECT_TILE, (function_id, resolution, tile_x, tile_y))
+    saved = cursor.fetchone()
+    if saved is not None and saved[2] >= precision:
+        values, mask = decode_tile(presence, data)
+        saved_values, saved_mask = decode_tile(saved[0], saved[1])
+        presence, data = encode_tile(np.where(mask, values, saved_values),
+                                     mask | saved_mask)
+    cursor.execute(INSERT_TILE, (function_id, resolution, tile_x, tile_y,
+                                 provenance_id, presence, data, time(), cost))
+
+
+def main(arguments):
+    """ Run a command
+
+    :param arguments: list of String, the arguments of the command line
+    :return value: dictionnary, the result of the command
+    """
+    parser = argparse.ArgumentParser(prog="CacheExport")
+    commands = parser.add_subparsers(dest="command", required=True)
+    command = commands.add_parser("export")
+    command.add_argument("database")
+    command.add_argument("file")
+    command.add_argument("--identity")
+    command.add_argument("--function")
+    command.add_argument("--version")
+    command.add_argument("--region", nargs=4, type=float)
+    command = commands.add_parser("import")
+    command.add_argument("file")
+    command.add_argument("database")
+    options = parser.parse_args(arguments)
+    if options.command == "import":
+        return import_values(options.file, options.database)
+    identity = options.identity
+    if options.function is not None:
+        identity = function_identity(load_function(options.function),
+                                     options.version)
+    return export_values(options.database, options.file, identity,
+                         options.region)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        print(json.dumps(main(sys.argv[1:])))
+    else:
+        from doctest import testmod
+        testmod()
@@ -0,0 +1,212 @@
+###########################################################
+# Module to gather the statistics of the use of           #
+# the database or the cache of values by a computation    #
+# of a phase portrait                                     #
+#                                                         #
+# Author: Olivier Bouillot                                #
+# Email: olivier.bouillot@u-pem.fr                        #
+# Creation Date: october 2026                             #
+#                                                         #
+# Modifications:                                          #
+# --------------                                          #
+#                                                         #
+#                                                         #
+# Next modifications to do:                               #
+# -------------------------                               #
+#                                                         #
+#   * Measure the bytes read and written by rows of       #
+#     the PointValue table                                #
+#                                                         #
+###########################################################
+
+
+""" Module which defines the CacheStatistics class, which describes how
+a computation of a phase portrait used its database or its cache of values:
+the values found (hits), in particular in the memo of the process (see
+the ValueMemo module), and computed (misses), the bytes read and written,
+the durations of the reads, of the decoding of the tiles, of the writes and
+of the computations, and the estimated duration saved by the values found,
+based on the measured cost of a computed value. When no value is computed,
+the last cost measured for the same function in the process is used.
+
+The statistics of a phase portrait are its statistics attribute (see
+the PhasePortrait module). The as_dict method gives a machine-readable
+record, and the summary method a text, which is written in the logs.
+"""
+
+
+# Counters of the caches, whose variations are recorded
+CACHE_COUNTERS = ('bytes_read', 'bytes_written', 'decode_duration')
+
+# Last measured costs of a value, in seconds, by identity of the function
+COSTS_OF_A_VALUE = {}
+
+
+class CacheStatistics(object):
+    """ Class which describes the use of a database or of a cache of values
+    by a computation. The sizes and durations which have not been measured
+    are None.
+
+    :attribute layout: String, "rows" or "tiles", or None when the values are
+                       not saved
+    :attribute identity: String, the identity of the function, or None
+    :attribute nb_of_values: int, the number of pixels of the grid
+    :attribute nb_of_hits: int, the number of values found in the database
+                           or in the memo
+    :attribute nb_of_memo_hits: int, the number of values found in the memo
+                                (see the ValueMemo module)
+    :attribute nb_of_misses: int, the number of values to compute
+    :attribute nb_of_saved_values: int, the number of values saved
+    :attribute bytes_read: int
+    :attribute bytes_written: int
+    :attribute read_duration: float, in seconds, the duration of the recovery
+                              of the values, decoding included
+    :attribute decode_duration: float, in seconds
+    :attribute write_duration: float, in seconds, the duration of
+                               the transactions of the writer
+    :attribute compute_duration: float, in seconds
+
+    >>> statistics = CacheStatistics("tiles", 100, "f")
+    >>> statistics.nb_of_misses = 40
+    >>> statistics.nb_of_hits = 60
+    >>> statistics.record_compute(2.0)
+    >>> statistics.cost_of_a_value(), statistics.saved_duration()
+    (0.05, 3.0)
+    >>> statistics.as_dict()['hit_ratio']
+    0.6
+    >>> statistics.summary().split(". ")[1]
+    'Read: 0.0s, compute: 2.0s, estimated saved: 3.0s'
+    >>> statistics = CacheStatistics("tiles", 100, "f")
+    >>> statistics.nb_of_hits = 100
+    >>> statistics.record_compute(0.0)
+    >>> statistics.saved_duration()
+    5.0
+    """
+
+    def __init__(self, layout, nb_of_values, identity=None):
+        """ Constructor of the class
+
+        :param layout: String, "rows" or "tiles", or None
+        :param nb_of_values: int, the number of pixels of the grid
+        :param identity: String, the identity of the function, or None
+        """
+        self.layout = layout
+        self.identity = identity
+        self.nb_of_values = nb_of_values
+        self.nb_of_hits = 0
+        self.nb_of_memo_hits = 0
+        self.nb_of_misses = 0
+        self.nb_of_saved_values = 0
+        self.bytes_read = None
+        self.bytes_written = None
+        self.read_duration = 0.0
+        self.decode_duration = None
+        self.write_duration = 0.0
+        self.compute_duration = 0.0
+
+    def record_cache(self, before, after):
+        """ Record the activity of a cache during the computation
+
+        :param before: dictionnary, the statistics of the cache (see its stats
+                       method) at the beginning of the computation
+        :param after: dictionnary, its statistics at the end
+        """
+        for key in CACHE_COUNTERS:
+            if key in before and key in after:
+                setattr(self, key, after[key] - before[key])
+
+    def record_writer(self, writer):
+        """ Record the activity of the writer of the computation
+
+        :param writer: TileWriter or BackgroundWriter object
+        """
+        self.nb_of_saved_values = getattr(writer, 'nb_of_saved_values',
+                                          getattr(writer, 'nb_of_saved_rows',
+                                                  0))
+        self.write_duration = sum(writer.flush_durations)
+
+    def record_compute(self, duration):
+        """ Record the duration of the computations, and the measured cost
+        of a value of the function
+
+        :param duration: float, in seconds
+        """
+        self.compute_duration = duration
+        if self.nb_of_misses and self.identity is not None:
+            COSTS_OF_A_VALUE[self.identity] = duration / self.nb_of_misses
+
+    def cost_of_a_value(self):
+        """ Give the measured cost of the computation of a value, or
+        the last one measured for the function if no value has been computed
+
+        :return value: float, in seconds, or None if it is unknown
+        """
+        if self.nb_of_misses == 0:
+            return COSTS_OF_A_VALUE.get(self.identity)
+        return self.compute_duration / self.nb_of_misses
+
+    def saved_duration(self):
+        """ Estimate the duration of the computation of the values found
+
+        :return value: float, in seconds, or None if it cannot be estimated
+        """
+        cost = self.cost_of_a_value()
+        return None if cost is None else cost * self.nb_of_hits
+
+    def hit_ratio(self):
+        """ Give the proportion of the values found
+
+        :return value: float
+        """
+        return self.nb_of_hits / max(self.nb_of_values, 1)
+
+    def as_dict(self):
+        """ Give a machine-readable record of the statistics
+
+        :return value: dictionnary
+        """
+        return {'layout': self.layout, 'values': self.nb_of_values,
+                'hits': self.nb_of_hits, 'memo_hits': self.nb_of_memo_hits,
+                'misses': self.nb_of_misses,
+                'hit_ratio': self.hit_ratio(),
+                'saved_values': self.nb_of_saved_values,
+                'bytes_read': self.bytes_read,
+                'bytes_written': self.bytes_written,
+                'read_duration': self.read_duration,
+                'decode_duration': self.decode_duration,
+                'write_duration': self.write_duration,
+                'compute_duration': self.compute_duration,
+                'cost_of_a_value': self.cost_of_a_value(),
+                'saved_duration': self.saved_duration()}
+
+    def summary(self):
+        """ Summarise the statistics in a text
+
+        :return value: String
+        """
+        def seconds(duration):
+            return str(int(duration * 1000) / 1000) + "s"
+        text = "Cache: " + str(self.nb_of_hits) + " hits, "
+        if self.nb_of_memo_hits:
+            text += "of which " + str(self.nb_of_memo_hits) + " in memory, "
+        text += (str(self.nb_of_misses) + " misses (" +
+                str(int(10000 * self.hit_ratio()) / 100) + "% found), " +
+                str(self.nb_of_saved_values) + " values saved. ")
+        if self.bytes_read is not None:
+            text += (str(self.bytes_read) + " bytes read, " +
+                     str(self.bytes_written) + " bytes written. ")
+        text += "Read: " + seconds(self.read_duration)
+        if self.decode_duration is not None:
+            text += " (decode: " + seconds(self.decode_duration) + ")"
+        if self.nb_of_saved_values:
+            text += ", write: " + seconds(self.write_duration)
+        text += ", compute: " + seconds(self.compute_duration)
+        saved = self.saved_duration()
+        if saved is not None:
+            text += ", estimated saved: " + seconds(saved)
+        return text + ". "
+
+
+if __name__ == '__main__':
+    from doctest import testmod
+    testmod()
@@ -0,0 +1,171 @@
+###########################################################
+# Module to check that several processes can share        #
+# a database or a cache of values, by rendering           #
+# overlapping windows at the same time                    #
+#                                                         #
+# Author: Olivier Bouillot                                #
+# Email: olivier.bouillot@u-pem.fr                        #
+# Creation Date: october 2026                             #
+#                                                         #
+# Modifications:                                          #
+# --------------                                          #
+#                                                         #
+#                                                         #
+# Next modifications to do:                               #
+# -------------------------                               #
+#                                                         #
+#                                                         #
+###########################################################
+
+
+import logging
+import sys
+from fractions import Fraction
+from multiprocessing import Pool
+from time import time
+from RiemannSphere import RiemannSphere
+from PhasePortrait import PhasePortrait
+
+
+""" Module which defines the stress_test function: nb_of_processes worker
+processes render, with the same database or cache, nb_of_windows windows
+which overlap, so that they read and write the same values at the same
+time. The values are then checked against a rendering without database, and
+the windows are rendered again from the database, to check that no value
+has been lost.
+
+The stress test is run by the command line:
+    python CacheStressTest.py database [nb_of_processes [nb_of_windows]]
+where database is the path of a SQLite database, or the URL of a cache
+(see the CacheBackends module).
+"""
+
+
+# Number of evaluations of stress_function in the current process
+NB_OF_EVALUATIONS = 0
+
+
+def stress_function(z):
+    """ Function rendered by the workers of the stress test """
+    global NB_OF_EVALUATIONS
+    NB_OF_EVALUATIONS += 1
+    return (z * z - 1) * (z + RiemannSphere(0, 1)).inverse()
+
+
+def silent_logger():
+    """ Create a logger which records nothing
+
+    :return value: logging.Logger
+    """
+    logger = logging.getLogger("CacheStressTest")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    return logger
+
+
+def window(k, resolution):
+    """ Compute the corners of the k-th window: two consecutive windows
+    overlap on half of their width
+
+    :param k: int
+    :param resolution: int
+    :return value: pair of RiemannSphere complex numbers
+    """
+    left = Fraction(k, 2)
+    return (RiemannSphere(left, 0), RiemannSphere(left + 1, 1))
+
+
+def render(arguments):
+    """ Render a window in a worker process
+
+    :param arguments: triplet (database, k, resolution)
+    :return value: tuple (k, values, error), where values is the dictionnary
+                   of the computed values, and error the representation of
+                   the raised exception, or None
+    """
+    database, k, resolution = arguments
+    left_below, right_upper = window(k, resolution)
+    try:
+        portrait = PhasePortrait(stress_function, left_below, right_upper,
+                                 resolution, database=database,
+                                 data_logger=silent_logger())
+        return (k, portrait.values, None)
+    except Exception as error:
+        return (k, {}, repr(error))
+
+
+def stress_test(database, nb_of_processes=4, nb_of_windows=8,
+                resolution=64):
+    """ Render overlapping windows with several processes sharing
+    a database or a cache, and check their values
+
+    :param database: String, the path of a SQLite database or the URL of
+                     a cache which can be shared by several processes
+    :param nb_of_processes: int, the number of worker processes
+    :param nb_of_windows: int, the number of rendered windows
+    :param resolution: int
+    :return value: dictionnary with the keys 'errors' (list of the errors
+                   raised in the workers), 'mismatches' (number of values
+                   different of the values computed without database),
+                   'missing' (number of values which are not in the database
+                   after the rendering), 'values' (number of checked
+                   values), 'duration' (in seconds)
+
+    >>> import os, tempfile
+    >>> directory = tempfile.mkdtemp()
+    >>> for database in (os.path.join(directory, "values.sqlite"),
+    ...                  "sqlite:" + os.path.join(directory, "tiles.sqlite"),
+    ...                  "npy:" + os.path.join(directory, "tiles")):
+    ...     for k in range(2):
+    ...         report = stress_test(database, 3, 6, 16)
+    ...         print(report['errors'], report['mismatches'],
+    ...               report['missing'], report['values'])
+    [] 0 0 1734
+    [] 0 0 1734
+    [] 0 0 1734
+    [] 0 0 1734
+    [] 0 0 1734
+    [] 0 0 1734
+    """
+    t_0 = time()
+    jobs = [(database, k, resolution) for k in range(nb_of_windows)]
+    with Pool(nb_of_processes) as pool:
+        results = pool.map(render, jobs)
+    duration = time() - t_0
+    errors = [error for (k, values, error) in results if error is not None]
+    mismatches = 0
+    nb_of_values = 0
+    for (k, values, error) in results:
+        left_below, right_upper = window(k, resolution)
+        expected = PhasePortrait(stress_function, left_below, right_upper,
+                                 resolution,
+                                 data_logger=silent_logger()).values
+        for pixel in expected:
+            nb_of_values += 1
+            value = values.get(pixel)
+            if value is None or value.is_infinite() != \
+                    expected[pixel].is_infinite():
+                mismatches += 1
+            elif not value.is_infinite() and \
+                    abs(value - expected[pixel]).real > 1e-12:
+                mismatches += 1
+    # Every value is recovered from the database, without any evaluation
+    global NB_OF_EVALUATIONS
+    NB_OF_EVALUATIONS = 0
+    for k in range(nb_of_windows):
+        left_below, right_upper = window(k, resolution)
+        PhasePortrait(stress_function, left_below, right_upper, resolution,
+                      database=database, data_logger=silent_logger(),
+                      compiled=False, vectorized=False)
+    return {'errors': errors, 'mismatches': mismatches,
+            'missing': NB_OF_EVALUATIONS, 'values': nb_of_values,
+            'duration': duration}
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        arguments = [sys.argv[1]] + [int(n) for n in sys.argv[2:4]]
+        print(stress_test(*arguments))
+    else:
+        from doctest import testmod
+        testmod()
@@ -0,0 +1,220 @@
+###########################################################
+# Module to maintain the databases and the caches of      #
+# values from the command line: statistics, eviction,     #
+# compaction and migration of the former databases        #
+#                                                         #
+# Author: Olivier Bouillot                                #
+# Email: olivier.bouillot@u-pem.fr                        #
+# Creation Date: october 2026                             #
+#                                                         #
+# Modifications:                                          #
+# --------------                                          #
+#                                                         #
+#                                                         #
+# Next modifications to do:                               #
+# -------------------------                               #
+#                                                         #
+#   * Evict the rows of the PointValue table              #
+#                                                         #
+###########################################################
+
+
+import os
+import sys
+import json
+import argparse
+import importlib
+from Database import connect, create_tables, find_function_id
+from Database import has_legacy_tables
+from CacheBackends import EVICTION_POLICIES, is_cache_url, open_cache
+from FunctionIdentity import function_identity
+
+
+""" Module which defines the maintenance commands of the databases and of
+the caches of values, which are run without any graphical interface by:
+    python CacheTool.py stats cache
+    python CacheTool.py evict cache max_bytes [--policy lru|cost]
+    python CacheTool.py compact cache
+    python CacheTool.py migrate database (--identity identity |
+                                          --function module:name
+                                          [--version version])
+where cache is the URL of a cache (see the CacheBackends module) or the path
+of a SQLite database. Each command prints its result as a JSON object.
+
+* stats describes the tiles of the cache.
+* evict evicts tiles until their size is at most max_bytes bytes, the least
+  recently used first (policy lru), or the least valuable first (policy
+  cost).
+* compact removes the unused data of the cache, and rebuilds the SQLite
+  databases.
+* migrate converts the Z and Value tables of a former database into
+  the PointValue table, keeping the last value of each point, under
+  the identity of a function, which has to be given: the given identity, or
+  the identity of the function name of the module module (see
+  the FunctionIdentity module).
+"""
+
+
+def cache_of(name):
+    """ Open a cache given by its URL, or by the path of a SQLite database
+
+    :param name: String
+    :return value: TileCache
+    """
+    return open_cache(name if is_cache_url(name) else "sqlite:" + name)
+
+
+def stats(name):
+    """ Describe the tiles of a cache
+
+    :param name: String, the URL of a cache or the path of a database
+    :return value: dictionnary
+
+    >>> stats("memory:CacheTool")['bytes']
+    0
+    """
+    cache = cache_of(name)
+    try:
+        result = cache.stats()
+        result['bytes'] = cache.size()
+        return result
+    finally:
+        cache.close()
+
+
+def evict(name, max_bytes, policy="lru"):
+    """ Evict tiles of a cache until their size is at most a budget
+
+    :param name: String, the URL of a cache or the path of a database
+    :param max_bytes: int, the budget in bytes
+    :param policy: String, in EVICTION_POLICIES
+    :return value: dictionnary with the keys 'tiles' (number of evicted
+                   tiles) and 'bytes' (their size)
+    """
+    cache = cache_of(name)
+    try:
+        nb_of_tiles, size = cache.evict(max_bytes, policy)
+        return {'tiles': nb_of_tiles, 'bytes': size}
+    finally:
+        cache.close()
+
+
+def compact(name):
+    """ Remove the unused data of a cache
+
+    :param name: String, the URL of a cache or the path of a database
+    :return value: dictionnary with the keys 'before' and 'after', the sizes
+                   in bytes of the cache
+    """
+    cache = cache_of(name)
+    try:
+        before, after = cache.compact()
+        return {'before': before, 'after': after}
+    finally:
+        cache.close()
+
+
+def load_function(name):
+    """ Import a function given by the name of its module and its name
+
+    :param name: String, "module:name", where the module is searched
+                 in the current directory too
+    :return value: function
+    """
+    if os.getcwd() not in sys.path:
+        sys.path.append(os.getcwd())
+    module, _, attributes = name.partition(":")
+    function = importlib.import_module(module)
+    for attribute in attributes.split("."):
+        function = getattr(function, attribute)
+    return function
+
+
+def migrate(path, identity):
+    """ Migrate the Z and Value tables of a former database under
+    the identity of a function
+
+    :param path: String, the path of the database
+    :param identity: String, the identity of the function
+    :return value: dictionnary with the keys 'migrated' (boolean) and
+                   'points' (number of points of the function)
+
+    >>> import os, sqlite3, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), "former.sqlite")
+    >>> connection = sqlite3.connect(path)
+    >>> connection.executescript('''
+    ...     CREATE TABLE Z(Id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ...                    multiplier INTEGER, real INTEGER,
+    ...                    imaginary INTEGER, infinite BOOLEAN);
+    ...     CREATE TABLE Value(Id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ...                        real FLOAT, imaginary FLOAT, infinite BOOLEAN);
+    ...     INSERT INTO Z(multiplier, real, imaginary, infinite)
+    ...     VALUES (1, 0, 0, 0), (1, 0, 0, 0);
+    ...     INSERT INTO Value(real, imaginary, infinite)
+    ...     VALUES (1.0, 0.0, 0), (1.0, 0.0, 0);''') and None
+    >>> connection.close()
+    >>> migrate(path, "f")
+    {'migrated': True, 'points': 1}
+    >>> migrate(path, "f")
+    {'migrated': False, 'points': 1}
+    """
+    connection = connect(path)
+    try:
+        cursor = connection.cursor()
+        migrated = has_legacy_tables(cursor)
+        create_tables(cursor, legacy_identity=identity)
+        connection.commit()
+        function_id = find_function_id(cursor, identity)
+        cursor.execute('''SELECT COUNT(*) FROM PointValue
+                          WHERE function = ?''', (function_id,))
+        return {'migrated': migrated, 'points': cursor.fetchone()[0]}
+    finally:
+        connection.close()
+
+
+def main(arguments):
+    """ Run a command
+
+    :param arguments: list of String, the arguments of the command line
+    :return value: dictionnary, the result of the command
+    """
+    parser = argparse.ArgumentParser(prog="CacheTool")
+    commands = parser.add_subparsers(dest="command", required=True)
+    command = commands.add_parser("stats")
+    command.add_argument("cache")
+    command = commands.add_parser("evict")
+    command.add_argument("cache")
+    command.add_argument("max_bytes", type=float)
+    command.add_argument("--policy", choices=EVICTION_POLICIES,
+                         default="lru")
+    command = commands.add_parser("compact")
+    command.add_argument("cache")
+    command = commands.add_parser("migrate")
+    command.add_argument("database")
+    identities = command.add_mutually_exclusive_group(required=True)
+    identities.add_argument("--identity")
+    identities.add_argument("--function")
+    command.add_argument("--version")
+    options = parser.parse_args(arguments)
+    if options.command == "stats":
+        return stats(options.cache)
+    if options.command == "evict":
+        return evict(options.cache, int(options.max_bytes), options.policy)
+    if options.command == "compact":
+        return compact(options.cache)
+    if options.version is not None and options.function is None:
+        command.error("argument --version: only allowed with argument " +
+                      "--function")
+    identity = options.identity
+    if options.function is not None:
+        identity = function_identity(load_function(options.function),
+                                     options.version)
+    return migrate(options.database, identity)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        print(json.dumps(main(sys.argv[1:])))
+    else:
+        from doctest import testmod
+        testmod()
@@ -0,0 +1,219 @@
+###########################################################
+# Module to save periodically the progress of a long      #
+# computation of a phase portrait, and to resume it       #
+#                                                         #
+# Author: Olivier Bouillot                                #
+# Email: olivier.bouillot@u-pem.fr                        #
+# Creation Date: october 2026                             #
+#                                                         #
+# Modifications:                                          #
+# --------------                                          #
+#                                                         #
+#                                                         #
+# Next modifications to do:                               #
+# -------------------------                               #
+#                                                         #
+#   * Checkpoint the computations whose values are kept   #
+#     in a dictionnary                                    #
+#                                                         #
+###########################################################
+
+
+import os
+import json
+import base64
+import hashlib
+from fractions import Fraction
+from time import time
+import numpy as np
+from ValueGrid import ValueGrid, STRIP_SIZE
+
+
+""" Module which defines the Checkpoint class, which saves the progress of
+the computation of a phase portrait in out-of-core mode (see the ValueGrid
+module and the checkpoint parameter of the PhasePortrait class):
+* the values are memory-mapped in a .npy file, the checkpoint file.
+* the bitmap of the blocks of STRIP_SIZE x STRIP_SIZE pixels whose values
+  have all been computed is saved in a .json file beside it, with the hash of
+  the parameters of the computation (see the parameters_hash function).
+The values are flushed to the disk, and then the bitmap is written
+atomically, at most every CHECKPOINT_INTERVAL seconds and when
+the computation stops, even if it is interrupted: the bitmap never describes
+values which are not on the disk.
+
+A computation with the same parameters resumes from the checkpoint, and only
+computes the blocks which are not done. A checkpoint written for other
+parameters is never used.
+"""
+
+
+# Minimal duration in seconds between two flushes of a checkpoint
+CHECKPOINT_INTERVAL = 60.0
+
+
+def parameters_hash(identity, left_below, right_upper, resolution, precision,
+                    backend):
+    """ Compute the hash of the parameters of the computation of a phase
+    portrait
+
+    :param identity: String, the identity of the function (see
+                     the FunctionIdentity module)
+    :param left_below: RiemannSphere complex number a + i c
+    :param right_upper: RiemannSphere complex number b + i d
+    :param resolution: the resolution of the grid
+    :param precision: int, the precision in bits of the values
+    :param backend: the backend of the NumberBackend module
+    :return value: String, an hexadecimal SHA-256 hash
+
+    >>> from RiemannSphere import RiemannSphere
+    >>> a, b = RiemannSphere(0, 0), RiemannSphere(1, 1)
+    >>> (parameters_hash("f", a, b, 10, 53, "float") ==
+    ...  parameters_hash("f", RiemannSphere(0.0, 0), b, 10, 53, "float"))
+    True
+    >>> (parameters_hash("f", a, b, 10, 53, "float") ==
+    ...  parameters_hash("f", a, b, 20, 53, "float"))
+    False
+    """
+    parameters = [identity] + \
+        [str(Fraction(t)) for t in (left_below.real, left_below.imaginary,
+                                    right_upper.real, right_upper.imaginary)] + \
+        [str(resolution), str(precision), str(backend)]
+    return hashlib.sha256("|".join(parameters).encode()).hexdigest()
+
+
+class Checkpoint(object):
+    """ Class of the checkpoint of a computation in out-of-core mode
+
+    :attribute path: String, the path of the .npy file of the values
+    :attribute parameters: String, the hash of the parameters of
+                           the computation
+    :attribute grid: ValueGrid, memory-mapped in the .npy file
+    :attribute done: NumPy array of booleans, whose element [k, l] indicates
+                     if the values of the block of pixels (i, j), for
+                     k * STRIP_SIZE <= i < (k + 1) * STRIP_SIZE and
+                     l * STRIP_SIZE <= j < (l + 1) * STRIP_SIZE, have been
+                     computed
+    :attribute interval: float, the minimal duration in seconds between two
+                         flushes
+    :attribute last_flush: float, the date of the last flush
+    :attribute resumed: boolean, which indicates if the checkpoint has been
+                        resumed
+
+    >>> import tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), "render.npy")
+    >>> checkpoint = Checkpoint(path, (300, 200), "hash")
+    >>> checkpoint.done.shape, checkpoint.resumed
+    ((2, 1), False)
+    >>> checkpoint.grid.array[:256] = 1j
+    >>> checkpoint.mark_done(0, 0)
+    >>> checkpoint.close()
+    >>> checkpoint = Checkpoint(path, (300, 200), "hash")
+    >>> checkpoint.resumed, checkpoint.is_done(0, 0), checkpoint.is_done(1, 0)
+    (True, True, False)
+    >>> complex(checkpoint.grid.array[255, 199])
+    1j
+    >>> checkpoint.close()
+    >>> try:
+    ...     Checkpoint(path, (300, 200), "other hash")
+    ... except ValueError as error:
+    ...     print(str(error).endswith("other parameters"))
+    True
+    """
+
+    def __init__(self, path, size, parameters, interval=CHECKPOINT_INTERVAL):
+        """ Constructor of the class, which resumes the checkpoint if it
+        exists, and creates it otherwise
+
+        :param path: String, the path of the .npy file of the values
+        :param size: pair of int, the numbers of columns and rows of the grid
+        :param parameters: String, the hash of the parameters of
+                           the computation
+        :param interval: float, the minimal duration in seconds between two
+                         flushes
+
+        :raised error: ValueError when the checkpoint exists, and has been
+                       written for other parameters
+        """
+        self.path = path
+        self.parameters = parameters
+        self.interval = interval
+        self.last_flush = time()
+        shape = (-(-size[0] // STRIP_SIZE), -(-size[1] // STRIP_SIZE))
+        metadata = self.read_metadata()
+        self.resumed = metadata is not None and os.path.isfile(path)
+        if self.resumed:
+            if metadata['parameters'] != parameters or \
+                    tuple(metadata['size']) != tuple(size):
+                raise ValueError("The checkpoint " + path + " has been " +
+                                 "written for other parameters")
+            self.grid = ValueGrid.open(path)
+            done = np.frombuffer(base64.b64decode(metadata['done']),
+                                 dtype=np.uint8)
+            self.done = np.unpackbits(done)[:shape[0] * shape[1]] \
+                .reshape(shape).astype(bool)
+        else:
+            self.grid = ValueGrid(size, path)
+            self.done = np.zeros(shape, dtype=bool)
+            self.flush()
+
+    def metadata_path(self):
+        """ Give the path of the .json file of the bitmap
+
+        :return value: String
+        """
+        return self.path + ".json"
+
+    def read_metadata(self):
+        """ Read the .json file of the bitmap
+
+        :return value: dictionnary, or None if the file does not exist
+        """
+        try:
+            with open(self.metadata_path()) as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return None
+
+    def is_done(self, k, l):
+        """ Check if a block has been computed
+
+        :param k: int, the index of the block along the columns
+        :param l: int, the index of the block along the rows
+        :return value: boolean
+        """
+        return bool(self.done[k, l])
+
+    def mark_done(self, k, l):
+        """ Record that a block has been computed, and flush the checkpoint
+        if the last flush is older than the interval
+
+        :param k: int, the index of the block along the columns
+        :param l: int, the index of the block along the rows
+        """
+        self.done[k, l] = True
+        if time() - self.last_flush >= self.interval:
+            self.flush()
+
+    def flush(self):
+        """ Write the values to the disk, and then the bitmap """
+        self.grid.flush()
+        metadata = {'parameters': self.parameters,
+                    'size': list(self.grid.size),
+                    'done': base64.b64encode(np.packbits(self.done)
+                                             .tobytes()).decode()}
+        temporary = self.metadata_path() + ".tmp"
+        with open(temporary, "w") as file:
+            json.dump(metadata, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.metadata_path())
+        self.last_flush = time()
+
+    def close(self):
+        """ Flush the checkpoint """
+        self.flush()
+
+
+if __name__ == '__main__':
+    from doctest import testmod
+    testmod()
@@ -9,6 +9,11 @@
 # --------------                                         #
 #                                                        #
 # 12/03/2020 Modifies docstring and doctest              #
+# 10/2026    Splits RGB into HSL and HSL_to_RGB, so that #
+#            colors of a whole range of lightness can be #
+#            computed without RiemannSphere numbers      #
+# 10/2026    Adds RGB_array, which computes the colors   #
+#            of a NumPy array of complex numbers         #
 #                                                        #
 # Next modifications to do:                              #
 # -------------------------                              #
@@ -16,7 +21,8 @@
 #                                                        #
 ##########################################################
 
-from math import pi, ceil, log
+from math import pi, ceil, log, isinf
+import numpy as np
 from RiemannSphere import RiemannSphere
 
 
@@ -44,6 +50,31 @@ def approx(f):
         return int(f) - 1
 
 
+def lightness_of_modulus(r):
+    """ Compute the lightness associated to a modulus r >= 0:
+
+    lightness = ln(r) / (1 + |ln(r)|) / 2 + 1 / 2
+
+    The lightness is an increasing function of the modulus.
+
+    :param r: int or float
+    :return value: float, included in [0 ; 1]
+
+    >>> lightness_of_modulus(0)
+    0
+    >>> lightness_of_modulus(1)
+    0.5
+    >>> lightness_of_modulus(float('Inf'))
+    1
+    """
+    if r == 0:
+        return 0
+    if isinf(r):
+        return 1
+    logarithm = log(r)
+    return (logarithm / (1 + abs(logarithm)) + 1) / 2
+
+
 def HSL(z):
     """ Compute the HSL, hue, saturation, lightness associated
     to the complex number z via the following bijection:
@@ -129,12 +160,7 @@ def HSL(z):
                 hue += 360
             hue = approx(hue)
             saturation = 1
-            r = abs(z)
-            if r == 0:
-                lightness = 0
-            else:
-                logarithm = log(r)
-                lightness = (logarithm / (1 + abs(logarithm)) + 1) / 2
+            lightness = lightness_of_modulus(abs(z))
         return approx(hue), saturation, lightness
     else:
         raise ValueError("HSL ne s'applique que sur un complexe de la sphere" +
@@ -180,7 +206,27 @@ def RGB(z):
     >>> rgb_6[0] == 0 and rgb_6[1] == 255 and rgb_6[2] == 255
     True
     """
-    hue, saturation, lightness = HSL(z)
+    return HSL_to_RGB(*HSL(z))
+
+
+def HSL_to_RGB(hue, saturation, lightness):
+    """ Compute the RGB components associated to HSL components.
+
+    For a fixed hue and saturation, each RGB component is a non decreasing
+    function of the lightness.
+
+    :param hue: int, included in [0 ; 360]
+    :param saturation: int or float, included in [0 ; 1]
+    :param lightness: int or float, included in [0 ; 1]
+    :return value: a triplet composed by (R, G, B)
+
+    >>> HSL_to_RGB(0, 1, 0.5)
+    (255, 0, 0)
+    >>> HSL_to_RGB(180, 1, 0.5)
+    (0, 255, 255)
+    >>> HSL_to_RGB(0, 1, 1)
+    (255, 255, 255)
+    """
     C = (1 - abs(2 * lightness - 1)) * saturation
     hue_prime = hue / 60
     X = C * (1 - abs(hue_prime % 2 - 1))
@@ -198,13 +244,82 @@ def RGB(z):
     elif ceil(hue_prime) == 6:
         r_tmp, g_tmp, b_tmp = C, 0, X
     else:
-        print("Probleme at z = ", z, "H' = ", hue_prime)
+        print("Probleme at H' = ", hue_prime)
         r_tmp, g_tmp, b_tmp = 0, 0, 0
     r = approx((r_tmp + m) * 255)
     g = approx((g_tmp + m) * 255)
     b = approx((b_tmp + m) * 255)
     return (r, g, b)
 
+def approx_array(f):
+    """ Approxime the float numbers of an array to the nearest integers,
+    as the approx function
+
+    :param f: NumPy array of floats
+    :return value: NumPy array of floats, whose values are integers
+
+    >>> approx_array(np.array([2.1, 2.51, -2.49, -2.51, 2.5]))
+    array([ 2.,  3., -2., -3.,  2.])
+    """
+    truncated = np.trunc(f)
+    return np.where(np.abs(f - truncated) <= 1/2, truncated,
+                    truncated + np.sign(f))
+
+
+def RGB_array(values):
+    """ Compute the RGB components associated to the complex numbers of
+    a NumPy array, as the RGB function. The infinite complex number is
+    represented by an infinite real or imaginary part, and the complex
+    numbers with a NaN component, which have no value, are white.
+
+    :param values: NumPy array of complex numbers
+    :return value: NumPy array of uint8, whose shape is the shape of values
+                   followed by 3
+
+    >>> values = np.array([1, 1.92211 + 1.92211j, -6.39911 + 3.69453j,
+    ...                    -0.1839397 - 0.318593j, 0.117204 - 0.067668j, -1,
+    ...                    0, complex('inf'), complex('nan')])
+    >>> colors = [RGB(RiemannSphere(z.real, z.imag)) for z in values[:-2]]
+    >>> ([tuple(rgb) for rgb in RGB_array(values).tolist()] ==
+    ...  colors + [(255, 255, 255), (255, 255, 255)])
+    True
+    """
+    values = np.asarray(values, dtype=complex)
+    real, imaginary = values.real, values.imag
+    with np.errstate(all='ignore'):
+        infinite = np.isinf(real) | np.isinf(imaginary)
+        missing = ~infinite & (np.isnan(real) | np.isnan(imaginary))
+        null = (real == 0) & (imaginary == 0)
+        # Argument, as the argument method of the RiemannSphere class
+        atan = np.arctan(imaginary / real)
+        argument = np.where(real > 0, atan,
+                            np.where(imaginary >= 0, pi + atan, -pi + atan))
+        argument = np.where(real == 0, np.where(imaginary > 0, pi / 2,
+                                                -pi / 2), argument)
+        hue = argument * 180 / pi
+        hue = approx_array(np.where(hue <= 0, hue + 360, hue))
+        logarithm = np.log(np.sqrt(real ** 2 + imaginary ** 2))
+        lightness = (logarithm / (1 + np.abs(logarithm)) + 1) / 2
+    special = null | infinite | missing
+    hue = np.where(special, 0, hue)
+    lightness = np.where(null, 0, np.where(infinite | missing, 1, lightness))
+    # HSL_to_RGB, with a saturation equal to 1
+    C = 1 - np.abs(2 * lightness - 1)
+    hue_prime = hue / 60
+    X = C * (1 - np.abs(hue_prime % 2 - 1))
+    m = lightness - C / 2
+    sector = np.maximum(np.ceil(hue_prime), 1)
+    zero = np.zeros_like(C)
+    components = []
+    for sectors in (((1, C), (2, X), (5, X), (6, C)),
+                    ((1, X), (2, C), (3, C), (4, X)),
+                    ((3, X), (4, C), (5, C), (6, X))):
+        component = zero
+        for (k, value) in sectors:
+            component = np.where(sector == k, value, component)
+        components.append(approx_array((component + m) * 255))
+    return np.stack(components, axis=-1).astype(np.uint8)
+
 
 if __name__ == '__main__':
     from doctest import testmod
@@ -0,0 +1,939 @@
+###########################################################
+# Module to define the schema of the SQLite databases     #
+# where the values of the functions whose phase portrait  #
+# are drawn are saved                                     #
+#                                                         #
+# Author: Olivier Bouillot                                #
+# Email: olivier.bouillot@u-pem.fr                        #
+# Creation Date: october 2026                             #
+#                                                         #
+# Modifications:                                          #
+# --------------                                          #
+#                                                         #
+# 10/2026    Key the values by the identity of the        #
+#            function (schema version 2)                  #
+# 10/2026    Record the precision and the algorithm of    #
+#            the saved values (schema version 3)          #
+# 10/2026    Add the ValueTile table of the TileStore     #
+#            module (schema version 4)                    #
+# 10/2026    Wait for the locks of the other processes,   #
+#            and take the write lock at the beginning of  #
+#            the transactions which read then write       #
+# 10/2026    Open the databases in read-only mode         #
+# 10/2026    Record the date of the last access and       #
+#            the cost of the tiles (schema version 5),    #
+#            migrate the former Z and Value tables, and   #
+#            compact the databases                        #
+#                                                         #
+# Next modifications to do:                               #
+# -------------------------                               #
+#                                                         #
+#                                                         #
+###########################################################
+
+
+import os
+from math import gcd, ceil, floor
+import sqlite3
+from urllib.request import pathname2url
+from queue import Queue
+from threading import Thread
+from time import time
+from fractions import Fraction
+from RiemannSphere import RiemannSphere, INFTY
+
+
+""" Module which defines the schema of the databases of saved values.
+
+A point x + i y of a grid, where x and y are Fractions, is identified by its
+lattice coordinates (multiplier, real, imaginary): multiplier is the least
+common multiple of the denominators of x and y, and x = real / multiplier,
+y = imaginary / multiplier. These coordinates are the composite primary key
+of the PointValue table, which is a WITHOUT ROWID table: a point is looked up
+in the primary key index, which also contains its value.
+
+Several functions can share a database: the Function table associates an
+integer id to the identity of each function (see the FunctionIdentity module),
+and this id is the first column of the primary key of the PointValue table.
+The values of a function are then never mixed with the values of an other
+one, nor with the values of a former version of the function.
+
+The values saved by the computations of the same precision and algorithm
+form a block, described by a row of the Provenance table: the precision in
+bits of the computation, the algorithm (for instance the backend) and the date
+of its first computation. A computation
+recovers the values computed with at least its precision, and recomputes the
+others: the values of a fast preview at a low precision are upgraded
+incrementally.
+
+The ValueTile table contains the values saved by tiles, as compressed BLOBs
+(see the TileStore module), which is an alternative to the PointValue table
+for the grids aligned on the lattice of their resolution. The date of
+the last access of a tile and the estimated cost in seconds of the
+computation of its values are used to evict the tiles of a cache whose size
+exceeds its budget (see the CacheBackends module).
+
+The SchemaVersion table contains the version of the schema of the database.
+The databases of version 1, without Function table, and of version 2, without
+Provenance table, are migrated: their values are kept in a block of
+FLOAT_PRECISION bits, of unknown algorithm, and the values of a database of
+version 1 are kept under the empty identity, which is the identity of no
+function. The databases of version 4 get the columns accessed and cost of
+the ValueTile table.
+
+The former databases, without version, kept the points in the Z table and
+their values in the Value table, associated by their Id, and the values of
+the points which had been computed several times in several rows. They are
+migrated in the same way as the databases of version 1: the last value of
+each point is kept, under the identity of a function, which has to be given
+(see the create_tables function). A former database is migrated under
+the identity of the function whose phase portrait is computed with it, or by
+the migrate command of the CacheTool module ; it is left as it is otherwise.
+
+This module defines:
+* the SCHEMA_VERSION constant.
+* the create_tables and schema_version functions, and the migrate_legacy
+  function, which migrates the Z and Value tables.
+* the compact_database function, which removes the unused rows and rebuilds
+  a database.
+* the find_function_id and register_function functions, which give the id
+  of a function identity.
+* the register_provenance function, which describes a new block of values.
+* the lattice_key, value_row and value_of_row functions, which convert
+  points and values into rows of the PointValue table, and conversely.
+* the has_tables, divisors and range_queries functions, which allow to
+  recover the values of a grid with range queries on the lattice
+  coordinates, without writing anything in the database.
+* the connect function, which opens a database in WAL journal mode, and
+  the begin_write function, which begins a transaction holding the write
+  lock. Several processes can then share a database: the readers never
+  wait, and the writers wait for each other at most BUSY_TIMEOUT seconds.
+* the ValueWriter class, which buffers the rows to save in a database,
+  and writes them with executemany in a single transaction.
+* the BackgroundWriter class, which writes the buffered rows in a dedicated
+  thread, fed by a bounded queue.
+"""
+
+
+SCHEMA_VERSION = 5
+
+# Oldest version of the schema whose ValueTile table can be read
+TILE_SCHEMA_VERSION = 4
+
+# Precision, in bits, of the values saved before the Provenance table existed
+FLOAT_PRECISION = 53
+
+CREATE_SCHEMA_VERSION = '''CREATE TABLE IF NOT EXISTS SchemaVersion(
+                               version INTEGER NOT NULL);'''
+
+CREATE_FUNCTION = '''CREATE TABLE IF NOT EXISTS Function(
+                         id INTEGER PRIMARY KEY,
+                         identity TEXT NOT NULL UNIQUE);'''
+
+CREATE_PROVENANCE = '''CREATE TABLE IF NOT EXISTS Provenance(
+                           id INTEGER PRIMARY KEY,
+                           precision INTEGER NOT NULL,
+                           algorithm TEXT NOT NULL,
+                           timestamp FLOAT NOT NULL);'''
+
+CREATE_POINT_VALUE = '''CREATE TABLE IF NOT EXISTS PointValue(
+                            function INTEGER NOT NULL,
+                            multiplier INTEGER NOT NULL,
+                            real INTEGER NOT NULL,
+                            imaginary INTEGER NOT NULL,
+                            value_real FLOAT,
+                            value_imaginary FLOAT,
+                            infinite BOOLEAN NOT NULL,
+                            provenance INTEGER,
+                            PRIMARY KEY (function, multiplier,
+                                         real, imaginary)
+                        ) WITHOUT ROWID;'''
+
+# The tiles are larger than a page of the database: they are not saved
+# in a WITHOUT ROWID table, whose rows have to be small
+CREATE_VALUE_TILE = '''CREATE TABLE IF NOT EXISTS ValueTile(
+                           function INTEGER NOT NULL,
+                           resolution INTEGER NOT NULL,
+                           tile_x INTEGER NOT NULL,
+                           tile_y INTEGER NOT NULL,
+                           provenance INTEGER,
+                           presence BLOB NOT NULL,
+                           data BLOB NOT NULL,
+                           accessed FLOAT,
+                           cost FLOAT,
+                           PRIMARY KEY (function, resolution, tile_x, tile_y)
+                       );'''
+
+MIGRATE_POINT_VALUE_1 = '''INSERT INTO PointValue
+                           SELECT ?, multiplier, real, imaginary,
+                                  value_real, value_imaginary, infinite, ?
+                           FROM PointValue_1'''
+
+# The last value of a point of the Z table is the value of the largest Id
+MIGRATE_LEGACY = '''INSERT OR REPLACE INTO PointValue
+                    SELECT ?, Z.multiplier, Z.real, Z.imaginary,
+                           Value.real, Value.imaginary, Value.infinite, ?
+                    FROM Z JOIN Value ON Z.Id = Value.Id
+                    ORDER BY Z.Id'''
+
+SELECT_RANGE = '''SELECT real, imaginary,
+                         value_real, value_imaginary, infinite
+                  FROM PointValue JOIN Provenance
+                    ON Provenance.id = PointValue.provenance
+                  WHERE function = ?
+                    AND multiplier = ?
+                    AND real BETWEEN ? AND ?
+                    AND imaginary BETWEEN ? AND ?
+                    AND precision >= ?'''
+
+# Size of the pages of the created databases
+PAGE_SIZE = 4096
+
+# Maximal duration, in seconds, of the wait for the lock of an other process
+BUSY_TIMEOUT = 60
+
+# Number of rows saved at once by a ValueWriter
+BUFFER_SIZE = 50000
+
+# Number of buffers which can wait in the queue of a BackgroundWriter
+QUEUE_SIZE = 8
+
+# Number of rows fetched at once by a range query
+FETCH_SIZE = 4096
+
+# Bound of the trial divisions used to factorise integers
+TRIAL_DIVISION_BOUND = 10 ** 6
+
+INSERT_POINT_VALUE = '''INSERT OR REPLACE
+                        INTO PointValue(function, multiplier, real, imaginary,
+                                        value_real, value_imaginary, infinite,
+                                        provenance)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)'''
+
+
+def connect(path, timeout=BUSY_TIMEOUT, read_only=False, immutable=False):
+    """ Open a database, in WAL journal mode: the writes are appended to
+    a write-ahead log, and the synchronisations with the disk only occur at
+    checkpoints (synchronous NORMAL mode). The readers do not wait for
+    the writers, and a writer waits for the lock of an other writer.
+
+    A database opened in read-only mode is neither created nor modified, so
+    that its file may be read-only. An immutable database is read without
+    any lock, which suits a database shared on a network filesystem, but it
+    must not be modified while it is opened
+
+    :param path: String, the path of the database
+    :param timeout: float, the maximal duration in seconds of the wait for
+                    the lock of an other process
+    :param read_only: boolean
+    :param immutable: boolean, which implies read_only
+    :return value: Connection object
+
+    :raised error: sqlite3.OperationalError when a database opened in
+                   read-only mode does not exist
+
+    >>> import tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), "values.sqlite")
+    >>> connect(path).close()
+    >>> connection = connect(path, immutable=True)
+    >>> connection.execute("CREATE TABLE T(x)")
+    Traceback (most recent call last):
+    ...
+    sqlite3.OperationalError: attempt to write a readonly database
+    """
+    if read_only or immutable:
+        uri = "file:" + pathname2url(os.path.abspath(path)) + "?mode=ro"
+        if immutable:
+            uri += "&immutable=1"
+        return sqlite3.connect(uri, timeout=timeout, uri=True)
+    connection = sqlite3.connect(path, timeout=timeout)
+    connection.execute('''PRAGMA page_size = ''' + str(PAGE_SIZE))
+    connection.execute('''PRAGMA journal_mode = WAL''')
+    connection.execute('''PRAGMA synchronous = NORMAL''')
+    return connection
+
+
+def begin_write(connection):
+    """ Begin a transaction which takes the write lock at once, if no
+    transaction is in progress. A transaction which reads, and then writes,
+    could otherwise fail with a "database is locked" error when an other
+    process writes in the meantime
+
+    :param connection: Connection object
+    """
+    if not connection.in_transaction:
+        connection.execute('''BEGIN IMMEDIATE''')
+
+
+def create_tables(cursor, legacy_identity=None):
+    """ Create the tables of a database, if they do not exist, and migrate
+    the tables of a database of a previous version, in a transaction
+    holding the write lock, which has to be committed
+
+    :param cursor: Cursor object, connected to a sqlite3 database
+    :param legacy_identity: String, the identity of the function whose values
+                            are kept in the Z and Value tables of a former
+                            database, if any, or None: the Z and Value tables
+                            are then left as they are
+
+    :raised error: ValueError if the database has been created with a more
+                   recent version of the schema
+
+    >>> import sqlite3
+    >>> cursor = sqlite3.connect(":memory:").cursor()
+    >>> create_tables(cursor)
+    >>> create_tables(cursor)
+    >>> schema_version(cursor)
+    5
+    """
+    begin_write(cursor.connection)
+    cursor.execute(CREATE_SCHEMA_VERSION)
+    version = schema_version(cursor)
+    if version is not None and version > SCHEMA_VERSION:
+        raise ValueError("The database has been created with the version " +
+                         str(version) + " of the schema, only the versions " +
+                         "up to " + str(SCHEMA_VERSION) + " are known")
+    if version == 1:
+        migrate_version_1(cursor)
+    elif version == 2:
+        migrate_version_2(cursor)
+    elif version == 4:
+        migrate_version_4(cursor)
+    elif version is None:
+        cursor.execute('''INSERT INTO SchemaVersion(version) VALUES (?)''',
+                       (SCHEMA_VERSION,))
+    cursor.execute(CREATE_FUNCTION)
+    cursor.execute(CREATE_PROVENANCE)
+    cursor.execute(CREATE_POINT_VALUE)
+    cursor.execute(CREATE_VALUE_TILE)
+    if legacy_identity is not None and has_legacy_tables(cursor):
+        migrate_legacy(cursor, legacy_identity)
+    if version is not None and version < SCHEMA_VERSION:
+        cursor.execute('''UPDATE SchemaVersion SET version = ?''',
+                       (SCHEMA_VERSION,))
+
+
+def migrate_version_1(cursor):
+    """ Migrate the tables of a database of version 1: the saved values
+    are kept under the empty identity, in a block of FLOAT_PRECISION bits
+
+    :param cursor: Cursor object, connected to a sqlite3 database of version 1
+
+    >>> import sqlite3
+    >>> cursor = sqlite3.connect(":memory:").cursor()
+    >>> cursor.executescript('''
+    ...     CREATE TABLE SchemaVersion(version INTEGER NOT NULL);
+    ...     INSERT INTO SchemaVersion(version) VALUES (1);
+    ...     CREATE TABLE PointValue(multiplier, real, imaginary,
+    ...                             value_real, value_imaginary, infinite);
+    ...     INSERT INTO PointValue VALUES (1, 0, 0, 1.0, 2.0, 0);''') and None
+    >>> create_tables(cursor)
+    >>> schema_version(cursor)
+    5
+    >>> cursor.execute("SELECT * FROM PointValue").fetchall()
+    [(1, 1, 0, 0, 1.0, 2.0, 0, 1)]
+    """
+    cursor.execute('''ALTER TABLE PointValue RENAME TO PointValue_1''')
+    cursor.execute(CREATE_FUNCTION)
+    cursor.execute(CREATE_PROVENANCE)
+    cursor.execute(CREATE_POINT_VALUE)
+    provenance_id = register_provenance(cursor, FLOAT_PRECISION, "unknown", 0)
+    cursor.execute(MIGRATE_POINT_VALUE_1, (register_function(cursor, ""),
+                                           provenance_id))
+    cursor.execute('''DROP TABLE PointValue_1''')
+
+
+def migrate_version_2(cursor):
+    """ Migrate the tables of a database of version 2: the saved values
+    are kept in a block of FLOAT_PRECISION bits
+
+    :param cursor: Cursor object, connected to a sqlite3 database of version 2
+    """
+    cursor.execute('''ALTER TABLE PointValue
+                      ADD COLUMN provenance INTEGER''')
+    cursor.execute(CREATE_PROVENANCE)
+    provenance_id = register_provenance(cursor, FLOAT_PRECISION, "unknown", 0)
+    cursor.execute('''UPDATE PointValue SET provenance = ?''',
+                   (provenance_id,))
+
+
+def migrate_version_4(cursor):
+    """ Migrate the tables of a database of version 4: the tiles get
+    the columns accessed and cost, which are unknown
+
+    :param cursor: Cursor object, connected to a sqlite3 database of version 4
+    """
+    cursor.execute('''ALTER TABLE ValueTile ADD COLUMN accessed FLOAT''')
+    cursor.execute('''ALTER TABLE ValueTile ADD COLUMN cost FLOAT''')
+
+
+def has_legacy_tables(cursor):
+    """ Check if a database has the Z and Value tables of the former
+    databases
+
+    :param cursor: Cursor object, connected to a sqlite3 database
+    :return value: boolean
+    """
+    cursor.execute('''SELECT COUNT(*) FROM sqlite_master
+                      WHERE type = 'table' AND name IN ('Z', 'Value')''')
+    return cursor.fetchone()[0] == 2
+
+
+def migrate_legacy(cursor, identity):
+    """ Migrate the Z and Value tables of a former database into
+    the PointValue table, under the identity of a function, in a block of
+    FLOAT_PRECISION bits: only the last value of each point is kept. The Z and
+    Value tables are then dropped. The tables of the current version have to
+    be created
+
+    :param cursor: Cursor object, connected to a sqlite3 database
+    :param identity: String, the identity of the function whose values are
+                     kept in the Z and Value tables
+    :return value: int, the number of migrated points
+
+    >>> import sqlite3
+    >>> cursor = sqlite3.connect(":memory:").cursor()
+    >>> cursor.executescript('''
+    ...     CREATE TABLE Z(Id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ...                    multiplier INTEGER, real INTEGER,
+    ...                    imaginary INTEGER, infinite BOOLEAN);
+    ...     CREATE TABLE Value(Id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ...                        real FLOAT, imaginary FLOAT, infinite BOOLEAN);
+    ...     INSERT INTO Z(multiplier, real, imaginary, infinite)
+    ...     VALUES (2, 1, 0, 0), (2, 1, 0, 0), (1, 1, 1, 0);
+    ...     INSERT INTO Value(real, imaginary, infinite)
+    ...     VALUES (1.0, 0.0, 0), (2.0, 0.0, 0), (0.0, 0.0, 1);''') and None
+    >>> create_tables(cursor)
+    >>> has_legacy_tables(cursor)
+    True
+    >>> create_tables(cursor, legacy_identity="f")
+    >>> cursor.execute('''SELECT function, multiplier, real, imaginary,
+    ...                          value_real, infinite
+    ...                   FROM PointValue''').fetchall()
+    [(1, 1, 1, 1, 0.0, 1), (1, 2, 1, 0, 2.0, 0)]
+    >>> has_legacy_tables(cursor), find_function_id(cursor, "f")
+    (False, 1)
+    """
+    provenance_id = register_provenance(cursor, FLOAT_PRECISION, "unknown", 0)
+    cursor.execute(MIGRATE_LEGACY, (register_function(cursor, identity),
+                                    provenance_id))
+    nb_of_points = cursor.execute('''SELECT COUNT(*) FROM PointValue
+                                     WHERE provenance = ?''',
+                                  (provenance_id,)).fetchone()[0]
+    cursor.execute('''DROP TABLE Z''')
+    cursor.execute('''DROP TABLE Value''')
+    return nb_of_points
+
+
+def compact_database(connection):
+    """ Compact a database: remove the blocks of values and the functions
+    which have no value anymore, and rebuild the file of the database,
+    which then only contains its rows
+
+    :param connection: Connection object, connected to a sqlite3 database
+                       whose tables have been created, outside a transaction
+    :return value: pair of int, the sizes in bytes of the database before
+                   and after the compaction
+
+    >>> connection = sqlite3.connect(":memory:")
+    >>> create_tables(connection.cursor())
+    >>> register_provenance(connection.cursor(), 53, "float")
+    1
+    >>> connection.commit()
+    >>> before, after = compact_database(connection)
+    >>> connection.execute("SELECT COUNT(*) FROM Provenance").fetchone()
+    (0,)
+    """
+    cursor = connection.cursor()
+    before = database_size(cursor)
+    begin_write(connection)
+    cursor.execute('''DELETE FROM Provenance
+                      WHERE id NOT IN (SELECT provenance FROM PointValue
+                                       WHERE provenance IS NOT NULL)
+                        AND id NOT IN (SELECT provenance FROM ValueTile
+                                       WHERE provenance IS NOT NULL)''')
+    cursor.execute('''DELETE FROM Function
+                      WHERE id NOT IN (SELECT function FROM PointValue)
+                        AND id NOT IN (SELECT function FROM ValueTile)''')
+    connection.commit()
+    cursor.execute('''VACUUM''')
+    cursor.execute('''PRAGMA wal_checkpoint(TRUNCATE)''')
+    return (before, database_size(cursor))
+
+
+def database_size(cursor):
+    """ Compute the size of a database, without its write-ahead log
+
+    :param cursor: Cursor object, connected to a sqlite3 database
+    :return value: int, the size in bytes
+    """
+    page_count = cursor.execute('''PRAGMA page_count''').fetchone()[0]
+    page_size = cursor.execute('''PRAGMA page_size''').fetchone()[0]
+    return page_count * page_size
+
+
+def find_function_id(cursor, identity):
+    """ Find, without writing anything, the id of a function identity
+
+    :param cursor: Cursor object, connected to a sqlite3 database whose
+                   tables have been created
+    :param identity: String, the identity of a function
+    :return value: int, or None if the identity is unknown
+    """
+    cursor.execute('''SELECT id FROM Function WHERE identity = ?''',
+                   (identity,))
+    row = cursor.fetchone()
+    return None if row is None else row[0]
+
+
+def register_function(cursor, identity):
+    """ Give the id of a function identity, which is registered if it is
+    unknown
+
+    :param cursor: Cursor object, connected to a sqlite3 database whose
+                   tables have been created
+    :param identity: String, the identity of a function
+    :return value: int
+
+    >>> import sqlite3
+    >>> cursor = sqlite3.connect(":memory:").cursor()
+    >>> create_tables(cursor)
+    >>> register_function(cursor, "f"), register_function(cursor, "g")
+    (1, 2)
+    >>> register_function(cursor, "f"), find_function_id(cursor, "h")
+    (1, None)
+    """
+    cursor.execute('''INSERT OR IGNORE INTO Function(identity) VALUES (?)''',
+                   (identity,))
+    return find_function_id(cursor, identity)
+
+
+def register_provenance(cursor, precision, algorithm, timestamp=None):
+    """ Give the id of the block of values of a precision and an algorithm
+    in the Provenance table, which is described if it does not exist yet: its
+    date is the date of its first computation. A block imported with its date
+    is only shared with the blocks of the same date
+
+    :param cursor: Cursor object, connected to a sqlite3 database whose
+                   tables have been created
+    :param precision: int, the precision in bits of the computation
+                      of the values
+    :param algorithm: String, the algorithm used to compute the values
+    :param timestamp: float, the date of the computation in seconds since
+                      the Epoch, or None for a new computation, at
+                      the current date
+    :return value: int, the id of the block
+
+    >>> import sqlite3
+    >>> cursor = sqlite3.connect(":memory:").cursor()
+    >>> create_tables(cursor)
+    >>> register_provenance(cursor, 53, "float", 0)
+    1
+    >>> register_provenance(cursor, 53, "float"), register_provenance(
+    ...     cursor, 64, "mpmath"), register_provenance(cursor, 53, "float", 1)
+    (1, 2, 3)
+    >>> cursor.execute("SELECT * FROM Provenance").fetchall()[0]
+    (1, 53, 'float', 0.0)
+    """
+    if timestamp is None:
+        cursor.execute('''SELECT id FROM Provenance
+                          WHERE precision = ? AND algorithm = ?
+                          ORDER BY id LIMIT 1''', (precision, algorithm))
+    else:
+        cursor.execute('''SELECT id FROM Provenance
+                          WHERE precision = ? AND algorithm = ?
+                          AND timestamp = ?
+                          ORDER BY id LIMIT 1''',
+                       (precision, algorithm, timestamp))
+    row = cursor.fetchone()
+    if row is not None:
+        return row[0]
+    if timestamp is None:
+        timestamp = time()
+    cursor.execute('''INSERT INTO Provenance(precision, algorithm, timestamp)
+                      VALUES (?, ?, ?)''', (precision, algorithm, timestamp))
+    return cursor.lastrowid
+
+
+def has_tables(cursor, oldest=SCHEMA_VERSION):
+    """ Check, without writing anything, if the tables of a database exist,
+    in the current version of the schema, or in a version which can be read
+
+    :param cursor: Cursor object, connected to a sqlite3 database
+    :param oldest: int, the oldest version of the schema which can be read
+    :return value: boolean
+    """
+    cursor.execute('''SELECT COUNT(*) FROM sqlite_master
+                      WHERE type = 'table' AND name = 'SchemaVersion' ''')
+    if cursor.fetchone()[0] == 0:
+        return False
+    version = schema_version(cursor)
+    return version is not None and oldest <= version <= SCHEMA_VERSION
+
+
+def schema_version(cursor):
+    """ Return the version of the schema of a database
+
+    :param cursor: Cursor object, connected to a sqlite3 database
+    :return value: int, or None if the database has no version
+    """
+    cursor.execute('''SELECT MAX(version) FROM SchemaVersion''')
+    return cursor.fetchone()[0]
+
+
+def lattice_key(x, y):
+    """ Compute the lattice coordinates of the point x + i y
+
+    :param x: Fraction or int
+    :param y: Fraction or int
+    :return value: triplet of int (multiplier, real, imaginary)
+
+    >>> from fractions import Fraction
+    >>> lattice_key(Fraction(1, 2), Fraction(-1, 3))
+    (6, 3, -2)
+    >>> lattice_key(1, Fraction(4, 2))
+    (1, 1, 2)
+    """
+    den_x = x.denominator
+    den_y = y.denominator
+    multiplier = den_x * den_y // gcd(den_x, den_y)
+    return (multiplier, x.numerator * (multiplier // den_x),
+            y.numerator * (multiplier // den_y))
+
+
+class ValueWriter(object):
+    """ Class that buffers the rows to save in the PointValue table of
+    a database: they are written with executemany, in a single transaction,
+    once there are buffer_size of them, or when the writer is flushed
+
+    :attribute connection: Connection object
+    :attribute buffer_size: int
+    :attribute rows: list of the buffered rows
+    :attribute nb_of_saved_rows: int
+
+    >>> connection = sqlite3.connect(":memory:")
+    >>> create_tables(connection.cursor())
+    >>> writer = ValueWriter(connection, buffer_size=2)
+    >>> writer.add(value_row(1, 1, 0, 0, RiemannSphere(1, 2)))
+    >>> writer.nb_of_saved_rows
+    0
+    >>> writer.add(value_row(1, 1, 1, 0, RiemannSphere(1, 2)))
+    >>> writer.add(value_row(1, 1, 2, 0, RiemannSphere(1, 2)))
+    >>> writer.nb_of_saved_rows
+    2
+    >>> writer.close()
+    >>> writer.nb_of_saved_rows
+    3
+    """
+
+    def __init__(self, connection, buffer_size=BUFFER_SIZE):
+        """ Constructor of the class
+
+        :param connection: Connection object, connected to a database whose
+                           tables have been created
+        :param buffer_size: int, the number of rows written at once
+        """
+        self.connection = connection
+        self.buffer_size = buffer_size
+        self.rows = []
+        self.nb_of_saved_rows = 0
+
+    def add(self, row):
+        """ Buffer a row, and write the buffered rows if there are
+        buffer_size of them
+
+        :param row: tuple, the parameters of INSERT_POINT_VALUE
+
+        :raised error: sqlite3.Error when the buffered rows can not be
+                       written, e.g. when the database is locked
+        """
+        self.rows.append(row)
+        if len(self.rows) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """ Write the buffered rows in a single transaction """
+        if self.rows:
+            with self.connection:
+                self.connection.executemany(INSERT_POINT_VALUE, self.rows)
+            self.nb_of_saved_rows += len(self.rows)
+            self.rows = []
+
+    def close(self):
+        """ Write the buffered rows and close the connection """
+        self.flush()
+        self.connection.close()
+
+
+class BackgroundWriter(object):
+    """ Class that buffers the rows to save in the PointValue table of
+    a database, and writes them in a dedicated thread, which owns its own
+    connection to the database.
+
+    The buffers of buffer_size rows are put in a queue of at most queue_size
+    buffers: when the queue is full, add waits until the thread has written
+    a buffer (back-pressure). The thread writes all the buffers waiting in
+    the queue in a single transaction. close writes the remaining rows and
+    stops the thread ; it has to be called, even if the computations are
+    interrupted.
+
+    :attribute path: String, the path of the database
+    :attribute buffer_size: int
+    :attribute rows: list of the buffered rows, not yet in the queue
+    :attribute queue: Queue of buffers
+    :attribute thread: Thread, which writes the buffers
+    :attribute error: Exception raised in the thread, or None
+    :attribute nb_of_saved_rows: int
+    :attribute nb_of_flushes: int, the number of transactions
+    :attribute max_queue_depth: int, the maximal number of buffers which
+                                have waited in the queue
+    :attribute flush_durations: list of float, the durations in seconds
+                                of the transactions
+
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), "values.sqlite")
+    >>> connection = connect(path)
+    >>> create_tables(connection.cursor())
+    >>> connection.commit()
+    >>> writer = BackgroundWriter(path, buffer_size=10)
+    >>> for k in range(25):
+    ...     writer.add(value_row(1, 1, k, 0, RiemannSphere(1, 2)))
+    >>> writer.close()
+    >>> writer.nb_of_saved_rows
+    25
+    >>> connection.execute("SELECT COUNT(*) FROM PointValue").fetchone()
+    (25,)
+
+    A row which can not be written stops the writes, and its error is raised
+    in the calling thread:
+
+    >>> writer = BackgroundWriter(path, buffer_size=1)
+    >>> writer.add(value_row(1, 1, 2 ** 64, 0, RiemannSphere(1, 2)))
+    >>> while writer.error is None:
+    ...     writer.thread.join(0.01)
+    >>> writer.add(value_row(1, 1, 0, 1, RiemannSphere(1, 2)))
+    Traceback (most recent call last):
+        ...
+    OverflowError: Python int too large to convert to SQLite INTEGER
+    >>> writer.close()
+    Traceback (most recent call last):
+        ...
+    OverflowError: Python int too large to convert to SQLite INTEGER
+    >>> writer.thread.is_alive()
+    False
+    """
+
+    def __init__(self, path, buffer_size=BUFFER_SIZE, queue_size=QUEUE_SIZE):
+        """ Constructor of the class, which starts the thread
+
+        :param path: String, the path of a database whose tables have been
+                     created
+        :param buffer_size: int, the number of rows put at once in the queue
+        :param queue_size: int, the maximal number of buffers in the queue
+        """
+        self.path = path
+        self.buffer_size = buffer_size
+        self.rows = []
+        self.queue = Queue(maxsize=queue_size)
+        self.error = None
+        self.nb_of_saved_rows = 0
+        self.nb_of_flushes = 0
+        self.max_queue_depth = 0
+        self.flush_durations = []
+        self.thread = Thread(target=self.run, name="BackgroundWriter",
+                             daemon=True)
+        self.thread.start()
+
+    def add(self, row):
+        """ Buffer a row, and put the buffered rows in the queue if there
+        are buffer_size of them
+
+        :param row: tuple, the parameters of INSERT_POINT_VALUE
+
+        :raised error: the exception raised in the thread by a former write
+        """
+        self.rows.append(row)
+        if len(self.rows) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """ Put the buffered rows in the queue, waiting for a free place
+        if the queue is full
+
+        :raised error: the exception raised in the thread by a former write
+        """
+        if self.error is not None:
+            raise self.error
+        if self.rows:
+            self.queue.put(self.rows)
+            self.max_queue_depth = max(self.max_queue_depth,
+                                       self.queue.qsize())
+            self.rows = []
+
+    def run(self):
+        """ Main loop of the thread: write the buffers of the queue, until
+        the None buffer is met. After an error, the buffers are still taken
+        from the queue, so that add never waits forever
+        """
+        try:
+            connection = connect(self.path)
+        except Exception as error:
+            connection, self.error = None, error
+        running = True
+        while running:
+            buffers = [self.queue.get()]
+            while not self.queue.empty():
+                buffers.append(self.queue.get())
+            if buffers[-1] is None:
+                running = False
+                buffers.pop()
+            if buffers and self.error is None:
+                try:
+                    t_0 = time()
+                    with connection:
+                        for rows in buffers:
+                            connection.executemany(INSERT_POINT_VALUE, rows)
+                    self.flush_durations.append(time() - t_0)
+                    self.nb_of_flushes += 1
+                    self.nb_of_saved_rows += sum(len(rows) for rows in buffers)
+                except Exception as error:
+                    self.error = error
+        if connection is not None:
+            connection.close()
+
+    def close(self):
+        """ Write the buffered rows and stop the thread
+
+        :raised error: the exception raised in the thread if a write has
+                       failed, such as sqlite3.Error, or OverflowError for
+                       the integers which do not fit in 64 bits
+        """
+        try:
+            self.flush()
+        finally:
+            self.queue.put(None)
+            self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def metrics(self):
+        """ Describe the activity of the writer
+
+        :return value: String
+        """
+        if self.flush_durations:
+            mean = sum(self.flush_durations) / len(self.flush_durations)
+            maximum = max(self.flush_durations)
+        else:
+            mean = maximum = 0
+        return (str(self.nb_of_saved_rows) + " values saved in " +
+                str(self.nb_of_flushes) + " transactions, maximal queue " +
+                "depth: " + str(self.max_queue_depth) + ", flush latency: " +
+                str(int(mean * 1000) / 1000) + "s. on average, " +
+                str(int(maximum * 1000) / 1000) + "s. at most ")
+
+
+def divisors(n):
+    """ Compute the divisors of a positive integer. The prime factors
+    are found by trial divisions up to TRIAL_DIVISION_BOUND, and the remaining
+    cofactor is considered as prime: some divisors can be missing for
+    integers with several prime factors greater than TRIAL_DIVISION_BOUND
+
+    :param n: int, positive
+    :return value: sorted list of int
+
+    >>> divisors(12)
+    [1, 2, 3, 4, 6, 12]
+    >>> len(divisors(10 ** 16))
+    289
+    """
+    result = [1]
+    p = 2
+    while p * p <= n and p <= TRIAL_DIVISION_BOUND:
+        power = 0
+        while n % p == 0:
+            n //= p
+            power += 1
+        if power:
+            result = [d * p ** k for d in result for k in range(power + 1)]
+        p += 1 if p == 2 else 2
+    if n > 1:
+        result = result + [d * n for d in result]
+    return sorted(result)
+
+
+def range_queries(function_id, x_min, x_max, y_min, y_max, resolution,
+                  precision=FLOAT_PRECISION):
+    """ Compute the parameters of the SELECT_RANGE queries recovering
+    the values of a function at the points x_min + k / resolution +
+    i (y_min + l / resolution) of the rectangle [x_min, x_max] +
+    [y_min, y_max] * i.
+    The lattice multiplier of such a point divides
+    lcm(den(x_min), den(y_min), resolution): there is a query for each
+    divisor m, on the range of the lattice coordinates of the rectangle.
+    Only the values computed with at least the given precision are recovered.
+
+    :param function_id: int, the id of the function identity
+    :param x_min: Fraction or int
+    :param x_max: Fraction or int
+    :param y_min: Fraction or int
+    :param y_max: Fraction or int
+    :param resolution: int
+    :param precision: int, the minimal precision in bits of the values
+    :return value: list of tuples (function_id, m, real_min, real_max,
+                   imaginary_min, imaginary_max, precision)
+
+    >>> from fractions import Fraction
+    >>> range_queries(7, 0, 1, Fraction(1, 2), 1, 2)
+    [(7, 1, 0, 1, 1, 1, 53), (7, 2, 0, 2, 1, 2, 53)]
+    """
+    common = resolution
+    for z in (Fraction(x_min), Fraction(y_min)):
+        common = common * z.denominator // gcd(common, z.denominator)
+    queries = []
+    for m in divisors(common):
+        queries.append((function_id, m, ceil(x_min * m), floor(x_max * m),
+                        ceil(y_min * m), floor(y_max * m), precision))
+    return queries
+
+
+def value_row(function_id, provenance_id, x, y, value):
+    """ Compute the row of the PointValue table saving the value at x + i y
+    of a function
+
+    :param function_id: int, the id of the function identity
+    :param provenance_id: int, the id of the block of the value
+    :param x: Fraction or int
+    :param y: Fraction or int
+    :param value: RiemannSphere complex number
+    :return value: tuple, the parameters of INSERT_POINT_VALUE
+    """
+    if value.is_infinite():
+        return ((function_id,) + lattice_key(x, y) +
+                (None, None, 1, provenance_id))
+    return ((function_id,) + lattice_key(x, y) +
+            (float(value.real), float(value.imaginary), 0, provenance_id))
+
+
+def value_of_row(value_real, value_imaginary, infinite):
+    """ Compute the value saved in a row of the PointValue table
+
+    :param value_real: float or None
+    :param value_imaginary: float or None
+    :param infinite: 0 or 1
+    :return value: RiemannSphere complex number
+
+    >>> value_of_row(*value_row(1, 1, 0, 0, RiemannSphere(1, 2))[4:7])
+    1.0 + 2.0 i
+    >>> from RiemannSphere import INFTY
+    >>> value_of_row(*value_row(1, 1, 0, 0, INFTY)[4:7])
+    oo
+    """
+    if infinite:
+        return INFTY
+    return RiemannSphere(value_real, value_imaginary)
+
+
+if __name__ == '__main__':
+    from doctest import testmod
+    testmod()
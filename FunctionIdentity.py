@@ -0,0 +1,267 @@
+###########################################################
+# Module to compute the identity of a function, used to   #
+# key the values saved in a database                      #
+#                                                         #
+# Author: Olivier Bouillot                                #
+# Email: olivier.bouillot@u-pem.fr                        #
+# Creation Date: october 2026                             #
+#                                                         #
+# Modifications:                                          #
+# --------------                                          #
+#                                                         #
+# 10/2026    Partial functions, bound methods and         #
+#            callable objects are identified by their     #
+#            state, as well as the simple global          #
+#            variables used by a function                 #
+#                                                         #
+# Next modifications to do:                               #
+# -------------------------                               #
+#                                                         #
+#   * Take into account the global functions used by      #
+#     a function                                          #
+#                                                         #
+###########################################################
+
+
+import dis
+import types
+import hashlib
+import inspect
+from functools import partial
+from fractions import Fraction
+import numpy as np
+from RiemannSphere import RiemannSphere
+
+
+""" Module which defines the function_identity function.
+
+The identity of a function is a string made of:
+* its qualified name (module and qualified name).
+* its version, given by the user, or the hash of its source code: the values
+  of a function are invalidated when its source code changes.
+* the values of the variables bound in its closure, such as the fixed
+  variable of the partial functions of the Vectorized module, and of its
+  default arguments.
+* the values of the global variables of the DESCRIBED_TYPES it reads, and
+  does not assign.
+* for a functools.partial object, the identity of its function and its
+  fixed arguments ; for a bound method, the state of the object it is bound
+  to ; for a callable object, its state (the attributes of its __dict__).
+
+For instance, the two partial functions of a function of two variables,
+drawn by the TwoDimensionalPhasePortraitGUI class, have different identities.
+A bound value which can not be described (see the describe function) raises
+a ValueError, unless the function has a version: the user then has to change
+the version when this value changes. The global variables of the other types
+used by a function, such as functions or modules, are not taken into account
+either.
+"""
+
+
+# Maximal depth of the functions and objects bound to a function whose
+# identity is computed
+MAX_DEPTH = 3
+
+# Types of the bound values described by their representation
+DESCRIBED_TYPES = (int, float, complex, Fraction, str, bool, type(None),
+                   RiemannSphere)
+
+
+def source_hash(function):
+    """ Compute a hash of the source code of a function, or of its byte code
+    if its source code is not available
+
+    :param function: function
+    :return value: String, of 16 hexadecimal digits
+    """
+    try:
+        text = inspect.getsource(function).encode()
+    except (OSError, TypeError):
+        code = getattr(function, '__code__', None)
+        if code is None:
+            text = type(function).__qualname__.encode()
+        else:
+            text = code.co_code + repr(code.co_consts).encode()
+    return hashlib.sha256(text).hexdigest()[:16]
+
+
+def describe(value, depth, versioned=False):
+    """ Describe a value bound to a function
+
+    :param value: any object
+    :param depth: int, the depth of the function the value is bound to
+    :param versioned: boolean, which indicates if the function has
+                      a version, in which case the values which can not be
+                      described are described by their type
+    :return value: String
+
+    :raised error: ValueError when the value can not be described, and
+                   the function has no version
+
+    >>> describe([1, RiemannSphere(0, 1)], 0), describe({'b': 2, 'a': 1}, 0)
+    ('(1, i)', "{'a': 1, 'b': 2}")
+    >>> describe(np.arange(3), 0) == describe(np.arange(3), 0)
+    True
+    >>> describe(np.arange(3), 0) == describe(np.arange(1, 4), 0)
+    False
+    >>> describe(iter([]), 0)
+    Traceback (most recent call last):
+        ...
+    ValueError: A value of type list_iterator bound to the function can not be described: give a version to the function
+    >>> describe(iter([]), 0, versioned=True)
+    'list_iterator'
+    """
+    if isinstance(value, DESCRIBED_TYPES):
+        return repr(value)
+    if isinstance(value, (tuple, list)):
+        return "(" + ", ".join(describe(v, depth, versioned)
+                               for v in value) + ")"
+    if isinstance(value, (set, frozenset)):
+        return "{" + ", ".join(sorted(describe(v, depth, versioned)
+                                      for v in value)) + "}"
+    if isinstance(value, dict):
+        return "{" + ", ".join(sorted(describe(k, depth, versioned) + ": " +
+                                      describe(v, depth, versioned)
+                                      for (k, v) in value.items())) + "}"
+    if isinstance(value, np.ndarray):
+        return "ndarray(" + str(value.dtype) + ", " + str(value.shape) + \
+            ", " + hashlib.sha256(np.ascontiguousarray(value).tobytes()) \
+            .hexdigest()[:16] + ")"
+    if isinstance(value, np.generic):
+        return repr(value.item())
+    if isinstance(value, types.ModuleType):
+        return "module " + value.__name__
+    if depth < MAX_DEPTH:
+        if callable(value):
+            return "(" + function_identity(value, depth=depth + 1,
+                                           versioned=versioned) + ")"
+        if hasattr(value, '__dict__') and not isinstance(value, type):
+            return type(value).__qualname__ + \
+                describe(vars(value), depth + 1, versioned)
+    if versioned:
+        return type(value).__qualname__
+    raise ValueError("A value of type " + type(value).__qualname__ +
+                     " bound to the function can not be described: give " +
+                     "a version to the function")
+
+
+def used_globals(function, depth, versioned):
+    """ Describe the global variables of the DESCRIBED_TYPES read, and not
+    assigned, by a function
+
+    :param function: function
+    :param depth: int, the depth of the function
+    :param versioned: boolean, which indicates if the function has a version
+    :return value: list of Strings
+    """
+    code = getattr(function, '__code__', None)
+    namespace = getattr(function, '__globals__', None)
+    if code is None or namespace is None:
+        return []
+    # The global variables assigned by the function, such as counters, are
+    # not parameters of the function
+    assigned = {instruction.argval for instruction in dis.get_instructions(code)
+                if instruction.opname in ('STORE_GLOBAL', 'DELETE_GLOBAL')}
+    return [name + "=" + describe(namespace[name], depth, versioned)
+            for name in sorted(set(code.co_names) - assigned)
+            if name in namespace and
+            isinstance(namespace[name], DESCRIBED_TYPES)]
+
+
+def function_identity(function, version=None, depth=0, versioned=False):
+    """ Compute the identity of a function
+
+    :param function: function, which represents the function C -> C
+    :param version: String, the version of the function ; by default, its
+                    version attribute if it exists, otherwise the hash of its
+                    source code is used
+    :param depth: int, the depth of the function, when it is bound to
+                  an other function
+    :param versioned: boolean, which indicates if the function it is bound
+                      to has a version
+    :return value: String
+
+    :raised error: ValueError when a value bound to the function can not be
+                   described, and the function has no version
+
+    >>> def square(z):
+    ...     return z * z
+    >>> function_identity(square, version="1.0").split(".")[-2:]
+    ['square|version=1', '0']
+    >>> def translation(w):
+    ...     def translated(z):
+    ...         return z + w
+    ...     return translated
+    >>> function_identity(translation(1)) == function_identity(translation(1))
+    True
+    >>> function_identity(translation(1)) == function_identity(translation(2))
+    False
+    >>> function_identity(translation(RiemannSphere(1, 1))).split("|")[-1]
+    'w=1 + 1 i'
+
+    Partial functions, bound methods and callable objects:
+
+    >>> def power(z, n):
+    ...     return z ** n
+    >>> (function_identity(partial(power, n=2)) ==
+    ...  function_identity(partial(power, n=3)))
+    False
+    >>> class Scaling(object):
+    ...     def __init__(self, k):
+    ...         self.k = k
+    ...     def scale(self, z):
+    ...         return self.k * z
+    ...     def __call__(self, z):
+    ...         return self.k * z
+    >>> (function_identity(Scaling(2).scale) ==
+    ...  function_identity(Scaling(3).scale))
+    False
+    >>> function_identity(Scaling(2)).split("|")[-1]
+    "state=Scaling{'k': 2}"
+    """
+    if version is None:
+        version = getattr(function, 'version', None)
+    versioned = versioned or version is not None
+    if isinstance(function, partial):
+        parts = ["functools.partial(" +
+                 function_identity(function.func, version, depth,
+                                   versioned) + ")"]
+        if function.args:
+            parts.append("args=" + describe(function.args, depth, versioned))
+        if function.keywords:
+            parts.append("keywords=" + describe(function.keywords, depth,
+                                                versioned))
+        return "|".join(parts)
+    module = getattr(function, '__module__', None) or ''
+    name = getattr(function, '__qualname__', type(function).__qualname__)
+    parts = [module + "." + name]
+    if version is None:
+        parts.append("source=" + source_hash(function))
+    else:
+        parts.append("version=" + str(version))
+    defaults = getattr(function, '__defaults__', None)
+    if defaults:
+        parts.append("defaults=" + describe(defaults, depth, versioned))
+    code = getattr(function, '__code__', None)
+    closure = getattr(function, '__closure__', None)
+    if code is not None and closure:
+        for (variable, cell) in zip(code.co_freevars, closure):
+            parts.append(variable + "=" + describe(cell.cell_contents, depth,
+                                                   versioned))
+    parts += used_globals(function, depth, versioned)
+    if inspect.ismethod(function):
+        parts.append("self=" + describe(function.__self__, depth + 1,
+                                        versioned))
+    elif not inspect.isfunction(function) and \
+            not inspect.isbuiltin(function) and \
+            hasattr(function, '__dict__'):
+        parts.append("state=" + describe(function, depth, versioned)
+                     if depth >= MAX_DEPTH else
+                     "state=" + type(function).__qualname__ +
+                     describe(vars(function), depth + 1, versioned))
+    return "|".join(parts)
+
+
+if __name__ == '__main__':
+    from doctest import testmod
+    testmod()
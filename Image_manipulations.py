@@ -12,6 +12,9 @@
 # Modifications:                                         #
 # --------------                                         #
 #                                                        #
+# 10/2026    Image.ANTIALIAS, removed from Pillow 10, is #
+#            replaced by Image.LANCZOS                   #
+#                                                        #
 #                                                        #
 # Next modifications to do:                              #
 # -------------------------                              #
@@ -143,7 +146,7 @@ def display_preparing_of_img(img, size_max):
     # to be magnifies manually. So, we resize the image using
     # the resize tool of Image package
     new_size = (size_max, size_max)
-    return tmp_img.resize(new_size, Image.ANTIALIAS)
+    return tmp_img.resize(new_size, Image.LANCZOS)
 
 
 def PIL_image_2_byte_im(img):
@@ -0,0 +1,286 @@
+###########################################################
+# Module to define the numbers used to represent          #
+# the components of Riemann Sphere complex numbers:       #
+# usual floating point numbers, or multiprecision         #
+# floating point numbers when mpmath is installed         #
+#                                                         #
+# Author: Olivier Bouillot                                #
+# Email: olivier.bouillot@u-pem.fr                        #
+# Creation Date: october 2026                             #
+#                                                         #
+# Modifications:                                          #
+# --------------                                          #
+#                                                         #
+#                                                         #
+# Next modifications to do:                               #
+# -------------------------                               #
+#                                                         #
+#                                                         #
+###########################################################
+
+
+import math
+from fractions import Fraction
+from time import time
+try:
+    import mpmath
+except ImportError:
+    mpmath = None
+
+
+""" Module which defines:
+* the FloatBackend and MPMathBackend classes, which provide the elementary
+  functions used by the RiemannSphere class and the SpecialFunctions module.
+* a current backend, BACKEND, which can be changed with set_backend or
+  temporarily with the using_backend context manager.
+* the select_precision and select_backend functions, which choose
+  the precision needed to draw a phase portrait.
+* the cost_report function, which measures the cost of an evaluation
+  of a function for several precisions.
+"""
+
+
+# Number of bits of a float mantissa
+FLOAT_PRECISION = 53
+
+# Number of bits added to the precision needed to distinguish two pixels,
+# to take into account the cancellations occuring in the evaluated functions
+GUARD_BITS = 20
+
+# Types of the real numbers accepted as components of a RiemannSphere
+if mpmath is None:
+    REAL_TYPES = (int, float, Fraction)
+else:
+    REAL_TYPES = (int, float, Fraction, mpmath.mpf)
+
+
+class FloatBackend(object):
+    """ Backend using the usual floating point numbers and the math module
+
+    :attribute name: string
+    :attribute precision: int, which represents the number of bits of
+                          the mantissa
+    """
+    name = "float"
+    precision = FLOAT_PRECISION
+    pi = math.pi
+    sqrt = staticmethod(math.sqrt)
+    exp = staticmethod(math.exp)
+    log = staticmethod(math.log)
+    cos = staticmethod(math.cos)
+    sin = staticmethod(math.sin)
+    atan = staticmethod(math.atan)
+
+    def convert(self, x):
+        """ Convert an int, a float or a Fraction into a number of the backend
+
+        :param x: int, float or Fraction
+        :return value: float
+
+        >>> FloatBackend().convert(Fraction(1, 4))
+        0.25
+        """
+        return float(x)
+
+    def activate(self):
+        """ Method called when the backend becomes the current backend """
+        pass
+
+    def __repr__(self):
+        return self.name
+
+
+class MPMathBackend(object):
+    """ Backend using the multiprecision floating point numbers of mpmath
+
+    :attribute name: string
+    :attribute precision: int, which represents the number of bits of
+                          the mantissa
+
+    >>> backend = MPMathBackend(100)
+    >>> with using_backend(backend):
+    ...     error = backend.pi - FloatBackend.pi
+    >>> 0 < abs(error) < 2 ** -52
+    True
+    """
+    name = "mpmath"
+
+    def __init__(self, precision):
+        """ Constructor of the class
+
+        :param precision: int, which represents the number of bits of
+                          the mantissa of the numbers
+
+        :raised error: ImportError when mpmath is not installed
+        """
+        if mpmath is None:
+            raise ImportError("The mpmath module is needed by " +
+                              "the MPMathBackend backend")
+        self.precision = precision
+
+    @property
+    def pi(self):
+        return +mpmath.mp.pi
+
+    sqrt = staticmethod(lambda x: mpmath.sqrt(x))
+    exp = staticmethod(lambda x: mpmath.exp(x))
+    log = staticmethod(lambda x: mpmath.log(x))
+    cos = staticmethod(lambda x: mpmath.cos(x))
+    sin = staticmethod(lambda x: mpmath.sin(x))
+    atan = staticmethod(lambda x: mpmath.atan(x))
+
+    def convert(self, x):
+        """ Convert an int, a float or a Fraction into a number of the backend
+
+        :param x: int, float or Fraction
+        :return value: mpmath.mpf
+        """
+        if isinstance(x, Fraction):
+            return mpmath.mpf(x.numerator) / x.denominator
+        return mpmath.mpf(x)
+
+    def activate(self):
+        """ Method called when the backend becomes the current backend """
+        mpmath.mp.prec = self.precision
+
+    def __repr__(self):
+        return self.name + "(" + str(self.precision) + " bits)"
+
+
+BACKEND = FloatBackend()
+
+
+def set_backend(backend):
+    """ Change the current backend
+
+    :param backend: FloatBackend or MPMathBackend
+    :return value: the previous backend
+    """
+    global BACKEND
+    previous = BACKEND
+    BACKEND = backend
+    backend.activate()
+    return previous
+
+
+class using_backend(object):
+    """ Context manager which changes the current backend, and restores
+    the previous one at exit, as well as the precision of mpmath
+
+    >>> with using_backend(FloatBackend()):
+    ...     BACKEND.name
+    'float'
+    >>> precision = mpmath.mp.prec if mpmath is not None else None
+    >>> if mpmath is not None:
+    ...     with using_backend(MPMathBackend(100)):
+    ...         pass
+    >>> precision == (mpmath.mp.prec if mpmath is not None else None)
+    True
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.previous = None
+        self.mpmath_precision = None
+
+    def __enter__(self):
+        if mpmath is not None:
+            self.mpmath_precision = mpmath.mp.prec
+        self.previous = set_backend(self.backend)
+        return self.backend
+
+    def __exit__(self, *args):
+        set_backend(self.previous)
+        if self.mpmath_precision is not None:
+            mpmath.mp.prec = self.mpmath_precision
+
+
+def select_precision(left_below, right_upper, resolution,
+                     guard_bits=GUARD_BITS):
+    """ Compute the number of bits needed to distinguish the points of
+    the grid of step 1 / resolution discretising the rectangle
+    [a, b] + [c, d] * i, where left_below = a + i c and
+    right_upper = b + i d
+
+    :param left_below: RiemannSphere complex number
+    :param right_upper: RiemannSphere complex number
+    :param resolution: int, the number of points per unit
+    :param guard_bits: int, the number of bits added to take into account
+                       the cancellations occuring in the evaluated functions
+    :return value: int, at least FLOAT_PRECISION
+
+    >>> from RiemannSphere import RiemannSphere
+    >>> select_precision(RiemannSphere(0, 0), RiemannSphere(1, 1), 100)
+    53
+    >>> a = RiemannSphere(Fraction(1, 2), Fraction(14134725, 10 ** 6))
+    >>> b = a + RiemannSphere(Fraction(1, 10 ** 15), Fraction(1, 10 ** 15))
+    >>> select_precision(a, b, 10 ** 17)
+    81
+    """
+    magnitude = max(abs(left_below.real), abs(left_below.imaginary),
+                    abs(right_upper.real), abs(right_upper.imaginary), 1)
+    needed = math.ceil(math.log2(magnitude * resolution)) + guard_bits
+    return max(FLOAT_PRECISION, needed)
+
+
+def select_backend(left_below, right_upper, resolution,
+                   guard_bits=GUARD_BITS):
+    """ Choose the backend needed to draw a phase portrait of the rectangle
+    [a, b] + [c, d] * i, where left_below = a + i c and right_upper = b + i d,
+    with resolution points per unit: the FloatBackend if floats are enough,
+    a MPMathBackend of the needed precision otherwise.
+
+    :raised error: ImportError when mpmath is needed but not installed
+
+    :return value: FloatBackend or MPMathBackend
+    """
+    precision = select_precision(left_below, right_upper, resolution,
+                                 guard_bits)
+    if precision <= FLOAT_PRECISION:
+        return FloatBackend()
+    return MPMathBackend(precision)
+
+
+def cost_report(function, z, precisions=(53, 64, 128, 256, 512), repeat=3):
+    """ Measure the cost of an evaluation of a function for several
+    precisions. The precision FLOAT_PRECISION uses the FloatBackend,
+    the others the MPMathBackend (they are skipped if mpmath is not
+    installed).
+
+    :param function: function, which represents the function C -> C
+    :param z: RiemannSphere complex number, the point of evaluation
+    :param precisions: iterable of int, the precisions in bits
+    :param repeat: int, the number of evaluations per precision ; the best
+                   duration is kept
+    :return value: list of triplets (precision, backend name, duration of
+                   an evaluation in seconds)
+
+    >>> from RiemannSphere import RiemannSphere
+    >>> report = cost_report(lambda z: z * z, RiemannSphere(1, 2), (53, 128))
+    >>> [(precision, name) for (precision, name, duration) in report]
+    [(53, 'float'), (128, 'mpmath')]
+    """
+    from RiemannSphere import RiemannSphere
+    report = []
+    for precision in precisions:
+        if precision <= FLOAT_PRECISION:
+            backend = FloatBackend()
+        elif mpmath is None:
+            continue
+        else:
+            backend = MPMathBackend(precision)
+        with using_backend(backend):
+            point = RiemannSphere(backend.convert(z.real),
+                                  backend.convert(z.imaginary))
+            best = float('Inf')
+            for k in range(repeat):
+                t_0 = time()
+                function(point)
+                best = min(best, time() - t_0)
+        report.append((precision, backend.name, best))
+    return report
+
+
+if __name__ == '__main__':
+    from doctest import testmod
+    testmod()
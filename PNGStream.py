@@ -0,0 +1,171 @@
+###########################################################
+# Module to write a PNG image by strips of rows, without  #
+# keeping the whole image in memory                       #
+#                                                         #
+# Author: Olivier Bouillot                                #
+# Email: olivier.bouillot@u-pem.fr                        #
+# Creation Date: october 2026                             #
+#                                                         #
+# Modifications:                                          #
+# --------------                                          #
+#                                                         #
+#                                                         #
+# Next modifications to do:                               #
+# -------------------------                               #
+#                                                         #
+#   * Choose the PNG filter of each row                   #
+#                                                         #
+###########################################################
+
+
+import zlib
+import struct
+import numpy as np
+
+
+""" Module which defines the PNGWriter class, which writes a RGB image in
+a PNG file by strips of rows: each strip is compressed by a zlib stream as
+soon as it is given, and the compressed data is written in IDAT chunks of
+at most CHUNK_SIZE bytes. The memory used only depends on the size of
+a strip, and not on the size of the image, so that the phase portraits
+larger than the memory can be saved (see the save_by_strips method of
+the PhasePortrait class).
+
+The image is a 8 bits RGB image, without interlacing, whose rows are not
+filtered (filter type 0): the compression level of zlib, from 0 to 9,
+trades the size of the file for the speed of the compression.
+"""
+
+
+# PNG signature
+SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Maximal size in bytes of the data of an IDAT chunk
+CHUNK_SIZE = 2 ** 20
+
+# Default compression level of zlib
+COMPRESS_LEVEL = 6
+
+
+class PNGWriter(object):
+    """ Class which writes a RGB image in a PNG file, by strips of rows from
+    the top of the image. It is a context manager, which closes the file.
+
+    :attribute file: file object, opened in binary mode
+    :attribute owned: boolean, which indicates if the file has been opened
+                      by the writer, which then closes it
+    :attribute size: pair of int, the width and the height of the image
+    :attribute nb_of_rows: int, the number of rows already written
+    :attribute compressor: zlib compression object
+    :attribute buffer: bytearray, the compressed data not written yet
+
+    >>> import io
+    >>> from PIL import Image
+    >>> colors = np.random.default_rng(0).integers(0, 256, (50, 40, 3))
+    >>> colors = colors.astype(np.uint8)
+    >>> file = io.BytesIO()
+    >>> with PNGWriter(file, (40, 50), compress_level=1) as writer:
+    ...     for top in range(0, 50, 16):
+    ...         writer.write_rows(colors[top:top + 16])
+    >>> file.seek(0)
+    0
+    >>> image = Image.open(file)
+    >>> image.size, image.mode
+    ((40, 50), 'RGB')
+    >>> np.array_equal(np.asarray(image), colors)
+    True
+    """
+
+    def __init__(self, file, size, compress_level=COMPRESS_LEVEL):
+        """ Constructor of the class, which writes the header of the image
+
+        :param file: String, the path of the file, or a file object opened
+                     in binary mode
+        :param size: pair of int, the width and the height of the image
+        :param compress_level: int, the compression level of zlib, from 0
+                               (no compression) to 9 (best compression)
+        """
+        if isinstance(file, str):
+            file = open(file, "wb")
+            self.owned = True
+        else:
+            self.owned = False
+        self.file = file
+        self.size = tuple(size)
+        self.nb_of_rows = 0
+        self.compressor = zlib.compressobj(compress_level)
+        self.buffer = bytearray()
+        self.file.write(SIGNATURE)
+        # 8 bits per component, RGB, default compression and filtering,
+        # no interlacing
+        self.write_chunk(b'IHDR', struct.pack(">IIBBBBB", self.size[0],
+                                              self.size[1], 8, 2, 0, 0, 0))
+
+    def write_chunk(self, kind, data):
+        """ Write a chunk of the PNG file
+
+        :param kind: bytes, the type of the chunk
+        :param data: bytes
+        """
+        self.file.write(struct.pack(">I", len(data)))
+        self.file.write(kind)
+        self.file.write(data)
+        self.file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+    def write_rows(self, colors):
+        """ Write the next rows of the image
+
+        :param colors: NumPy array of uint8, of shape (number of rows, width,
+                       3), the RGB components of the pixels of the rows
+
+        :raised error: ValueError when the rows do not have the width of
+                       the image, or are too many
+        """
+        colors = np.asarray(colors, dtype=np.uint8)
+        if colors.ndim != 3 or colors.shape[1:] != (self.size[0], 3):
+            raise ValueError("The rows have to be an array of shape (n, " +
+                             str(self.size[0]) + ", 3)")
+        if self.nb_of_rows + colors.shape[0] > self.size[1]:
+            raise ValueError("The image has only " + str(self.size[1]) +
+                             " rows")
+        # Each row starts with its filter type, 0
+        rows = np.zeros((colors.shape[0], 1 + 3 * self.size[0]),
+                        dtype=np.uint8)
+        rows[:, 1:] = colors.reshape(colors.shape[0], -1)
+        self.buffer += self.compressor.compress(rows.tobytes())
+        self.nb_of_rows += colors.shape[0]
+        while len(self.buffer) >= CHUNK_SIZE:
+            self.write_chunk(b'IDAT', bytes(self.buffer[:CHUNK_SIZE]))
+            del self.buffer[:CHUNK_SIZE]
+
+    def close(self):
+        """ Write the end of the image, and close the file if it has been
+        opened by the writer
+
+        :raised error: ValueError when rows of the image are missing
+        """
+        if self.nb_of_rows != self.size[1]:
+            raise ValueError(str(self.size[1] - self.nb_of_rows) +
+                             " rows of the image are missing")
+        self.buffer += self.compressor.flush()
+        for start in range(0, len(self.buffer), CHUNK_SIZE):
+            self.write_chunk(b'IDAT', bytes(self.buffer[start:start +
+                                                        CHUNK_SIZE]))
+        self.buffer = bytearray()
+        self.write_chunk(b'IEND', b'')
+        if self.owned:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+        if exception_type is None:
+            self.close()
+        elif self.owned:
+            self.file.close()
+
+
+if __name__ == '__main__':
+    from doctest import testmod
+    testmod()
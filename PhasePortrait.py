@@ -18,6 +18,48 @@
 # 18/05/20   Degub the expression of the complex number   #
 #            which have not been computed                 #
 # 10/07/20   Allows floating points in corner components  #
+# 10/2026    Certified filling of the tiles whose pixels  #
+#            all have the same color, using RiemannBall   #
+# 10/2026    Optionally keeps the grid of the derivatives #
+#            computed with RiemannDual numbers            #
+# 10/2026    The pixels are evaluated with the numbers of #
+#            a backend of the NumberBackend module, and   #
+#            not anymore with Fraction components         #
+# 10/2026    Functions built from RiemannSphere           #
+#            operations are traced and evaluated on the   #
+#            whole grid with a compiled NumPy kernel      #
+# 10/2026    Vectorized functions are evaluated on arrays #
+# 10/2026    Values are saved in the indexed PointValue   #
+#            table of the Database module                 #
+# 10/2026    Values are recovered by range queries,       #
+#            without any temporary table                  #
+# 10/2026    Values are saved by buffers, in transactions #
+#            of a database in WAL journal mode            #
+# 10/2026    Values are saved by a background thread      #
+# 10/2026    Values are saved under the identity of       #
+#            the function                                 #
+# 10/2026    Values are saved with their precision, and   #
+#            only recovered if it is high enough          #
+# 10/2026    Values can be saved by compressed tiles      #
+# 10/2026    Tiles are saved in a cache of the            #
+#            CacheBackends module, chosen by an URL       #
+# 10/2026    Values are not saved in a read-only cache    #
+# 10/2026    Statistics of the use of the database or     #
+#            of the cache by the computation              #
+# 10/2026    Values can be kept in a memo shared by all   #
+#            the phase portraits of the process           #
+# 10/2026    A moved window reuses the values and         #
+#            the colors of the previous phase portrait    #
+# 10/2026    A zoomed window reuses the values kept in    #
+#            the memo at the coarser resolutions          #
+# 10/2026    Out-of-core mode, where the values are kept  #
+#            in a grid memory-mapped in a file            #
+# 10/2026    The image can be colored and saved by strips #
+#            of rows, without being kept in memory        #
+# 10/2026    Long computations in out-of-core mode can be #
+#            checkpointed and resumed                     #
+# 10/2026    Job files are rendered from the command line #
+#            by the BatchRender module                    #
 #                                                         #
 # Next modifications to do:                               #
 # -------------------------                               #
@@ -29,12 +71,33 @@
 
 
 from Color import RGB
-from RiemannSphere import RiemannSphere
+from RiemannSphere import RiemannSphere, INFTY
+from RiemannBall import RiemannBall, certified_RGB
+from RiemannDual import value_and_derivative
+from NumberBackend import FloatBackend, select_backend, using_backend
+from Tracer import trace
+from Database import create_tables, has_tables, range_queries
+from Database import find_function_id, register_function
+from Database import register_provenance
+from Database import value_row, value_of_row
+from Database import SELECT_RANGE, FETCH_SIZE, BUFFER_SIZE
+from Database import connect, BackgroundWriter
+from Vectorized import is_vectorized, probe, as_riemann_sphere
+from TileStore import is_aligned, TileWriter, TILE_SIZE
+from CacheBackends import TileCache, SQLiteCache, is_cache_url, open_cache
+from FunctionIdentity import function_identity
+from CacheStatistics import CacheStatistics
+from ValueGrid import ValueGrid, STRIP_SIZE
+from Color import RGB_array
+from PNGStream import PNGWriter, COMPRESS_LEVEL
+from Vectorized import as_complex
+from ValueMemo import ValueMemo, SHARED_MEMO
+from Checkpoint import Checkpoint, parameters_hash
 from PIL import Image
-import sqlite3
-from math import gcd
+import numpy as np
 from fractions import Fraction
 from time import time
+from itertools import chain
 import os.path
 
 
@@ -89,14 +152,87 @@ class PhasePortrait:
     :attribute values: dictionnary whose keys are pixels that discretised
                             the rectangle [a, b] + [c, d] * i and whose
                             values are the value of the current fonction
-                            at these points
+                            at these points, or ValueGrid in out-of-core
+                            mode (see the ValueGrid module)
     :attribute database: string which represents the path of a database
                             containing the values of the function we are
                             currently graphing ; if database is non empty,
                             we will use values already computing and add
-                            some new ones
+                            some new ones. It can also be the URL of a cache
+                            of tiles, or a TileCache (see the CacheBackends
+                            module)
     :attribute img: Image, which contains a graphical representation of
                            the looked for phase portrait
+    :attribute certified: boolean, which indicates if the function is first
+                           evaluated on balls containing whole tiles of
+                           the grid, in order to fill without any further
+                           evaluation the tiles whose pixels provably
+                           have the same color
+    :attribute derivatives: dictionnary whose keys are pixels that discretised
+                           the rectangle [a, b] + [c, d] * i and whose
+                           values are the value of the derivative of
+                           the current fonction at these points, or None
+                           if the derivatives are not kept
+    :attribute backend: FloatBackend or MPMathBackend, which provides
+                           the numbers used to evaluate the function
+    :attribute compiled: boolean, which indicates if the function is traced
+                           and compiled into a NumPy kernel evaluated on
+                           the whole grid at once
+    :attribute buffer_size: int, which represents the number of values
+                           written at once in the database
+    :attribute vectorized: boolean, which indicates if the function accepts
+                           NumPy arrays of complex numbers, and is evaluated
+                           on whole chunks of the grid
+    :attribute probed: boolean, which indicates if the function is evaluated
+                           on arrays because it has passed the probe (see
+                           the probed_points method): as for the compiled
+                           kernels, the pixels whose values on arrays are not
+                           finite are then evaluated one by one
+    :attribute identity: string, which represents the identity of
+                           the function (see the FunctionIdentity module),
+                           under which its values are saved in the database,
+                           computed the first time it is needed (see
+                           the identity property)
+    :attribute version: String, the version of the function given by
+                           the user, or None
+    :attribute known_identity: string, the identity of the function once it
+                           has been computed, or None
+    :attribute function_id: int, which represents the id of the identity
+                           of the function in the database, or None
+    :attribute precision: int, which represents the precision in bits of
+                           the computed values: only the values of the database
+                           computed with at least this precision are used
+    :attribute provenance_id: int, which represents the id of the block of
+                           the values saved in the database, or None
+    :attribute layout: "rows" or "tiles", which indicates if the values are
+                           saved in the database by rows of the PointValue
+                           table, or by tiles of the ValueTile table
+    :attribute lattice_origin: pair of int, which represents the lattice
+                           coordinates of the complex number a + i c, or None
+                           if the values are saved by rows
+    :attribute cache: TileCache, where the tiles of values are saved during
+                           the computations, or None
+    :attribute statistics: CacheStatistics, which describes the use of
+                           the database or of the cache by the last
+                           computation (see the CacheStatistics module)
+    :attribute memo: ValueMemo, where the computed values are kept in
+                           memory (see the ValueMemo module), or None
+    :attribute memo_key: the key of the values of the function in the memo
+                           (see the function_key method of the ValueMemo
+                           class), or None
+    :attribute memo_origin: pair of int or Fraction, which represents
+                           the coordinates of the complex number a + i c in
+                           the lattice of the resolution
+    :attribute seed: PhasePortrait, the previous phase portrait whose values
+                           and colors are reused, or None
+    :attribute seed_offset: pair of int (dx, dy), such that the pixel (i, j)
+                           of the seed is the pixel (i + dx, j + dy), or None
+                           if the seed is not used
+    :attribute unseeded: set of the pixels shared with the seed which have
+                           no value in the seed
+    :attribute grid: String, which represents the path of the .npy file
+                           where the values are memory-mapped in out-of-core
+                           mode, or None
 
     >>> a = RiemannSphere(0, 0)
     >>> b = RiemannSphere(1, 2)
@@ -122,10 +258,178 @@ class PhasePortrait:
     ...           }
     >>> dic == dic_th
     True
+
+    Certified filling of the tiles whose pixels have the same color:
+
+    >>> def f(z):
+    ...     return 1 + z / 1000
+    >>> graph = PhasePortrait(f, a, b, 10)
+    Computations finished 
+    >>> graph.draw()
+    >>> certified_graph = PhasePortrait(f, a, b, 10, certified=True)
+    Computations finished 
+    >>> certified_graph.draw()
+    >>> graph.img.tobytes() == certified_graph.img.tobytes()
+    True
+
+    Grid of the derivatives:
+
+    >>> def square(z):
+    ...     return z * z
+    >>> graph = PhasePortrait(square, a, b, 2, derivative=True)
+    Computations finished 
+    >>> graph.derivatives[1, 3] == 2 * RiemannSphere(0.5, 1.5)
+    True
+
+    Evaluation of a rational function by a compiled NumPy kernel:
+
+    >>> from RiemannSphere import INFTY
+    >>> def rational(z):
+    ...     return (z ** 3 - 1) * (z * z + 1).inverse()
+    >>> a, b = RiemannSphere(-2, -2), RiemannSphere(2, 2)
+    >>> graph = PhasePortrait(rational, a, b, 4)
+    Computations finished 
+    >>> pointwise_graph = PhasePortrait(rational, a, b, 4, compiled=False)
+    Computations finished 
+    >>> all(abs(graph.values[p] - pointwise_graph.values[p]) < 1e-12
+    ...     for p in graph.values if not graph.values[p].is_infinite())
+    True
+    >>> graph.values[8, 12] == pointwise_graph.values[8, 12] == INFTY
+    True
+
+    Evaluation of a vectorized function on arrays:
+
+    >>> from Vectorized import vectorized
+    >>> @vectorized
+    ... def numpy_exp(z):
+    ...     return np.exp(z)
+    >>> graph = PhasePortrait(numpy_exp, a, b, 4)
+    Computations finished 
+    >>> graph.vectorized
+    True
+    >>> abs(graph.values[8, 8] - 1) < 1e-12
+    True
+    >>> PhasePortrait(square, a, b, 4).vectorized
+    Computations finished 
+    True
+
+    Automatic choice of the precision needed by a deep zoom:
+
+    >>> a = RiemannSphere(Fraction(1, 2), Fraction(14134725, 10 ** 6))
+    >>> b = a + RiemannSphere(Fraction(2, 10 ** 16), Fraction(2, 10 ** 16))
+    >>> graph = PhasePortrait(id, a, b, 10 ** 16, backend="auto")
+    Computations finished 
+    >>> graph.backend
+    mpmath(77 bits)
+    >>> graph.values[0, 0] != graph.values[0, 1]
+    True
+    >>> float_graph = PhasePortrait(id, a, b, 10 ** 16)
+    Computations finished 
+    >>> float_graph.values[0, 0] != float_graph.values[0, 1]
+    False
+
+    Values kept in memory, and recovered when the window is moved:
+
+    >>> memo = ValueMemo()
+    >>> a, b = RiemannSphere(0, 0), RiemannSphere(1, 1)
+    >>> graph = PhasePortrait(square, a, b, 4, memo=memo)
+    Computations finished 
+    >>> c, d = RiemannSphere(Fraction(1, 2), 0), RiemannSphere(2, 1)
+    >>> moved_graph = PhasePortrait(square, c, d, 4, memo=memo)
+    Computations finished 
+    >>> moved_graph.statistics.nb_of_memo_hits, moved_graph.statistics.nb_of_misses
+    (15, 20)
+    >>> moved_graph.values[0, 0] == graph.values[2, 0]
+    True
+    >>> zoomed_graph = PhasePortrait(square, a, b, 8, memo=memo)
+    Computations finished 
+    >>> zoomed_graph.statistics.nb_of_memo_hits, zoomed_graph.statistics.nb_of_misses
+    (25, 56)
+
+    Values and colors reused from the previous phase portrait:
+
+    >>> graph.draw()
+    >>> moved_graph = PhasePortrait(square, c, d, 4, seed=graph)
+    Computations finished 
+    >>> moved_graph.seed_offset, moved_graph.statistics.nb_of_misses
+    ((-2, 0), 20)
+    >>> moved_graph.draw()
+    >>> full_graph = PhasePortrait(square, c, d, 4)
+    Computations finished 
+    >>> full_graph.draw()
+    >>> moved_graph.img.tobytes() == full_graph.img.tobytes()
+    True
+
+    Values memory-mapped in a file, and drawn by strips:
+
+    >>> import tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), "grid.npy")
+    >>> grid_graph = PhasePortrait(square, c, d, 4, grid=path)
+    Computations finished 
+    >>> grid_graph.values[2, 3] == full_graph.values[2, 3]
+    True
+    >>> grid_graph.draw()
+    >>> grid_graph.img.tobytes() == full_graph.img.tobytes()
+    True
+
+    Image colored and saved by strips of rows:
+
+    >>> directory = tempfile.mkdtemp() + os.sep
+    >>> grid_graph.save_by_strips(directory, "grid.png", strip_size=2)
+    >>> full_graph.save(directory, "full.png")
+    >>> (Image.open(directory + "grid.png").tobytes() ==
+    ...  Image.open(directory + "full.png").tobytes())
+    True
+
+    Computation interrupted, and resumed from its checkpoint:
+
+    >>> evaluations = []
+    >>> def interrupted(z):
+    ...     evaluations.append(z)
+    ...     if len(evaluations) == 30000:
+    ...         raise KeyboardInterrupt
+    ...     return z * z
+    >>> path = os.path.join(tempfile.mkdtemp(), "checkpoint.npy")
+    >>> a, b = RiemannSphere(0, 0), RiemannSphere(3, 1)
+    >>> try:
+    ...     graph = PhasePortrait(interrupted, a, b, 100, compiled=False,
+    ...                           vectorized=False, checkpoint=path)
+    ... except KeyboardInterrupt:
+    ...     print("Interrupted")
+    Interrupted
+    >>> graph = PhasePortrait(interrupted, a, b, 100, compiled=False,
+    ...                       vectorized=False, checkpoint=path)
+    Computations finished 
+    >>> graph.size, graph.statistics.nb_of_misses, len(evaluations)
+    ((301, 101), 402, 30402)
+    >>> try:
+    ...     PhasePortrait(interrupted, a, b, 50, checkpoint=path)
+    ... except ValueError as error:
+    ...     print(str(error).endswith("other parameters"))
+    True
+    >>> PhasePortrait(square, a, b, 4, backend="mpmath")
+    Traceback (most recent call last):
+        ...
+    ValueError: Unknown backend 'mpmath': the backend is "float", "auto", or a backend of the NumberBackend module
     """
 
+    # Number of points given at once to a vectorized function
+    ARRAY_CHUNK = 65536
+
+    # Number of probed points along each axis of the grid, besides
+    # the points of the real and imaginary axes
+    NB_OF_PROBED_POINTS = 8
+
+    # Tiles with at most MIN_CERTIFIED_TILE pixels are not evaluated on
+    # a ball: their pixels are evaluated one by one
+    MIN_CERTIFIED_TILE = 16
+
     def __init__(self, function, left_below, right_upper, resolution,
-                 information=False, database="", data_logger=None):
+                 information=False, database="", data_logger=None,
+                 certified=False, derivative=False, backend="float",
+                 compiled=True, vectorized="auto", buffer_size=BUFFER_SIZE,
+                 version=None, precision=None, layout="rows", memo=False,
+                 seed=None, grid=None, checkpoint=None):
         """ Constructor of the class
         :param function: represents the function [a, b] + [c, d] * i -> C
                          whose phase portrait will be drawn
@@ -142,11 +446,145 @@ class PhasePortrait:
                          the path of a database containing values of
                          the function we are currently graphing ; if database
                          is non empty, we will use values already computing
-                         and add some new ones
+                         and add some new ones. It can also be the URL of
+                         a cache of tiles ("memory:", "memory:name",
+                         "sqlite:path" or "npy:path"), or a TileCache (see
+                         the CacheBackends module): the values are then saved
+                         by tiles
         :param data_logger: logging.logging.Logger, which is a data logger
                             to record information during computation
+        :param certified: boolean, which is by default equals to False,
+                          which indicates if the function has first to be
+                          evaluated on balls containing whole tiles of
+                          the grid, to fill the tiles whose pixels provably
+                          have the same color without evaluating the function
+                          at each of their pixels. The function has to be
+                          built from RiemannSphere operations (see the
+                          RiemannBall module) ; the values of the pixels of
+                          filled tiles are the centre of the computed ball,
+                          and are never saved in the database
+        :param derivative: boolean, which is by default equals to False,
+                           which indicates if the grid of the derivatives of
+                           the function has to be kept. The derivatives are
+                           computed together with the values, using
+                           RiemannDual numbers (see the RiemannDual module),
+                           so that every pixel is evaluated, even if its value
+                           is in the database, and the certified filling
+                           is not used
+        :param backend: "float", "auto", or a backend of the NumberBackend
+                        module (FloatBackend or MPMathBackend), which is by
+                        default equals to "float", which indicates the numbers
+                        used to evaluate the function. With "auto", the
+                        precision needed to distinguish the pixels is
+                        computed from the rectangle and the resolution, and
+                        multiprecision numbers are used if floats are not
+                        precise enough
+        :param compiled: boolean, which is by default equals to True,
+                         which indicates if the function has to be traced
+                         and compiled into a NumPy kernel (see the Tracer
+                         module) evaluating it on the whole grid at once.
+                         When the function can not be traced, for instance
+                         because it branches on the values of its argument,
+                         it is evaluated pixel by pixel. The kernel is only
+                         used with the float backend, and when the
+                         derivatives are not kept
+        :param vectorized: True, False or "auto", which is by default equals
+                           to "auto", which indicates if the function accepts
+                           NumPy arrays of complex numbers (see the Vectorized
+                           module), so that it is evaluated on whole chunks of
+                           the grid. With "auto", the function is evaluated on
+                           arrays if it is marked with the vectorized
+                           decorator, or if it gives on probed points spread
+                           over the grid and on its axes the same values on
+                           arrays and on RiemannSphere complex numbers ; its
+                           pixels whose values on arrays are not finite are
+                           then evaluated one by one. As the compiled
+                           kernels, vectorized functions are only used with
+                           the float backend, and when the derivatives are
+                           not kept
+        :param buffer_size: int, which is by default equals to BUFFER_SIZE,
+                            which indicates the number of values written at
+                            once in the database, in a single transaction
+        :param version: String, which is by default None, which indicates
+                        the version of the function: the values saved in
+                        the database are only used for the same version.
+                        By default, the version attribute of the function is
+                        used if it exists, and otherwise its source code
+        :param precision: int, which is by default None, which indicates
+                          the precision in bits of the computed values, saved
+                          with them in the database (see the Database module):
+                          the values of the database are only used if they
+                          have been computed with at least this precision,
+                          and the others are recomputed and replaced. By
+                          default, the precision attribute of the function is
+                          used if it exists, and otherwise the precision of
+                          the backend
+        :param layout: "rows" or "tiles", which is by default equals to
+                       "rows", which indicates if the values are saved in
+                       the database by rows, one per value, or by compressed
+                       tiles of TILE_SIZE x TILE_SIZE values (see
+                       the TileStore module), which are much faster to
+                       recover. Only the grids whose corner a + i c is
+                       a point of the lattice of the resolution can be saved
+                       by tiles: the values of the others are saved by rows,
+                       and are not saved if database is a cache of tiles.
+                       The values are not saved either in a read-only
+                       cache (see the CacheBackends module), which can be
+                       layered under a writable cache
+        :param memo: False, True or a ValueMemo, which is by default equals
+                     to False, which indicates the memo where the computed
+                     values are kept in memory (see the ValueMemo module),
+                     and where the values are looked for before being
+                     computed: with True, the memo SHARED_MEMO shared by
+                     the phase portraits of the process. The memo is not used
+                     when the derivatives are kept, and the values of
+                     the pixels of the certified tiles are not kept. The values
+                     are keyed on the function object too, so that the memo
+                     has to be cleared when a global variable used by
+                     the function changes
+        :param seed: PhasePortrait, which is by default None, which indicates
+                     the previous phase portrait, typically of a window
+                     before it is moved: the values of the pixels it shares
+                     with the current window are copied instead of being
+                     computed, and the colors of these pixels are copied by
+                     the draw method if the seed has been drawn. The seed is
+                     only used for the same function, resolution and
+                     precision, when the two grids have the same lattice and
+                     the derivatives are not kept. Its values are not saved
+                     in the database
+        :param grid: String, which is by default None, which indicates
+                     the path of a .npy file where the values are
+                     memory-mapped (see the ValueGrid module), for
+                     the portraits too large to keep their values in
+                     memory. The values are then computed by blocks of
+                     STRIP_SIZE x STRIP_SIZE pixels written in the file, and
+                     drawn by strips. The image drawn by the draw method is
+                     still kept in memory: the save_by_strips method saves
+                     the image without keeping it. In this out-of-core mode,
+                     the values are neither recovered from nor saved in
+                     the database, the memo and the seed, and the certified
+                     filling and the derivatives are not used
+        :param checkpoint: String, which is by default None, which indicates
+                           the path of the .npy file of a checkpoint (see
+                           the Checkpoint module): the values are computed in
+                           out-of-core mode in this file, instead of the grid
+                           file, and the progress is flushed periodically. If
+                           the computation is interrupted, the same phase
+                           portrait resumes from the checkpoint and only
+                           computes the blocks not done. A checkpoint written
+                           for other parameters raises a ValueError
+
+        :raised error: ValueError when the backend is an unknown String, or
+                       when the checkpoint has been written for other
+                       parameters
         """
         self.function = function
+        self.checkpoint = checkpoint
+        if checkpoint is not None:
+            grid = checkpoint
+        self.grid = grid
+        if grid is not None:
+            certified, derivative, memo, seed = False, False, False, None
         self.left_below = left_below
         self.right_upper = right_upper
         length_x = self.right_upper.real - self.left_below.real
@@ -158,13 +596,244 @@ class PhasePortrait:
         self.liste_y = [self.left_below.imaginary + Fraction(i, resolution)
                         for i in range(int((self.right_upper.imaginary - self.left_below.imaginary) * resolution) + 1)]
         self.database = database
+        self.buffer_size = buffer_size
+        self.version = version
+        self.known_identity = None
+        self.function_id = None
         self.data_logger = data_logger
-        self.values = self.compute(resolution, information)
+        self.certified = certified and not derivative
+        if derivative:
+            self.derivatives = {}
+        else:
+            self.derivatives = None
+        if backend == "float":
+            backend = FloatBackend()
+        elif backend == "auto":
+            backend = select_backend(left_below, right_upper, resolution)
+        elif isinstance(backend, str):
+            raise ValueError("Unknown backend " + repr(backend) + ": " +
+                             "the backend is \"float\", \"auto\", or " +
+                             "a backend of the NumberBackend module")
+        self.backend = backend
+        if precision is None:
+            precision = getattr(function, 'precision', backend.precision)
+        self.precision = precision
+        self.provenance_id = None
+        self.cache = None
+        self.statistics = None
+        if memo is True:
+            memo = SHARED_MEMO
+        if memo is False or derivative:
+            memo = None
+        self.memo = memo
+        self.memo_key = None
+        if memo is not None:
+            self.memo_key = memo.function_key(function, self.identity)
+        self.memo_origin = tuple(int(X) if X.denominator == 1 else X
+                                 for X in (Fraction(left_below.real) *
+                                           resolution,
+                                           Fraction(left_below.imaginary) *
+                                           resolution))
+        self.memo_buffer = []
+        self.seed = seed
+        self.seed_offset = None
+        self.unseeded = set()
+        if seed is not None:
+            # The seed of the seed is not needed anymore
+            seed.seed = None
+            self.seed_offset = self.offset_of(seed)
+        if isinstance(database, TileCache) or is_cache_url(database):
+            layout = "tiles"
+        if layout == "tiles" and is_aligned(left_below.real,
+                                            left_below.imaginary, resolution):
+            self.layout = "tiles"
+            self.lattice_origin = (int(Fraction(left_below.real) * resolution),
+                                   int(Fraction(left_below.imaginary) *
+                                       resolution))
+        else:
+            self.layout = "rows"
+            self.lattice_origin = None
+            if isinstance(database, TileCache) or is_cache_url(database):
+                self.database = ""
+        self.compiled = compiled and not derivative and \
+            isinstance(backend, FloatBackend)
+        self.probed = False
+        if not derivative and isinstance(backend, FloatBackend):
+            if vectorized == "auto":
+                vectorized = is_vectorized(function) or \
+                    probe(function, self.probed_points())
+                self.probed = vectorized and not is_vectorized(function)
+        else:
+            vectorized = False
+        self.vectorized = vectorized
+        if information:
+            self.log_info("Evaluations with the " + str(self.backend) +
+                          " backend ")
+        with using_backend(self.backend):
+            self.values = self.compute(resolution, information)
+
+
+    @property
+    def identity(self):
+        """ Identity of the function, computed the first time it is needed:
+        by the database, the cache, the memo, the seed or the checkpoint
+
+        :return value: String
+
+        :raised error: ValueError when a value bound to the function can not
+                       be described, and the function has no version (see
+                       the FunctionIdentity module)
+        """
+        if self.known_identity is None:
+            self.known_identity = function_identity(self.function,
+                                                    self.version)
+        return self.known_identity
+
+    def identity_or_none(self):
+        """ Identity of the function, when it is not needed, for instance
+        to record the cost of a value (see the CacheStatistics module)
+
+        :return value: String, or None if it can not be computed
+
+        >>> from threading import Lock
+        >>> class Locked(object):
+        ...     def __init__(self):
+        ...         self.lock = Lock()
+        ...     def __call__(self, z):
+        ...         return z
+        >>> graph = PhasePortrait(Locked(), RiemannSphere(0, 0),
+        ...                       RiemannSphere(1, 1), 2)
+        Computations finished 
+        >>> graph.identity_or_none() is None
+        True
+        >>> graph.identity
+        Traceback (most recent call last):
+            ...
+        ValueError: A value of type lock bound to the function can not be described: give a version to the function
+        """
+        try:
+            return self.identity
+        except ValueError:
+            return None
+
+    def probed_points(self):
+        """ Choose the points of the grid where the function is probed (see
+        the probe function of the Vectorized module): NB_OF_PROBED_POINTS
+        abscissas and ordinates spread over the grid, and the abscissa and
+        the ordinate 0, so that the points on the axes are probed, as well
+        as the branch cuts of the principal logarithm and square root
 
+        :return value: list of complex numbers
+
+        >>> graph = PhasePortrait(lambda z: z, RiemannSphere(-1, -1),
+        ...                       RiemannSphere(1, 1), 10, vectorized=False)
+        Computations finished 
+        >>> points = graph.probed_points()
+        >>> len(points), complex(-1, 0) in points, complex(0, 1) in points
+        (81, True, True)
+        """
+        def spread(liste):
+            n = self.NB_OF_PROBED_POINTS
+            chosen = {liste[(len(liste) - 1) * k // max(n - 1, 1)]
+                      for k in range(n)}
+            if liste[0] <= 0 <= liste[-1]:
+                chosen.add(0)
+            return sorted(chosen)
+        return [complex(x, y) for x in spread(self.liste_x)
+                for y in spread(self.liste_y)]
+
+    def log_info(self, text):
+        """ Print a text, or record it in the data logger if there is one
+
+        :param text: String
+        """
+        if self.data_logger is None:
+            print(text)
+        else:
+            self.data_logger.info(text)
+
+    def compute_certified_values(self, values, information):
+        """ Fill the tiles of the grid whose pixels provably have the same
+        color. The function is evaluated on a ball containing a tile: if all
+        the points of the resulting ball have the same color, every pixel of
+        the tile gets the centre of the ball as value. Otherwise, the tile is
+        split into four sub-tiles, until tiles of MIN_CERTIFIED_TILE pixels.
+        A tile whose image is not a RiemannBall is not filled.
+
+        :param values: dictionnary whose keys/values described values already
+                               computed of the current complex function.
+                               It is updated with the values of the pixels
+                               of the filled tiles
+        :param information: boolean, which indicates if the user wants to see
+                            the progression of the calculation
+
+        :return value: int, the number of filled pixels
+
+        >>> def dropping(z):
+        ...     return RiemannSphere(z.real, z.imaginary) + 1
+        >>> a, b = RiemannSphere(0, 0), RiemannSphere(3, 3)
+        >>> graph = PhasePortrait(dropping, a, b, 10, certified=True,
+        ...                       compiled=False, vectorized=False)
+        Computations finished 
+        >>> graph.compute_certified_values({}, False)
+        0
+        >>> graph.draw()
+        >>> expected = PhasePortrait(dropping, a, b, 10, compiled=False,
+        ...                          vectorized=False)
+        Computations finished 
+        >>> expected.draw()
+        >>> graph.img.tobytes() == expected.img.tobytes()
+        True
+        """
+        t_0 = time()
+        nb_of_filled_pixels = 0
+        tiles = [(0, len(self.liste_x), 0, len(self.liste_y))]
+        while tiles:
+            i_0, i_1, j_0, j_1 = tiles.pop()
+            if (i_1 - i_0) * (j_1 - j_0) <= self.MIN_CERTIFIED_TILE:
+                continue
+            pixels = [(i, j) for i in range(i_0, i_1) for j in range(j_0, j_1)
+                      if (i, j) not in values]
+            if not pixels:
+                continue
+            ball = RiemannBall.around(RiemannSphere(self.liste_x[i_0],
+                                                    self.liste_y[j_0]),
+                                      RiemannSphere(self.liste_x[i_1 - 1],
+                                                    self.liste_y[j_1 - 1]))
+            try:
+                image_of_ball = self.function(ball)
+            except (ValueError, TypeError, ZeroDivisionError,
+                    OverflowError, AttributeError):
+                image_of_ball = None
+            if not isinstance(image_of_ball, RiemannBall):
+                # The function does not compute with balls, for instance
+                # because it builds its value from the components of its
+                # argument: its pixels are evaluated one by one
+                continue
+            if certified_RGB(image_of_ball) is not None:
+                image_of_ball = image_of_ball.centre()
+                for pixel in pixels:
+                    values[pixel] = image_of_ball
+                nb_of_filled_pixels += len(pixels)
+            else:
+                i_m = (i_0 + i_1) // 2
+                j_m = (j_0 + j_1) // 2
+                for (i_a, i_b) in [(i_0, i_m), (i_m, i_1)]:
+                    for (j_a, j_b) in [(j_0, j_m), (j_m, j_1)]:
+                        if i_a < i_b and j_a < j_b:
+                            tiles.append((i_a, i_b, j_a, j_b))
+        if information:
+            t_1 = time()
+            str_time = str(int((t_1 - t_0) * 1000) / 1000) + "s. "
+            self.log_info(str(nb_of_filled_pixels) + " pixels filled by " +
+                          "certified tiles in " + str_time)
+        return nb_of_filled_pixels
 
     def recover_datas(self, resol, information, connection, cursor):
         """ Recover datas already computed in the past and stored
-        in the database of the current phase portrait
+        in the database of the current phase portrait, with range queries on
+        the lattice coordinates of the points (see the Database module).
+        Nothing is written in the database.
 
         :param resolution: value used to discretised the rectangle
                                [a, b] + [c, d] * i such that there will be
@@ -173,106 +842,220 @@ class PhasePortrait:
                             which indicates if the user wants to see
                             the progression of the calculation in order
                             to produce the image
+        :param connection: Connection object, connected to the database,
+                           or None if the values are saved in a cache of tiles
+        :param cursor: Cursor object, connected to the database, or None
+                       if the values are saved in a cache of tiles
 
         :return value: a dictionnary whose keys/values described values already
                                computed of the current complex function
         """
         values = {}
         if information:
-            text = "Loading datas in progress "
-            if self.data_logger is None:
-                print(text)
-            else:
-                self.data_logger.info(text)
-            t_0 = time()
-            text = "Creation of a temporary table in the database " +\
-                   self.database + " "
-            if self.data_logger is None:
-                print(text)
-            else:
-                self.data_logger.info(text)
-        cursor.execute('''CREATE TABLE IF NOT EXISTS TMP(
-                          multiplier INTEGER,
-                          real INTEGER,
-                          imaginary INTEGER);''')
-        for y in self.liste_y:
-            for x in self.liste_x:
-                lcm_tmp = abs(x.denominator * y.denominator) // gcd(x.denominator, y.denominator)
-                cursor.execute('''INSERT \
-                                  INTO TMP(multiplier, real, imaginary) \
-                                  VALUES (?, ?, ?)''',
-                               (lcm_tmp, int(x * lcm_tmp), int(y * lcm_tmp),))
-        connection.commit()
-        if information:
-            t_1 = time()
-            str_time = str(int((t_1 - t_0) * 1000) / 1000) + "s. "
-            text = "Temporary table created in " + str_time
-            if self.data_logger is None:
-                print(text)
-            else:
-                self.data_logger.info(text)
+            self.log_info("Loading datas in progress ")
             t_0 = time()
-        SQL = "SELECT Zmultiplier, Zreal, Zimaginary, " + \
-              "       Value.real, Value.imaginary, Value.infinite " + \
-              "FROM Value " + \
-              "JOIN (SELECT Z.Id AS ZId, " + \
-              "             Z.multiplier AS Zmultiplier, " + \
-              "             Z.real AS Zreal, " + \
-              "             Z.imaginary AS Zimaginary " + \
-              "      FROM Z JOIN Tmp ON Z.multiplier = Tmp.Multiplier " + \
-              "                      AND Z.real = Tmp.Real " + \
-              "                      AND Z.imaginary = Tmp.Imaginary" + \
-              "     ) ON ZId = Value.Id;"
-        cursor.execute(SQL)
+        x_min, x_max = Fraction(self.liste_x[0]), self.liste_x[-1]
+        y_min, y_max = Fraction(self.liste_y[0]), self.liste_y[-1]
+        if self.layout == "tiles":
+            self.recover_tiles(values)
+            queries = []
+        elif not has_tables(cursor):
+            return values
+        else:
+            function_id = find_function_id(cursor, self.identity)
+            if function_id is None:
+                return values
+            queries = range_queries(function_id, x_min, x_max, y_min, y_max,
+                                    self.resolution, self.precision)
+        for query in queries:
+            multiplier = query[1]
+            # The point real / m + i imaginary / m is the pixel (i, j),
+            # where i = (real * q - p * m) * resolution / (m * q) for
+            # x_min = p / q, if it is an integer ; and similarly for j
+            den_x = multiplier * x_min.denominator
+            shift_x = x_min.numerator * multiplier
+            den_y = multiplier * y_min.denominator
+            shift_y = y_min.numerator * multiplier
+            cursor.execute(SELECT_RANGE, query)
+            rows = cursor.fetchmany(FETCH_SIZE)
+            while rows:
+                for row in rows:
+                    i, r_i = divmod((row[0] * x_min.denominator - shift_x) *
+                                    self.resolution, den_x)
+                    j, r_j = divmod((row[1] * y_min.denominator - shift_y) *
+                                    self.resolution, den_y)
+                    if r_i == 0 and r_j == 0:
+                        values[i, j] = value_of_row(*row[2:])
+                rows = cursor.fetchmany(FETCH_SIZE)
         if information:
             t_1 = time()
-            str_time = str(int((t_1 - t_0) * 1000) / 1000) + " s. "
-            text = "Recovery of already computed values realised in " + str_time
-            if self.data_logger is None:
-                print(text)
-            else:
-                self.data_logger.info(text)
-            text = "Transformation of the already done computations " + \
-                   "into complex numbers in progress. "
-            if self.data_logger is None:
-                print(text)
-            else:
-                self.data_logger.info(text)
-        computed_value = cursor.fetchone()
-        nb_computed_values = 0
-        while computed_value is not None:
-            z_mult = computed_value[0]
-            z_real = computed_value[1]
-            z_im = computed_value[2]
-            val_real, val_im, val_inf = convert(computed_value[3],
-                                                computed_value[4],
-                                                computed_value[5])
-            x = Fraction(z_real, z_mult)
-            y = Fraction(z_im, z_mult)
-            pixel = (self.liste_x.index(x), self.liste_y.index(y))
-            values[pixel] = RiemannSphere(val_real, val_im, infinite=val_inf)
-            nb_computed_values += 1
-            computed_value = cursor.fetchone()
-        if information:
-            t_2 = time()
             nb_of_values_to_compute = len(self.liste_x) * len(self.liste_y)
-            proportion = nb_computed_values / nb_of_values_to_compute
-            str_time = str(int((t_2 - t_1) * 1000) / 1000) + "s. "
-            text = "Transformation into complex numbers finished in " + str_time
-            if self.data_logger is None:
-                print(text)
-            else:
-                self.data_logger.info(text)
-            text = str(int(10000 * proportion) / 100) + \
-                  "% of the data to compute have already been computed. "
-            if self.data_logger is None:
-                print(text)
-            else:
-                self.data_logger.info(text)
-        cursor.execute('''DROP TABLE TMP;''')
+            proportion = len(values) / nb_of_values_to_compute
+            str_time = str(int((t_1 - t_0) * 1000) / 1000) + "s. "
+            self.log_info("Recovery of already computed values realised " +
+                          "in " + str_time)
+            self.log_info(str(int(10000 * proportion) / 100) +
+                          "% of the data to compute have already been " +
+                          "computed. ")
         return values
 
-    def compute_a_value(self, z, pixel, resol, values, cursor):
+    def recover_tiles(self, values):
+        """ Recover the values saved by tiles in the cache of the current
+        phase portrait (see the TileStore and CacheBackends modules)
+
+        :param values: dictionnary whose keys are pixels, and which is updated
+                       with the recovered values
+        """
+        X_0, Y_0 = self.lattice_origin
+        X_1, Y_1 = X_0 + len(self.liste_x) - 1, Y_0 + len(self.liste_y) - 1
+        for (tile_x, tile_y, tile_values, presence) in \
+                self.cache.get_tiles(self.identity, self.resolution,
+                                     (X_0, X_1), (Y_0, Y_1), self.precision):
+            # Part of the tile in the window, in coordinates of the tile
+            a_0 = max(X_0 - tile_x * TILE_SIZE, 0)
+            a_1 = min(X_1 - tile_x * TILE_SIZE, TILE_SIZE - 1) + 1
+            b_0 = max(Y_0 - tile_y * TILE_SIZE, 0)
+            b_1 = min(Y_1 - tile_y * TILE_SIZE, TILE_SIZE - 1) + 1
+            i_0 = tile_x * TILE_SIZE + a_0 - X_0
+            j_0 = tile_y * TILE_SIZE + b_0 - Y_0
+            window = presence[a_0:a_1, b_0:b_1]
+            found = tile_values[a_0:a_1, b_0:b_1][window]
+            rows, columns = np.nonzero(window)
+            for (a, b, x, y, infinite) in zip(rows.tolist(), columns.tolist(),
+                                              found.real.tolist(),
+                                              found.imag.tolist(),
+                                              np.isinf(found).tolist()):
+                if infinite:
+                    values[i_0 + a, j_0 + b] = INFTY
+                else:
+                    values[i_0 + a, j_0 + b] = RiemannSphere(x, y)
+
+    def offset_of(self, seed):
+        """ Compute the offset of the pixels of a previous phase portrait
+
+        :param seed: PhasePortrait
+        :return value: pair of int (dx, dy), such that the pixel (i, j) of
+                       the seed is the pixel (i + dx, j + dy) of the current
+                       phase portrait, or None if the values of the seed can
+                       not be used
+        """
+        if not isinstance(seed, PhasePortrait) or \
+                self.derivatives is not None or \
+                seed.identity != self.identity or \
+                seed.resolution != self.resolution or \
+                seed.precision < self.precision:
+            return None
+        dx = (Fraction(seed.left_below.real) -
+              Fraction(self.left_below.real)) * self.resolution
+        dy = (Fraction(seed.left_below.imaginary) -
+              Fraction(self.left_below.imaginary)) * self.resolution
+        if dx.denominator != 1 or dy.denominator != 1:
+            return None
+        return (int(dx), int(dy))
+
+    def recover_seed(self, to_compute, values):
+        """ Copy the values of the pixels shared with the seed. The pixels
+        shared with the seed which have no value in it are kept in
+        the unseeded attribute
+
+        :param to_compute: list of pairs of Fractions, which are the points
+                           where the function has to be evaluated
+        :param values: dictionnary whose keys are pixels, and which is updated
+                       with the copied values
+
+        :return value: list of pairs of Fractions, the points which remain
+                       to compute
+        """
+        dx, dy = self.seed_offset
+        seed_values = self.seed.values
+        (i_0, i_1), (j_0, j_1) = self.shared_pixels()
+        if len(seed_values) < self.seed.size[0] * self.seed.size[1]:
+            self.unseeded = {(i, j) for i in range(i_0, i_1)
+                             for j in range(j_0, j_1)
+                             if (i - dx, j - dy) not in seed_values}
+        dict_x = {x: pos for pos, x in enumerate(self.liste_x)}
+        dict_y = {y: pos for pos, y in enumerate(self.liste_y)}
+        remaining = []
+        for (x, y) in to_compute:
+            i, j = dict_x[x], dict_y[y]
+            if i_0 <= i < i_1 and j_0 <= j < j_1:
+                value = seed_values.get((i - dx, j - dy))
+                if value is not None:
+                    values[i, j] = value
+                    continue
+            remaining.append((x, y))
+        return remaining
+
+    def shared_pixels(self):
+        """ Give the pixels shared with the seed
+
+        :return value: pair ((i_0, i_1), (j_0, j_1)), such that the shared
+                       pixels are the pixels (i, j), for i_0 <= i < i_1 and
+                       j_0 <= j < j_1
+        """
+        dx, dy = self.seed_offset
+        return ((max(dx, 0), max(min(self.size[0], self.seed.size[0] + dx), 0)),
+                (max(dy, 0), max(min(self.size[1], self.seed.size[1] + dy), 0)))
+
+    def recover_memo(self, to_compute, values, writer):
+        """ Recover from the memo the values of the points to compute (see
+        the ValueMemo module), including the values kept at the resolutions
+        resolution / 2 ** k. When most of the window has to be computed,
+        the values of the whole window are recovered in a single query.
+        The recovered values are saved in the database by the writer, as
+        the computed values
+
+        :param to_compute: list of pairs of Fractions, which are the points
+                           where the function has to be evaluated
+        :param values: dictionnary whose keys are pixels, and which is updated
+                       with the recovered values
+        :param writer: BackgroundWriter or TileWriter object, which buffers
+                       the values to save in the database, or None
+
+        :return value: list of pairs of Fractions, the points which remain
+                       to compute
+        """
+        dict_x = {x: pos for pos, x in enumerate(self.liste_x)}
+        dict_y = {y: pos for pos, y in enumerate(self.liste_y)}
+        X_0, Y_0 = self.memo_origin
+        pixels = [(dict_x[x], dict_y[y]) for (x, y) in to_compute]
+        if isinstance(X_0, int) and isinstance(Y_0, int) and \
+                2 * len(to_compute) > self.size[0] * self.size[1]:
+            found = self.memo.get_window(self.memo_key, self.resolution,
+                                         (X_0, X_0 + self.size[0] - 1),
+                                         (Y_0, Y_0 + self.size[1] - 1),
+                                         self.precision)
+        else:
+            found = self.memo.get(self.memo_key, self.resolution,
+                                  [(X_0 + i, Y_0 + j) for (i, j) in pixels],
+                                  self.precision)
+        if not found:
+            return to_compute
+        remaining = []
+        for (point, (i, j)) in zip(to_compute, pixels):
+            value = found.get((X_0 + i, Y_0 + j))
+            if value is None:
+                remaining.append(point)
+            else:
+                values[i, j] = value
+                if writer is not None:
+                    self.write_a_value((i, j), values, writer)
+        return remaining
+
+    def open_cache(self):
+        """ Open the cache of tiles of the current phase portrait: the cache
+        given as database, the cache described by the URL given as database,
+        or the ValueTile table of the database given by its path
+
+        :return value: TileCache
+        """
+        if isinstance(self.database, TileCache):
+            return self.database
+        if is_cache_url(self.database):
+            return open_cache(self.database)
+        return SQLiteCache(self.database)
+
+    def compute_a_value(self, z, pixel, resol, values, writer):
         """ Compute the image of the current complex function at
         the Riemann sphere complex number z = x + i y and save it in the values dictionary.
 
@@ -286,34 +1069,23 @@ class PhasePortrait:
                                pixels, while values are the computed values of
                                the current function at the Riemann sphere
                                complex number z
-        :param cursor: Cursor object, created after being connected to
-                         a sqlite3 database containing values of the function
-                         we are currently graphing, used to add the complex
-                         valueswe will compute here
+        :param writer: BackgroundWriter or TileWriter object, which buffers
+                       the values to save in the database of the function we
+                       are currently graphing, or None
 
         The values dictionnary will be updated, as well as the database related
-        with the cursor object, during the execution of the compute_a_value
+        with the writer object, during the execution of the compute_a_value
         function
         """
         try:
-            values[pixel] = self.function(z)
-            if self.database != "":
-                lcm_tmp = int(abs(z.real.denominator * z.imaginary.denominator) // gcd(z.real.denominator,
-                                                                                       z.imaginary.denominator))
-                cursor.execute('''INSERT
-                                  INTO Z(multiplier, real, imaginary, infinite)
-                                  VALUES (?, ?, ?, ?)''', (lcm_tmp,
-                                                           int(z.real * lcm_tmp),
-                                                           int(z.imaginary * lcm_tmp), 0,))
-                if values[pixel].is_infinite():
-                    infty = 1
-                else:
-                    infty = 0
-                cursor.execute('''INSERT INTO Value(real, imaginary, infinite)
-                                      VALUES (?, ?, ?)''',
-                               (float(values[pixel].real),
-                                float(values[pixel].imaginary),
-                                infty,))
+            already_saved = pixel in values
+            if self.derivatives is None:
+                values[pixel] = self.function(z)
+            else:
+                values[pixel], self.derivatives[pixel] = \
+                    value_and_derivative(self.function, z)
+            if not already_saved:
+                self.save_a_value(pixel, values, writer)
         except ValueError:
             text = "Pixel " + str(pixel) + " has no value: " + \
                    "the image of z = " + str(z) + " has not been computed "
@@ -322,6 +1094,175 @@ class PhasePortrait:
             else:
                 self.data_logger.exception(text)
 
+    def save_a_value(self, pixel, values, writer):
+        """ Save in the database the value of the current complex function
+        at a pixel, and keep it in the memo
+
+        :param pixel: tuple of int, which represents the coordinates of
+                      the pixel
+        :param values: dictionnary whose keys/values described values already
+                               computed of the current complex function
+        :param writer: BackgroundWriter or TileWriter object, which buffers
+                       the values to save in the database of the function we
+                       are currently graphing, or None
+        """
+        if self.memo is not None:
+            self.memo_buffer.append(((self.memo_origin[0] + pixel[0],
+                                      self.memo_origin[1] + pixel[1]),
+                                     values[pixel]))
+        if writer is not None:
+            self.write_a_value(pixel, values, writer)
+
+    def write_a_value(self, pixel, values, writer):
+        """ Save in the database the value of the current complex function
+        at a pixel
+
+        :param pixel: tuple of int, which represents the coordinates of
+                      the pixel
+        :param values: dictionnary whose keys/values described values already
+                               computed of the current complex function
+        :param writer: BackgroundWriter or TileWriter object, which buffers
+                       the values to save in the database of the function we
+                       are currently graphing
+        """
+        if self.layout == "tiles":
+            writer.add(self.lattice_origin[0] + pixel[0],
+                       self.lattice_origin[1] + pixel[1], values[pixel])
+            return
+        x = self.liste_x[pixel[0]]
+        y = self.liste_y[pixel[1]]
+        writer.add(value_row(self.function_id, self.provenance_id, x, y,
+                             values[pixel]))
+
+    def compute_array_values(self, array_function, to_compute, values,
+                             writer, information, reevaluate):
+        """ Evaluate a vectorized function (see the Vectorized module) on
+        the points to compute, by chunks of ARRAY_CHUNK points.
+
+        :param array_function: function, which maps a NumPy array of complex
+                               numbers to the NumPy array of the values of
+                               the current complex function
+        :param to_compute: list of pairs of Fractions, which are the points
+                           where the function has to be evaluated
+        :param values: dictionnary whose keys/values described values already
+                               computed of the current complex function.
+                               It is updated with the values computed by
+                               array_function
+        :param writer: BackgroundWriter or TileWriter object, which buffers
+                       the values to save in the database, or None
+        :param information: boolean, which indicates if the user wants to see
+                            the progression of the calculation
+        :param reevaluate: boolean, which indicates if the points where
+                           array_function gives no finite value have to be
+                           evaluated pixel by pixel ; otherwise, an infinite
+                           component gives the infinite complex number, and
+                           a NaN component gives no value
+
+        :return value: list of pairs of Fractions, the points which remain
+                       to compute
+        """
+        t_0 = time()
+        dict_x = {x: pos for pos, x in enumerate(self.liste_x)}
+        dict_y = {y: pos for pos, y in enumerate(self.liste_y)}
+        remaining = []
+        nb_of_values = 0
+        for start in range(0, len(to_compute), self.ARRAY_CHUNK):
+            chunk = to_compute[start:start + self.ARRAY_CHUNK]
+            with np.errstate(all='ignore'):
+                images = array_function(np.array([complex(x, y)
+                                                  for (x, y) in chunk]))
+            images = np.broadcast_to(np.asarray(images, dtype=complex),
+                                     (len(chunk),))
+            is_finite = np.isfinite(images).tolist()
+            for (point, image, finite) in zip(chunk, images.tolist(),
+                                              is_finite):
+                if not finite and reevaluate:
+                    remaining.append(point)
+                    continue
+                pixel = (dict_x[point[0]], dict_y[point[1]])
+                if finite:
+                    value = RiemannSphere(image.real, image.imag)
+                else:
+                    value = as_riemann_sphere(image)
+                if value is None:
+                    self.log_info("Pixel " + str(pixel) + " has no value: " +
+                                  "the image of z = " +
+                                  str(RiemannSphere(point[0], point[1])) +
+                                  " has not been computed ")
+                    continue
+                values[pixel] = value
+                nb_of_values += 1
+                self.save_a_value(pixel, values, writer)
+        if information:
+            t_1 = time()
+            str_time = str(int((t_1 - t_0) * 1000) / 1000) + "s. "
+            self.log_info(str(nb_of_values) + " values computed on arrays " +
+                          "in " + str_time)
+        return remaining
+
+    def compute_values(self, to_compute, values, writer, resol, information):
+        """ Compute the images of the current complex function at
+        the points to compute: first by certified tiles, then on arrays,
+        then pixel by pixel.
+
+        :param to_compute: list of pairs of Fractions, which are the points
+                           where the function has to be evaluated
+        :param values: dictionnary whose keys/values described values already
+                               computed of the current complex function.
+                               It is updated with the computed values
+        :param writer: BackgroundWriter or TileWriter object, which saves
+                       the values in the database, or None
+        :param resol: resolution value used to discretised the rectangle
+                               [a, b] + [c, d] * i
+        :param information: boolean, which indicates if the user wants to see
+                            the progression of the calculation
+        """
+        # Certified filling of the tiles whose pixels have the same color
+        if self.certified:
+            self.compute_certified_values(values, information)
+            dict_x = {x: pos for pos, x in enumerate(self.liste_x)}
+            dict_y = {y: pos for pos, y in enumerate(self.liste_y)}
+            to_compute = [(x, y) for (x, y) in to_compute
+                          if (dict_x[x], dict_y[y]) not in values]
+        # Evaluation of the function on the whole grid, by chunks
+        if self.vectorized:
+            to_compute = self.compute_array_values(self.function, to_compute,
+                                                   values, writer, information,
+                                                   self.probed)
+        elif self.compiled and to_compute:
+            kernel = trace(self.function)
+            if kernel is not None:
+                to_compute = self.compute_array_values(kernel, to_compute,
+                                                       values, writer,
+                                                       information, True)
+        # Computation of the necessary values
+        if information:
+            if self.data_logger is None:
+                print("Preliminary computations have started")
+            else:
+                self.data_logger.info("Preliminary computations have started ")
+        lenght = len(to_compute)
+        one_half_per_cent = int(lenght / 200)
+        if one_half_per_cent == 0:
+            one_half_per_cent = 1
+        t_0 = time()
+        nb_of_element = 0
+        for (x, y) in to_compute:
+            z = RiemannSphere(self.backend.convert(x), self.backend.convert(y))
+            pixel = (self.liste_x.index(x), self.liste_y.index(y))
+            self.compute_a_value(z, pixel, resol, values, writer)
+            nb_of_element += 1
+            if nb_of_element % one_half_per_cent == 0:
+                if information:
+                    t_1 = time()
+                    per_cent = str(int(10000 * nb_of_element / lenght) / 100)
+                    str_time = str(int((t_1 - t_0) * 1000) / 1000) + "s. "
+                    text = "% of computations realised in "
+                    if self.data_logger is None:
+                        print(per_cent + text + str_time)
+                    else:
+                        self.data_logger.info(per_cent + text + str_time)
+
     def compute(self, resol, information):
         """ Compute all the images of the current complex function we want
         to draw. We consider the complex numbers that are in a grid of
@@ -340,80 +1281,119 @@ class PhasePortrait:
         :Return value: a dictionnary whose key are the complex number of
                        discretised rectangle [a, b] + [c, d] * i and the values
                        associated are the values of the current complex
-                       function
+                       function ; the statistics of the use of the database
+                       are kept in the statistics attribute
         """
-        if os.path.isfile(self.database):
+        if self.grid is not None:
+            return self.compute_grid(resol, information)
+        nb_of_values = len(self.liste_x) * len(self.liste_y)
+        t_0 = time()
+        if self.layout == "tiles" and self.database != "":
+            # Cache of tiles of values
+            statistics = CacheStatistics("tiles", nb_of_values,
+                                         self.identity)
+            self.cache = self.open_cache()
+            cache_stats = self.cache.stats()
+            values = self.recover_datas(resol, information, None, None)
+            # The values are only read in a read-only cache
+            if self.cache.read_only:
+                writer = None
+            else:
+                writer = TileWriter(self.cache, self.identity,
+                                    self.resolution, self.precision,
+                                    str(self.backend))
+            # Look for values to compute
+            to_compute = [(x, y) for (i, x) in enumerate(self.liste_x)
+                          for (j, y) in enumerate(self.liste_y)
+                          if (i, j) not in values
+                          or self.derivatives is not None]
+        elif os.path.isfile(self.database):
+            statistics = CacheStatistics("rows", nb_of_values,
+                                         self.identity)
             # Connection to the database
-            connection = sqlite3.connect(self.database)
+            connection = connect(self.database)
             cursor = connection.cursor()
+            # The values of a former database are the values of
+            # the function
+            create_tables(cursor, legacy_identity=self.identity)
+            self.function_id = register_function(cursor, self.identity)
+            self.provenance_id = register_provenance(cursor, self.precision,
+                                                     str(self.backend))
+            connection.commit()
             # Look back datas in the database
             values = self.recover_datas(resol, information, connection, cursor)
+            connection.close()
+            writer = BackgroundWriter(self.database, self.buffer_size)
             # Look for values to compute
             values_keys = values.keys()
             dict_x = {str(self.liste_x[pos]): pos for pos in range(len(self.liste_x))}
             dict_y = {str(self.liste_y[pos]): pos for pos in range(len(self.liste_y))}
             to_compute = [(x, y) for x in self.liste_x for y in self.liste_y
-                          if (dict_x[str(x)], dict_y[str(y)]) not in values_keys]
+                          if (dict_x[str(x)], dict_y[str(y)]) not in values_keys
+                          or self.derivatives is not None]
 #            to_compute = [(x, y) for x in self.liste_x for y in self.liste_y
 #                          if (self.liste_x.index(x), self.liste_y.index(y)) not in values_keys]
         elif self.database != "":
+            statistics = CacheStatistics("rows", nb_of_values,
+                                         self.identity)
             # Create the dictionnary to store the computed values
             values = {}
             # Connection to the database
-            connection = sqlite3.connect(self.database)
+            connection = connect(self.database)
             cursor = connection.cursor()
-            cursor.execute('''CREATE TABLE IF NOT EXISTS Z(
-                                 Id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
-                                 multiplier INTEGER,
-                                 real INTEGER,
-                                 imaginary INTEGER,
-                                 infinite BOOLEAN);''')
-            cursor.execute('''CREATE TABLE IF NOT EXISTS Value(
-                                 Id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
-                                 real FLOAT,
-                                 imaginary FLOAT,
-                                 infinite BOOLEAN);''')
+            create_tables(cursor)
+            self.function_id = register_function(cursor, self.identity)
+            self.provenance_id = register_provenance(cursor, self.precision,
+                                                     str(self.backend))
+            connection.commit()
+            connection.close()
+            writer = BackgroundWriter(self.database, self.buffer_size)
             # Look for values to compute
             to_compute = [(x, y) for x in self.liste_x for y in self.liste_y]
         else:
+            statistics = CacheStatistics(None, nb_of_values,
+                                         self.identity_or_none())
             # Look for values to compute
             to_compute = [(x, y) for x in self.liste_x for y in self.liste_y]
             # Create the dictionnary to store the computed values
             values = {}
-            # False database connection variable
-            cursor = None
-        # Computation of the necessary values
-        if information:
-            if self.data_logger is None:
-                print("Preliminary computations have started")
-            else:
-                self.data_logger.info("Preliminary computations have started ")
-        lenght = len(to_compute)
-        one_half_per_cent = int(lenght / 200)
-        if one_half_per_cent == 0:
-            one_half_per_cent = 1
+            # False database writer variable
+            writer = None
+        # Values of the previous phase portrait
+        if self.seed_offset is not None and to_compute:
+            to_compute = self.recover_seed(to_compute, values)
+        # Values kept in memory by the previous computations
+        if self.memo is not None and to_compute:
+            nb_to_compute = len(to_compute)
+            to_compute = self.recover_memo(to_compute, values, writer)
+            statistics.nb_of_memo_hits = nb_to_compute - len(to_compute)
+        statistics.read_duration = time() - t_0
+        statistics.nb_of_misses = len(to_compute)
+        statistics.nb_of_hits = nb_of_values - len(to_compute)
+        self.statistics = statistics
+        # The values are saved by the writer while they are computed ;
+        # the writer is closed even if the computations are interrupted
         t_0 = time()
-        nb_of_element = 0
-        for (x, y) in to_compute:
-            z = RiemannSphere(x, y)
-            pixel = (self.liste_x.index(x), self.liste_y.index(y))
-            self.compute_a_value(z, pixel, resol, values, cursor)
-            nb_of_element += 1
-            if nb_of_element % one_half_per_cent == 0:
-                if information:
-                    t_1 = time()
-                    per_cent = str(int(10000 * nb_of_element / lenght) / 100)
-                    str_time = str(int((t_1 - t_0) * 1000) / 1000) + "s. "
-                    text = "% of computations realised in "
-                    if self.data_logger is None:
-                        print(per_cent + text + str_time)
-                    else:
-                        self.data_logger.info(per_cent + text + str_time)
-                if self.database != "":
-                    connection.commit()
-        if self.database != "":
-            connection.commit()
-            cursor.close()
+        try:
+            self.compute_values(to_compute, values, writer, resol, information)
+        finally:
+            statistics.record_compute(time() - t_0)
+            if self.memo is not None:
+                self.memo.put(self.memo_key, self.resolution,
+                              self.memo_buffer, self.precision)
+                self.memo_buffer = []
+            if writer is not None:
+                writer.close()
+                statistics.record_writer(writer)
+                if information or self.data_logger is not None:
+                    self.log_info(writer.metrics())
+            if self.cache is not None:
+                statistics.record_cache(cache_stats, self.cache.stats())
+                if self.cache is not self.database:
+                    self.cache.close()
+                self.cache = None
+        if information or self.data_logger is not None:
+            self.log_info(statistics.summary())
         if information:
             if self.data_logger is None:
                 print("Preliminary computations are finished ")
@@ -426,6 +1406,158 @@ class PhasePortrait:
                 self.data_logger.info("Computation finished ")
         return values
 
+    def compute_grid(self, resol, information):
+        """ Compute the values of the current complex function in out-of-core
+        mode: the values are memory-mapped in the file of the grid attribute,
+        and computed by blocks of STRIP_SIZE x STRIP_SIZE pixels, on arrays if
+        the function is vectorized or compiled, and otherwise pixel by pixel.
+        The file is flushed after each strip of blocks. With a checkpoint,
+        the blocks already computed are skipped, and the progress is flushed
+        periodically and when the computation stops.
+
+        :param resol: resolution value used to discretised the rectangle
+                               [a, b] + [c, d] * i
+        :param information: boolean, which indicates if the user wants to see
+                            the progression of the calculation
+
+        :Return value: ValueGrid
+        """
+        nb_of_values = self.size[0] * self.size[1]
+        statistics = CacheStatistics(None, nb_of_values,
+                                     self.identity_or_none())
+        self.statistics = statistics
+        checkpoint = None
+        if self.checkpoint is not None:
+            checkpoint = Checkpoint(self.checkpoint, self.size,
+                                    parameters_hash(self.identity,
+                                                    self.left_below,
+                                                    self.right_upper, resol,
+                                                    self.precision,
+                                                    self.backend))
+            values = checkpoint.grid
+            if checkpoint.resumed and information:
+                self.log_info("Resumed from the checkpoint " +
+                              self.checkpoint + ", with " +
+                              str(int(np.count_nonzero(checkpoint.done))) +
+                              " blocks already computed ")
+        else:
+            values = ValueGrid(self.size, self.grid)
+        array_function, reevaluate = None, True
+        if self.vectorized:
+            array_function, reevaluate = self.function, self.probed
+        elif self.compiled:
+            array_function = trace(self.function)
+        x_array = np.array([float(x) for x in self.liste_x])
+        y_array = np.array([float(y) for y in self.liste_y])
+        t_0 = time()
+        try:
+            for (i_0, strip) in values.strips():
+                for j_0 in range(0, self.size[1], STRIP_SIZE):
+                    tile = (i_0 // STRIP_SIZE, j_0 // STRIP_SIZE)
+                    if checkpoint is not None and checkpoint.is_done(*tile):
+                        continue
+                    statistics.nb_of_misses += self.compute_a_block(
+                        strip[:, j_0:j_0 + STRIP_SIZE], (i_0, j_0), resol,
+                        values, array_function, reevaluate, x_array, y_array)
+                    if checkpoint is not None:
+                        checkpoint.mark_done(*tile)
+                values.flush()
+                if information:
+                    t_1 = time()
+                    per_cent = str(int(10000 * min(i_0 + STRIP_SIZE,
+                                                   self.size[0]) /
+                                       self.size[0]) / 100)
+                    str_time = str(int((t_1 - t_0) * 1000) / 1000) + "s. "
+                    self.log_info(per_cent + "% of computations realised in " +
+                                  str_time)
+        finally:
+            # The progress is kept even if the computation is interrupted
+            if checkpoint is not None:
+                checkpoint.close()
+        statistics.nb_of_hits = nb_of_values - statistics.nb_of_misses
+        statistics.record_compute(time() - t_0)
+        if information or self.data_logger is not None:
+            self.log_info(statistics.summary())
+        if self.data_logger is None:
+            print("Computations finished ")
+        else:
+            self.data_logger.info("Computation finished ")
+        return values
+
+    def compute_a_block(self, block, corner, resol, values, array_function,
+                        reevaluate, x_array, y_array):
+        """ Compute the missing values of a block of pixels in out-of-core
+        mode
+
+        :param block: NumPy array, the view of the array of the grid of
+                      the values of the block
+        :param corner: pair of int (i_0, j_0), the pixel of the lower left
+                       corner of the block
+        :param resol: resolution value used to discretised the rectangle
+                               [a, b] + [c, d] * i
+        :param values: ValueGrid
+        :param array_function: function evaluated on NumPy arrays, or None
+                               to evaluate the pixels one by one
+        :param reevaluate: boolean, which indicates if the pixels whose image
+                           by array_function is not finite are evaluated one
+                           by one
+        :param x_array: NumPy array, the real parts of the pixels
+        :param y_array: NumPy array, the imaginary parts of the pixels
+        :return value: int, the number of values which were missing
+        """
+        i_0, j_0 = corner
+        missing = np.isnan(block)
+        nb_of_missing = int(np.count_nonzero(missing))
+        if not nb_of_missing:
+            return 0
+        if array_function is not None:
+            z = (x_array[i_0:i_0 + block.shape[0], None] +
+                 1j * y_array[None, j_0:j_0 + block.shape[1]])
+            with np.errstate(all='ignore'):
+                images = array_function(z[missing])
+            images = np.broadcast_to(np.asarray(images, dtype=complex),
+                                     (nb_of_missing,))
+            infinite = np.isinf(images.real) | np.isinf(images.imag)
+            if reevaluate:
+                infinite[:] = False
+            images = np.where(np.isfinite(images), images,
+                              np.where(infinite, complex('inf'),
+                                       complex('nan+nanj')))
+            block[missing] = images
+            missing = np.isnan(block) if reevaluate else None
+        if missing is not None:
+            for (a, b) in np.argwhere(missing).tolist():
+                x, y = self.liste_x[i_0 + a], self.liste_y[j_0 + b]
+                z = RiemannSphere(self.backend.convert(x),
+                                  self.backend.convert(y))
+                self.compute_a_value(z, (i_0 + a, j_0 + b), resol, values,
+                                     None)
+        return nb_of_missing
+
+    def draw_grid(self):
+        """ Draw the values of the ValueGrid of the out-of-core mode, by
+        strips of columns. Only a strip of values is read at once, but
+        the whole image is kept in memory: the save_by_strips method saves
+        the image of a large portrait without keeping it
+
+        :return value: Image
+        """
+        img = Image.new('RGB', self.size, "white")
+        nb_of_missing = 0
+        for (i_0, strip) in self.values.strips():
+            colors = RGB_array(strip)
+            # The column j of the strip is the row size[1] - j - 1
+            img.paste(Image.fromarray(np.ascontiguousarray(
+                colors.transpose(1, 0, 2)[::-1]), 'RGB'), (i_0, 0))
+            nb_of_missing += int(np.count_nonzero(np.isnan(strip)))
+        if nb_of_missing:
+            text = str(nb_of_missing) + " pixels have no computed value "
+            if self.data_logger is None:
+                print(text)
+            else:
+                self.data_logger.error(text)
+        return img
+
     def draw(self, information=False):
         """ Draw the current function in the current discretised rectangle
         and export the drawing in a .bmp file
@@ -434,7 +1566,10 @@ class PhasePortrait:
         :param name: name of the .bmp file
         :return value: Image
         """
-        img = Image.new('RGB', self.size, "white")      # create a new black image
+        if isinstance(self.values, ValueGrid):
+            self.img = self.draw_grid()
+            return
+        img, shared = self.seed_image()                 # create a new black image
         pixels = img.load()                             # create the pixel map
         if information:
             text = "Preliminary color computations have started "
@@ -445,22 +1580,15 @@ class PhasePortrait:
         t_0 = time()
         five_per_cent = int(5 * img.size[0] / 100)
         for i in range(img.size[0]):
-            for j in range(img.size[1]):
+            # the colours of the pixels shared with the seed are copied
+            if shared is not None and shared[0][0] <= i < shared[0][1]:
+                rows = chain(range(shared[1][0]),
+                             range(shared[1][1], img.size[1]))
+            else:
+                rows = range(img.size[1])
+            for j in rows:
                 # for every pixel, set the colour accordingly
-                try:
-                    image_of_z = self.values[i, self.size[1] - j - 1]
-                    pixels[i, j] = RGB(image_of_z)
-                except KeyError:
-                    re = self.left_below.real + Fraction(i, self.resolution)
-                    im = self.right_upper.imaginary - Fraction(j, self.resolution)
-                    z = RiemannSphere(re, im)
-                    coords = str(i) + ', ' + str(self.size[1] - j - 1)
-                    text = "Pixel (" + coords + ") has no computed valued: " +\
-                           "it is related to z = " + str(z) + " "
-                    if self.data_logger is None:
-                        print(text)
-                    else:
-                        self.data_logger.error(text)
+                self.draw_a_pixel(pixels, i, j)
             if information and five_per_cent != 0 and i % five_per_cent == five_per_cent - 1:
                 t_1 = time()
                 per_cent = str(int(10000. * (i + 1) / (img.size[0] + 1)) / 100)
@@ -470,6 +1598,11 @@ class PhasePortrait:
                     print(per_cent + "%" + text + time_str)
                 else:
                     self.data_logger.info(per_cent + "%" + text + time_str + " ")
+        if shared is not None:
+            for (i, j) in self.unseeded:
+                self.draw_a_pixel(pixels, i, self.size[1] - j - 1)
+        # The seed is not needed anymore
+        self.seed = None
         if information:
             if self.data_logger is None:
                 print("Color computations are finished")
@@ -477,10 +1610,118 @@ class PhasePortrait:
                 self.data_logger.info("Color computations are finished ")
         self.img = img
 
-    def save(self, directory, name, information=False):
+    def draw_a_pixel(self, pixels, i, j):
+        """ Set the colour of a pixel of the image
+
+        :param pixels: PixelAccess object, the pixel map of the image
+        :param i: int, the column of the pixel
+        :param j: int, the row of the pixel, from the top of the image
+        """
+        try:
+            image_of_z = self.values[i, self.size[1] - j - 1]
+            pixels[i, j] = RGB(image_of_z)
+        except KeyError:
+            re = self.left_below.real + Fraction(i, self.resolution)
+            im = self.right_upper.imaginary - Fraction(j, self.resolution)
+            z = RiemannSphere(re, im)
+            coords = str(i) + ', ' + str(self.size[1] - j - 1)
+            text = "Pixel (" + coords + ") has no computed valued: " +\
+                   "it is related to z = " + str(z) + " "
+            if self.data_logger is None:
+                print(text)
+            else:
+                self.data_logger.error(text)
+
+    def seed_image(self):
+        """ Create the image of the current phase portrait, where
+        the colours of the pixels shared with the seed are copied from
+        the image of the seed, if it has been drawn
+
+        :return value: pair (Image, shared), where shared is the pair
+                       ((i_0, i_1), (j_0, j_1)) such that the colours of
+                       the pixels (i, j) of the image, for i_0 <= i < i_1 and
+                       j_0 <= j < j_1, have been copied, or None
+        """
+        img = Image.new('RGB', self.size, "white")
+        seed_img = getattr(self.seed, 'img', None)
+        if self.seed_offset is None or seed_img is None or \
+                seed_img.size != tuple(self.seed.size):
+            return img, None
+        (i_0, i_1), (j_0, j_1) = self.shared_pixels()
+        if i_0 >= i_1 or j_0 >= j_1:
+            return img, None
+        dx, dy = self.seed_offset
+        # The pixel (i, j) is in the row size[1] - j - 1 of the image
+        r_0, r_1 = self.size[1] - j_1, self.size[1] - j_0
+        s_0 = self.seed.size[1] - j_1 + dy
+        array = np.array(img)
+        array[r_0:r_1, i_0:i_1] = \
+            np.asarray(seed_img.convert('RGB'))[s_0:s_0 + r_1 - r_0,
+                                                i_0 - dx:i_1 - dx]
+        return Image.fromarray(array, 'RGB'), ((i_0, i_1), (r_0, r_1))
+
+    def save(self, directory, name, information=False,
+             compress_level=COMPRESS_LEVEL):
+        """ Save the image drawn by the draw method in a .png file
+
+        :param directory: directory where the .png file will be saved
+        :param name: name of the .png file
+        :param information: boolean, which indicates if the duration of
+                            the saving has to be shown
+        :param compress_level: int, the compression level of zlib, from 0
+                               to 9, which trades the size of the file for
+                               the speed of the compression
+        """
         if information:
             t_0 = time()
-        self.img.save(directory + name, format="png")
+        self.img.save(directory + name, format="png",
+                      compress_level=compress_level)
+        if information:
+            t_1 = time()
+            text = "Image saved in " + str(int((t_1-t_0) * 1000) / 1000) + "s "
+            if self.data_logger is None:
+                print(text)
+            else:
+                self.data_logger.info(text)
+
+    def save_by_strips(self, directory, name, information=False,
+                       compress_level=COMPRESS_LEVEL, strip_size=STRIP_SIZE):
+        """ Color the values and save the image in a .png file by strips of
+        rows, without drawing the whole image: the values are read from
+        the ValueGrid of the out-of-core mode, or from the dictionnary of
+        values, and each strip is compressed and written as soon as it is
+        colored (see the PNGStream module). The pixels which have no value are
+        white
+
+        :param directory: directory where the .png file will be saved
+        :param name: name of the .png file
+        :param information: boolean, which indicates if the duration of
+                            the saving has to be shown
+        :param compress_level: int, the compression level of zlib, from 0
+                               to 9, which trades the size of the file for
+                               the speed of the compression
+        :param strip_size: int, the number of rows of a strip
+        """
+        t_0 = time()
+        with PNGWriter(directory + name, self.size,
+                       compress_level=compress_level) as writer:
+            for top in range(0, self.size[1], strip_size):
+                # The row r of the image is the row size[1] - r - 1 of
+                # the grid
+                j_0 = max(self.size[1] - top - strip_size, 0)
+                j_1 = self.size[1] - top
+                if isinstance(self.values, ValueGrid):
+                    strip = self.values.array[:, j_0:j_1]
+                else:
+                    nan = complex('nan+nanj')
+                    strip = np.array([[nan if (i, j) not in self.values
+                                       else as_complex(self.values[i, j])
+                                       for j in range(j_0, j_1)]
+                                      for i in range(self.size[0])],
+                                     dtype=complex).reshape(self.size[0],
+                                                            j_1 - j_0)
+                colors = RGB_array(strip)
+                writer.write_rows(colors.transpose(1, 0, 2)[::-1])
         if information:
             t_1 = time()
             text = "Image saved in " + str(int((t_1-t_0) * 1000) / 1000) + "s "
@@ -491,5 +1732,11 @@ class PhasePortrait:
 
 
 if __name__ == '__main__':
-    from doctest import testmod
-    testmod()
+    import sys
+    if len(sys.argv) > 1:
+        # Headless rendering of job files, see the BatchRender module
+        from BatchRender import run
+        run(sys.argv[1:])
+    else:
+        from doctest import testmod
+        testmod()
@@ -16,6 +16,14 @@
 #  * 07/06/20: Add logs and log file                      #
 #  * 10/07/20: Allows visualization windows to have       #
 #              fractionnal size                           #
+#  * 10/2026: The partial functions of a vectorized       #
+#             function are vectorized                     #
+#  * 10/2026: The database name can be the URL of a cache #
+#             of tiles ("memory:", "sqlite:", "npy:")     #
+#  * 10/2026: The phase portraits can share the memo of   #
+#             the values of the process                   #
+#  * 10/2026: A moved window reuses the values and the    #
+#             colors of the previous phase portrait       #
 #                                                         #
 # Next modifications to do:                               #
 # -------------------------                               #
@@ -44,6 +52,8 @@ from ipywidgets import Layout, GridspecLayout
 from fractions import Fraction
 from RiemannSphere import RiemannSphere
 from PhasePortrait import PhasePortrait
+from Vectorized import partial_function
+from CacheBackends import is_cache_url
 from Image_manipulations import display_preparing_of_img, PIL_image_2_byte_im
 import logging
 import datetime
@@ -1014,9 +1024,15 @@ class PhasePortraitApp(widgets.AppLayout):
         """ Observer of the database name parameter of the control zone of
         the parent class
 
+        The name can also be the URL of a cache of tiles (see
+        the CacheBackends module), such as "memory:" or "npy:directory",
+        which is kept as it is
+
         :param change: dictionnary
         """
-        if len(change['new']) >= 7 and change['new'][-7:] == '.sqlite':
+        if is_cache_url(change['new']):
+            self.database_name = change['new']
+        elif len(change['new']) >= 7 and change['new'][-7:] == '.sqlite':
             self.database_name = change['new']
         else:
             self.database_name = change['new'] + '.sqlite'
@@ -1084,11 +1100,13 @@ class OneDimensionalPhasePortraitGUI(PhasePortraitApp):
                  min_width=1, max_width=10,
                  min_height=1, max_height=10,
                  default_precision=5, max_precision=100,
-                 saved_file_name="image", database_name=".sqlite"):
+                 saved_file_name="image", database_name=".sqlite",
+                 memo=False):
         """ Constructor of the class
 
         :param function: function, which represents the function whose
-                         phase portrait is required
+                         phase portrait is required ; it can be vectorized
+                         (see the Vectorized module)
         :param center_pos: RiemannSphere complex number, which represents
                            the center of the phase portrait
         :param min_max_step: int, optional parameter which encodes the minimal
@@ -1118,6 +1136,11 @@ class OneDimensionalPhasePortraitGUI(PhasePortraitApp):
                                 of the .png files that will be created
         :param database_name: string, optionnal parameter which gives the name of the database where
                               the values are saved
+        :param memo: boolean, optional parameter which indicates if the values
+                     are kept in the memo shared by the phase portraits of
+                     the process (see the ValueMemo module). The memo is
+                     emptied by SHARED_MEMO.clear() when a global variable
+                     used by the function changes
         """
         # Initialization
         super().__init__('One dimensional phase portrait visualization tool', 'LOGS_1D',
@@ -1128,6 +1151,7 @@ class OneDimensionalPhasePortraitGUI(PhasePortraitApp):
                          saved_file_name=saved_file_name, database_name=database_name)
         self.img_size = 575
         self.function = function
+        self.memo = memo
         self.center_position = center_pos
         self.phase_portrait = None  # defined by clicking the Compute button
         self.img_to_display = None  # defined by clicking the Draw button
@@ -1183,8 +1207,9 @@ class OneDimensionalPhasePortraitGUI(PhasePortraitApp):
                                                 self.precision,
                                                 information=self.infos,
                                                 database=database_name,
-                                                data_logger=self.data_logger
-                                                )
+                                                data_logger=self.data_logger,
+                                                memo=self.memo,
+                                                seed=self.phase_portrait)
 
     def show(self, button):
         """ Event handler for the "Show the phase portrait" button
@@ -1278,11 +1303,13 @@ class TwoDimensionalPhasePortraitGUI(PhasePortraitApp):
                  min_max_step=10,
                  min_width=1, max_width=10,
                  min_height=1, max_height=10,
-                 default_precision=5, max_precision=100):
+                 default_precision=5, max_precision=100, memo=False):
         """ Constructor of the class
 
         :param function: function, which represents the function whose partial
-                         phase portraits are required
+                         phase portraits are required ; it can be vectorized
+                         (see the Vectorized module), and is then called
+                         with a complex number as fixed variable
         :param z_one: RiemannSphere complex number, which represents
                       the center of the phase portrait of the first
                       phase portrait
@@ -1312,6 +1339,11 @@ class TwoDimensionalPhasePortraitGUI(PhasePortraitApp):
                               the maximal value of the precision slider, i.e.
                               the number of pixels per unit in the required
                               phase portrait
+        :param memo: boolean, optional parameter which indicates if the values
+                     are kept in the memo shared by the phase portraits of
+                     the process (see the ValueMemo module). The memo is
+                     emptied by SHARED_MEMO.clear() when a global variable
+                     used by the function changes
         """
         # Initialization
         super().__init__('Two dimensional phase portrait visualization tool', 'LOGS_2D',
@@ -1321,6 +1353,7 @@ class TwoDimensionalPhasePortraitGUI(PhasePortraitApp):
                          default_precision=default_precision, max_precision=max_precision)
         self.img_size = 575
         self.function = function
+        self.memo = memo
         self.z_one = z_one
         self.z_two = z_two
         self.phase_portrait_one = None  # defined by clicking on 'Compute'
@@ -1329,18 +1362,18 @@ class TwoDimensionalPhasePortraitGUI(PhasePortraitApp):
         self.img_to_display_two = None  # defined by clicking on 'Draw'
 
         # Main Zone
-        width = self.img_width * self.precision + 1
-        height = self.img_height * self.precision + 1
+        width = int(self.img_width * self.precision + 1)
+        height = int(self.img_height * self.precision + 1)
         generic_name = "Position of the center of the phase portrait"
         img_one = Image.new('RGB', (width, height), "white")
         name = 'Phase portrait of the 1st partial function'
         image_zone_one = ImageZone(img_one, 385, self.z_one, generic_name,
-                                   step=1, name=name
+                                   min_max_step, name=name
                                    )
         img_two = Image.new('RGB', (width, height), "white")
-        name = 'Phase portrait of the 1st partial function'
+        name = 'Phase portrait of the 2nd partial function'
         image_zone_two = ImageZone(img_two, 385, self.z_two, generic_name,
-                                   step=1, name=name
+                                   min_max_step, name=name
                                    )
         image_zone = widgets.HBox([image_zone_one, image_zone_two])
         self.set_image_zone(image_zone)
@@ -1375,25 +1408,25 @@ class TwoDimensionalPhasePortraitGUI(PhasePortraitApp):
             else:
                 database_name = self.database_name
             self.data_logger.info("First phase portrait computations started")
-            def partial_one(z):
-                return self.function(z, self.z_two)
+            partial_one = partial_function(self.function, self.z_two, 1)
             self.phase_portrait_one = PhasePortrait(partial_one,
                                                     a, b,
                                                     self.precision,
                                                     information=self.infos,
                                                     database=database_name,
-                                                    data_logger=self.data_logger
-                                                    )
+                                                    data_logger=self.data_logger,
+                                                    memo=self.memo,
+                                                    seed=self.phase_portrait_one)
             self.data_logger.info("Second phase portrait computations started")
-            def partial_two(z):
-                return self.function(self.z_one, z)
+            partial_two = partial_function(self.function, self.z_one, 0)
             self.phase_portrait_two = PhasePortrait(partial_two,
                                                     c, d,
                                                     self.precision,
                                                     information=self.infos,
                                                     database=database_name,
-                                                    data_logger=self.data_logger
-                                                    )
+                                                    data_logger=self.data_logger,
+                                                    memo=self.memo,
+                                                    seed=self.phase_portrait_two)
             if not self.infos:
                 self.data_logger.info("Computations finished")
 
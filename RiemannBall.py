@@ -0,0 +1,574 @@
+###########################################################
+# Module to define balls of Riemann Sphere complex        #
+# numbers, used to evaluate a function over a whole       #
+# region of the complex plane at once                     #
+#                                                         #
+# Author: Olivier Bouillot                                #
+# Email: olivier.bouillot@u-pem.fr                        #
+# Creation Date: october 2026                             #
+#                                                         #
+# Modifications:                                          #
+# --------------                                          #
+#                                                         #
+#                                                         #
+# Next modifications to do:                               #
+# -------------------------                               #
+#                                                         #
+#   * Use directed rounding instead of a relative         #
+#     enlargement of the radius                           #
+#                                                         #
+###########################################################
+
+
+from math import sqrt, exp, log, cos, sin, asin, pi
+from math import isinf
+from fractions import Fraction
+from RiemannSphere import RiemannSphere
+from Color import approx, lightness_of_modulus, HSL_to_RGB
+
+
+""" Module which defines:
+* the RiemannBall class, a ball arithmetic companion of the RiemannSphere
+  class: a ball is a centre and a radius, and the result of an operation on
+  balls is a ball containing all the results of the operation on the points
+  of the balls.
+* the certified_RGB function, which computes the color shared by all
+  the points of a ball, if any.
+"""
+
+
+# Relative enlargement of the radius after each operation, which takes into
+# account the rounding errors of the floating point operations
+ROUNDING = 2 ** -50
+
+
+def enlarge(modulus, radius):
+    """ Enlarge a radius to take into account the rounding errors made while
+    computing the centre of a ball of modulus 'modulus' and its radius
+
+    :param modulus: float, the modulus of the centre of the ball
+    :param radius: float
+    :return value: float
+
+    >>> enlarge(0, 0)
+    0.0
+    >>> enlarge(1, 0) > 0
+    True
+    """
+    return radius + ROUNDING * (modulus + radius)
+
+
+class RiemannBall(RiemannSphere):
+    """ Class that modelizes a closed ball of the complex plane, i.e. a set of
+    RiemannSphere complex numbers, by its centre and its radius.
+
+    :attribute real: int, float, Fraction, NaN: real part of the centre
+    :attribute imaginary: int, float, Fraction, NaN: imaginary part
+                          of the centre
+    :attribute radius: float, non negative, or float('Inf')
+    :attribute infinite: boolean, True if, and only if, the ball is unbounded,
+                         i.e. nothing is known about the numbers it contains
+
+    A RiemannBall being a RiemannSphere, all the functions built from
+    the RiemannSphere operations (+, -, *, /, **, complex_exp, complex_log,
+    conjugate) accept RiemannBall arguments. The result is then a RiemannBall
+    containing the values of the function at every point of the argument.
+
+    Limitation: when a function branches on the centre of its argument
+    (for instance z.real >= 1/2 in the gamma function), the branch of the
+    centre is used for the whole ball. For the special functions of the
+    SpecialFunctions module, the branches are different approximations of
+    the same analytic function, so that the result is an enclosure of the
+    approximation up to its own accuracy.
+
+    >>> b = RiemannBall(1, 1, 0.5)
+    >>> b
+    1 + 1 i ± 0.5
+    >>> RiemannSphere(1, 1.2) in b
+    True
+    >>> RiemannSphere(2, 1) in b
+    False
+    >>> RiemannBall.unbounded()
+    oo
+    """
+
+    def __init__(self, real, imaginary, radius=0., infinite=False):
+        """ Constructor of the class
+
+        :param real: represents the real part of the centre of the ball
+        :param imaginary: represents the imaginary part of the centre
+                          of the ball
+        :param radius: int, float or Fraction, non negative, which represents
+                       the radius of the ball
+        :param infinite: boolean, which tells us if the ball is unbounded
+
+        :raised error: ValueError when the radius is negative
+
+        >>> RiemannBall(0, 0, -1)
+        Traceback (most recent call last):
+            ...
+        ValueError: The radius of a ball has to be non negative
+        >>> RiemannBall(0, 0, float('Inf')).is_infinite()
+        True
+        """
+        super().__init__(real, imaginary, infinite=infinite)
+        if radius < 0:
+            raise ValueError("The radius of a ball has to be non negative")
+        if self.infinite or isinf(radius):
+            self.real = float('NaN')
+            self.imaginary = float('NaN')
+            self.radius = float('Inf')
+            self.infinite = True
+        else:
+            self.radius = float(radius)
+
+    @staticmethod
+    def unbounded():
+        """ Create an unbounded ball, i.e. a ball which could contain any
+        RiemannSphere complex number, including the infinite one
+
+        :return value: RiemannBall
+        """
+        return RiemannBall(float('NaN'), float('NaN'), infinite=True)
+
+    @staticmethod
+    def convert(other):
+        """ Convert an int, a float, a Fraction or a RiemannSphere complex
+        number into a ball of null radius
+
+        :param other: int, float, Fraction or RiemannSphere
+        :return value: RiemannBall
+
+        :raised error: TypeError when 'other' is not an int, a float,
+                       a Fraction or a RiemannSphere
+
+        >>> RiemannBall.convert(2)
+        2 ± 0.0
+        >>> RiemannBall.convert(RiemannSphere(0, 1))
+        i ± 0.0
+        >>> RiemannBall.convert(1j)
+        Traceback (most recent call last):
+            ...
+        TypeError: Only RiemannSphere, integers, floats or Fractions can be converted into a RiemannBall
+        """
+        if isinstance(other, RiemannBall):
+            return other
+        if isinstance(other, RiemannSphere):
+            if other.is_infinite():
+                return RiemannBall.unbounded()
+            return RiemannBall(other.real, other.imaginary)
+        if isinstance(other, (int, float, Fraction)):
+            return RiemannBall(other, 0)
+        raise TypeError("Only RiemannSphere, integers, floats or Fractions " +
+                        "can be converted into a RiemannBall")
+
+    @staticmethod
+    def around(left_below, right_upper):
+        """ Create the smallest ball containing the rectangle
+        [a, b] + [c, d] * i, where left_below = a + i c and
+        right_upper = b + i d
+
+        :param left_below: RiemannSphere complex number
+        :param right_upper: RiemannSphere complex number
+        :return value: RiemannBall
+
+        >>> b = RiemannBall.around(RiemannSphere(0, 0), RiemannSphere(2, 1))
+        >>> b.centre()
+        1.0 + 0.5 i
+        >>> RiemannSphere(0, 0) in b and RiemannSphere(2, 1) in b
+        True
+        """
+        real = (float(left_below.real) + float(right_upper.real)) / 2
+        imaginary = (float(left_below.imaginary) +
+                     float(right_upper.imaginary)) / 2
+        half_width = (float(right_upper.real) - float(left_below.real)) / 2
+        half_height = (float(right_upper.imaginary) -
+                       float(left_below.imaginary)) / 2
+        radius = sqrt(half_width ** 2 + half_height ** 2)
+        return RiemannBall(real, imaginary,
+                           enlarge(sqrt(real ** 2 + imaginary ** 2), radius))
+
+    def __repr__(self):
+        """ Transform the current ball into a string
+        The unbounded ball is denoted 'oo'
+
+        :Return value: String
+        """
+        if self.infinite:
+            return "oo"
+        return super().__repr__() + " ± " + str(self.radius)
+
+    def __str__(self):
+        return self.__repr__()
+
+    def __hash__(self):
+        if self.infinite:
+            return hash(float('Inf'))
+        return hash((self.real, self.imaginary, self.radius))
+
+    def __eq__(self, other):
+        """ Check the equality of the current ball with an other object
+
+        :Return value: boolean
+
+        >>> RiemannBall(0, 1, 1) == RiemannBall(0, 1, 1)
+        True
+        >>> RiemannBall(0, 1, 1) == RiemannBall(0, 1, 2)
+        False
+        >>> RiemannBall(0, 1, 0) == RiemannSphere(0, 1)
+        False
+        """
+        if not isinstance(other, RiemannBall):
+            return False
+        if self.infinite or other.infinite:
+            return self.infinite and other.infinite
+        return self.real == other.real and \
+            self.imaginary == other.imaginary and \
+            self.radius == other.radius
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __contains__(self, z):
+        """ Check if a RiemannSphere complex number belongs to the current
+        ball
+
+        :param z: RiemannSphere complex number
+        :return value: boolean
+        """
+        if self.infinite:
+            return True
+        if z.is_infinite():
+            return False
+        distance = sqrt((z.real - self.real) ** 2 +
+                        (z.imaginary - self.imaginary) ** 2)
+        return distance <= self.radius
+
+    def centre(self):
+        """ Return the centre of the current ball
+
+        :return value: RiemannSphere complex number
+        """
+        if self.infinite:
+            return RiemannSphere(float('NaN'), float('NaN'), infinite=True)
+        return RiemannSphere(self.real, self.imaginary)
+
+    def modulus(self):
+        """ Compute the modulus of the centre of the current ball
+
+        :return value: float or float('Inf')
+        """
+        return RiemannSphere.__abs__(self)
+
+    def __abs__(self):
+        """ Compute an upper bound of the modulus of the numbers of
+        the current ball
+
+        :return value: float or float('Inf')
+
+        >>> abs(RiemannBall(3, 4, 1))
+        6.0
+        """
+        return self.modulus() + self.radius
+
+    def contains_zero(self):
+        """ Check if 0 belongs to the current ball
+
+        :return value: boolean
+
+        >>> RiemannBall(1, 0, 1).contains_zero()
+        True
+        >>> RiemannBall(1, 0, 0.5).contains_zero()
+        False
+        """
+        return self.infinite or self.modulus() <= self.radius
+
+    def is_null(self):
+        """ Check if the current ball is reduced to the zero complex number
+
+        :return value: boolean
+        """
+        return not self.infinite and self.radius == 0 and \
+            self.real == 0 and self.imaginary == 0
+
+    def __add__(self, other):
+        """ Compute a ball containing the sums of the numbers of the current
+        ball with the numbers of the ball 'other'
+
+        :Return value: RiemannBall
+
+        >>> b = RiemannBall(1, 0, 1) + RiemannBall(0, 1, 1)
+        >>> b.centre()
+        1 + 1 i
+        >>> RiemannSphere(1 + 2, 1) in b
+        True
+        >>> (1 + RiemannBall(1, 0, 0)).centre()
+        2
+        """
+        other = RiemannBall.convert(other)
+        if self.infinite or other.infinite:
+            return RiemannBall.unbounded()
+        real = self.real + other.real
+        imaginary = self.imaginary + other.imaginary
+        radius = self.radius + other.radius
+        return RiemannBall(real, imaginary,
+                           enlarge(sqrt(real ** 2 + imaginary ** 2), radius))
+
+    def __radd__(self, other):
+        return self.__add__(other)
+
+    def __neg__(self):
+        if self.infinite:
+            return self
+        return RiemannBall(- self.real, - self.imaginary, self.radius)
+
+    def __sub__(self, other):
+        return self.__add__(- RiemannBall.convert(other))
+
+    def __rsub__(self, other):
+        return (- self).__add__(other)
+
+    def __mul__(self, other):
+        """ Compute a ball containing the products of the numbers of
+        the current ball with the numbers of the ball 'other'
+
+        :Return value: RiemannBall
+
+        >>> b = RiemannBall(1, 0, 0.5) * RiemannBall(0, 1, 0.5)
+        >>> b.centre()
+        i
+        >>> RiemannSphere(0, 1.5 * 1.5) in b
+        True
+        >>> RiemannBall(0, 0) * RiemannBall.unbounded()
+        oo
+        """
+        other = RiemannBall.convert(other)
+        if self.infinite or other.infinite:
+            return RiemannBall.unbounded()
+        real = self.real * other.real - self.imaginary * other.imaginary
+        imaginary = self.real * other.imaginary + self.imaginary * other.real
+        radius = self.modulus() * other.radius + \
+            other.modulus() * self.radius + self.radius * other.radius
+        return RiemannBall(real, imaginary,
+                           enlarge(sqrt(real ** 2 + imaginary ** 2), radius))
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def inverse(self):
+        """ Compute a ball containing the inverses of the numbers of
+        the current ball
+
+        If the current ball contains 0, the result is unbounded.
+
+        :Return value: RiemannBall
+
+        >>> b = RiemannBall(2, 0, 1).inverse()
+        >>> b.centre()
+        0.5
+        >>> RiemannSphere(1, 0) in b and RiemannSphere(1 / 3, 0) in b
+        True
+        >>> RiemannBall(2, 0, 2).inverse()
+        oo
+        """
+        if self.contains_zero():
+            return RiemannBall.unbounded()
+        m = self.modulus()
+        m_sq = m ** 2
+        real = self.real / m_sq
+        imaginary = - self.imaginary / m_sq
+        radius = self.radius / (m * (m - self.radius))
+        return RiemannBall(real, imaginary, enlarge(1 / m, radius))
+
+    def __truediv__(self, other):
+        """ Compute a ball containing the quotients of the numbers of
+        the current ball by the numbers of the ball 'other'
+
+        :raised error: ValueError when the division is by a null number
+
+        :Return value: RiemannBall
+
+        >>> RiemannBall(1, 0) / 0
+        Traceback (most recent call last):
+            ...
+        ValueError: Can not compute a division by a null number!
+        """
+        other = RiemannBall.convert(other)
+        if other.is_null():
+            raise ValueError("Can not compute a division " +
+                             "by a null number!")
+        return self.__mul__(other.inverse())
+
+    def __rtruediv__(self, other):
+        if self.is_null():
+            raise ValueError("Can not compute a division " +
+                             "by a null number!")
+        return RiemannBall.convert(other).__mul__(self.inverse())
+
+    def complex_exp(self):
+        """ Compute a ball containing the exponentials of the numbers
+        of the current ball, using |exp(z) - exp(c)| <= |exp(c)| (exp(r) - 1)
+        for all z in the ball of centre c and radius r
+
+        :return value: RiemannBall
+
+        >>> b = RiemannBall(0, 0, 0.1).complex_exp()
+        >>> RiemannSphere(0.1, 0).complex_exp() in b
+        True
+        """
+        if self.infinite or self.real + self.radius >= 709.1:
+            return RiemannBall.unbounded()
+        modulus = exp(self.real)
+        real = modulus * cos(self.imaginary)
+        imaginary = modulus * sin(self.imaginary)
+        radius = modulus * (exp(self.radius) - 1)
+        return RiemannBall(real, imaginary, enlarge(modulus, radius))
+
+    def complex_log(self):
+        """ Compute a ball containing the principal logarithms of the numbers
+        of the current ball, using |log(z) - log(c)| <= - log(1 - r / |c|)
+        for all z in the ball of centre c and radius r
+
+        If the current ball meets the branch cut ]-oo ; 0], the result is
+        unbounded.
+
+        :raised error: ValueError if the current ball is reduced to 0
+
+        :return value: RiemannBall
+
+        >>> RiemannBall(-1, 0, 0.1).complex_log()
+        oo
+        >>> b = RiemannBall(1, 0, 0.1).complex_log()
+        >>> RiemannSphere(1.1, 0).complex_log() in b
+        True
+        """
+        if self.is_null():
+            raise ValueError("Logarithm of 0 is not defined")
+        if self.infinite:
+            return RiemannBall.unbounded()
+        m = self.modulus()
+        if self.real <= 0:
+            distance_to_cut = abs(self.imaginary)
+        else:
+            distance_to_cut = m
+        if distance_to_cut <= self.radius:
+            return RiemannBall.unbounded()
+        real = log(m)
+        imaginary = self.argument()
+        radius = - log(1 - self.radius / m)
+        return RiemannBall(real, imaginary,
+                           enlarge(sqrt(real ** 2 + imaginary ** 2), radius))
+
+    def __pow__(self, other):
+        """ Compute a ball containing the powers of the numbers of the current
+        ball, computed as in the RiemannSphere class
+
+        :param other: int, float, RiemannSphere
+        :Return value: RiemannBall
+
+        >>> RiemannBall.unbounded() ** 0.5
+        oo
+        >>> (RiemannBall(1, 1, 0) ** 3).centre()
+        -2 + 2 i
+        """
+        if self.infinite and not isinstance(other, int):
+            return RiemannBall.unbounded()
+        return super().__pow__(other)
+
+    def conjugate(self):
+        if self.infinite:
+            return self
+        return RiemannBall(self.real, - self.imaginary, self.radius)
+
+
+def certified_hue(hue_min, hue_max):
+    """ Compute the hue shared by all the angles, in degrees, of
+    the interval [hue_min ; hue_max], once rounded as in the HSL function
+    of the Color module, i.e. once reduced in ]0 ; 360] and approximated by
+    the nearest integer.
+
+    The hues 0 and 360 define the same color, so that an interval meeting
+    the direction of the positive real axis can have a single hue.
+
+    :param hue_min: float, included in ]-360 ; 360]
+    :param hue_max: float, included in ]0 ; 720], at most hue_min + 360
+    :return value: int, or None if the angles of the interval have
+                   different hues
+
+    >>> certified_hue(10.1, 10.3)
+    10
+    >>> certified_hue(10.1, 10.6) is None
+    True
+    >>> certified_hue(359.8, 360.2)
+    360
+    >>> certified_hue(-0.2, 0.2)
+    360
+    """
+    if hue_min <= 0:
+        hue_min, hue_max = hue_min + 360, hue_max + 360
+    if hue_max <= 360:
+        if approx(hue_min) == approx(hue_max):
+            return approx(hue_min)
+        return None
+    # The interval is split in [hue_min ; 360] and ]0 ; hue_max - 360]
+    if approx(hue_min) == 360 and approx(hue_max - 360) == 0:
+        return 360
+    return None
+
+
+def certified_RGB(value):
+    """ Compute the color shared by all the points of a ball, if all its
+    points have the same color.
+
+    The hue and the lightness of the points of the ball are enclosed
+    in intervals. As each RGB component is a non decreasing function
+    of the lightness when the hue is fixed, the points of the ball share
+    the same color if the hue interval gives a single integer hue and if
+    the extremities of the lightness interval give the same color.
+
+    :param value: RiemannBall or RiemannSphere complex number
+    :return value: a triplet composed by (R, G, B), or None if the points
+                   of the ball may have different colors
+
+    >>> certified_RGB(RiemannBall(1, 0, 10e-6))
+    (255, 0, 0)
+    >>> certified_RGB(RiemannBall(1, 0, 10e-2)) is None
+    True
+    >>> certified_RGB(RiemannBall(0, 0, 10e-2)) is None
+    True
+    >>> certified_RGB(RiemannBall.unbounded()) is None
+    True
+    """
+    if not isinstance(value, RiemannSphere):
+        return None
+    if not isinstance(value, RiemannBall):
+        value = RiemannBall.convert(value)
+        if value.is_infinite():
+            return (255, 255, 255)
+    if value.is_infinite():
+        return None
+    if value.is_null():
+        return (0, 0, 0)
+    m = value.modulus()
+    if value.radius >= m:
+        return None
+    # Hue interval, in degrees, as in the HSL function of the Color module
+    hue = value.argument() * 180 / pi
+    if hue <= 0:
+        hue += 360
+    delta = asin(value.radius / m) * 180 / pi
+    hue = certified_hue(hue - delta, hue + delta)
+    if hue is None:
+        return None
+    # Lightness interval
+    lightness_min = lightness_of_modulus(m - value.radius)
+    lightness_max = lightness_of_modulus(m + value.radius)
+    color = HSL_to_RGB(hue, 1, lightness_min)
+    if color != HSL_to_RGB(hue, 1, lightness_max):
+        return None
+    return color
+
+
+if __name__ == '__main__':
+    from doctest import testmod
+    testmod()
@@ -0,0 +1,288 @@
+###########################################################
+# Module to define dual Riemann Sphere complex numbers,   #
+# used to compute the derivative of a function together   #
+# with its value (forward automatic differentiation)      #
+#                                                         #
+# Author: Olivier Bouillot                                #
+# Email: olivier.bouillot@u-pem.fr                        #
+# Creation Date: october 2026                             #
+#                                                         #
+# Modifications:                                          #
+# --------------                                          #
+#                                                         #
+#                                                         #
+# Next modifications to do:                               #
+# -------------------------                               #
+#                                                         #
+#   * Second order derivatives                            #
+#                                                         #
+###########################################################
+
+
+from fractions import Fraction
+from RiemannSphere import RiemannSphere, INFTY
+
+
+""" Module which defines:
+* the RiemannDual class, i.e. dual numbers z + z' eps, with eps^2 = 0,
+  where z and z' are RiemannSphere complex numbers.
+* the value_and_derivative function, which computes f(z) and f'(z)
+  with a single evaluation of f.
+"""
+
+
+class RiemannDual(RiemannSphere):
+    """ Class that modelizes a dual number z + z' eps, where eps^2 = 0,
+    z is a RiemannSphere complex number (the value) and z' is a RiemannSphere
+    complex number (the derivative).
+
+    :attribute real: int, float, Fraction, NaN: real part of the value
+    :attribute imaginary: int, float, Fraction, NaN: imaginary part
+                          of the value
+    :attribute infinite: boolean, True if the value is infinite
+    :attribute derivative: RiemannSphere complex number
+
+    Evaluating a holomorphic function f, built from the RiemannSphere
+    operations (+, -, *, /, **, complex_exp, complex_log), at z + eps gives
+    f(z) + f'(z) eps. As a RiemannDual is a RiemannSphere, the special
+    functions of the SpecialFunctions module accept RiemannDual arguments.
+
+    The conjugate of a dual number is z* + z'* eps, so that the function
+    s -> f(s*)*, used for instance in the zeta function, has the expected
+    derivative. The derivative of a function which is not holomorphic
+    (for instance s -> s*) is meaningless.
+
+    Once the value is infinite, the derivative is infinite too.
+
+    >>> z = RiemannDual(1, 2, RiemannSphere(1, 0))
+    >>> z
+    1 + 2 i + (1) eps
+    >>> z * z
+    -3 + 4 i + (2 + 4 i) eps
+    """
+
+    def __init__(self, real, imaginary, derivative=RiemannSphere(0, 0),
+                 infinite=False):
+        """ Constructor of the class
+
+        :param real: represents the real part of the value
+        :param imaginary: represents the imaginary part of the value
+        :param derivative: RiemannSphere complex number, which represents
+                           the derivative
+        :param infinite: boolean, which tells us if the value is infinite
+        """
+        super().__init__(real, imaginary, infinite=infinite)
+        if self.infinite:
+            self.derivative = INFTY
+        else:
+            self.derivative = derivative
+
+    @staticmethod
+    def from_value(value, derivative):
+        """ Create a dual number from its value and its derivative
+
+        :param value: RiemannSphere complex number
+        :param derivative: RiemannSphere complex number
+        :return value: RiemannDual
+        """
+        if value.is_infinite():
+            return RiemannDual(float('NaN'), float('NaN'), infinite=True)
+        return RiemannDual(value.real, value.imaginary, derivative)
+
+    @staticmethod
+    def convert(other):
+        """ Convert an int, a float, a Fraction or a RiemannSphere complex
+        number into a dual number of null derivative
+
+        :param other: int, float, Fraction or RiemannSphere
+        :return value: RiemannDual
+
+        :raised error: TypeError when 'other' is not an int, a float,
+                       a Fraction or a RiemannSphere
+
+        >>> RiemannDual.convert(2)
+        2 + (0) eps
+        >>> RiemannDual.convert(1j)
+        Traceback (most recent call last):
+            ...
+        TypeError: Only RiemannSphere, integers, floats or Fractions can be converted into a RiemannDual
+        """
+        if isinstance(other, RiemannDual):
+            return other
+        if isinstance(other, RiemannSphere):
+            return RiemannDual.from_value(other, RiemannSphere(0, 0))
+        if isinstance(other, (int, float, Fraction)):
+            return RiemannDual(other, 0)
+        raise TypeError("Only RiemannSphere, integers, floats or Fractions " +
+                        "can be converted into a RiemannDual")
+
+    def value(self):
+        """ Return the value of the current dual number
+
+        :return value: RiemannSphere complex number
+        """
+        if self.infinite:
+            return INFTY
+        return RiemannSphere(self.real, self.imaginary)
+
+    def __repr__(self):
+        """ Transform the current dual number into a string
+
+        :Return value: String
+        """
+        if self.infinite:
+            return "oo"
+        return super().__repr__() + " + (" + str(self.derivative) + ") eps"
+
+    def __str__(self):
+        return self.__repr__()
+
+    def __hash__(self):
+        return hash((self.value(), self.derivative))
+
+    def __eq__(self, other):
+        """ Check the equality of the current dual number with an other object
+
+        :Return value: boolean
+
+        >>> RiemannDual(1, 0, RiemannSphere(1, 0)) == RiemannDual(1, 0)
+        False
+        >>> RiemannDual(1, 0) == RiemannDual(1, 0)
+        True
+        """
+        if not isinstance(other, RiemannDual):
+            return False
+        return self.value() == other.value() and \
+            self.derivative == other.derivative
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __add__(self, other):
+        other = RiemannDual.convert(other)
+        return RiemannDual.from_value(self.value() + other.value(),
+                                      self.derivative + other.derivative)
+
+    def __radd__(self, other):
+        return self.__add__(other)
+
+    def __neg__(self):
+        return RiemannDual.from_value(- self.value(), - self.derivative)
+
+    def __sub__(self, other):
+        return self.__add__(- RiemannDual.convert(other))
+
+    def __rsub__(self, other):
+        return (- self).__add__(other)
+
+    def __mul__(self, other):
+        """ Compute the product (a + a' eps) (b + b' eps) = ab + (a'b + ab') eps
+
+        :Return value: RiemannDual
+
+        >>> RiemannDual(0, 1, RiemannSphere(1, 0)) * 2
+        2 i + (2) eps
+        """
+        other = RiemannDual.convert(other)
+        value = self.value() * other.value()
+        if value.is_infinite():
+            return RiemannDual.from_value(value, INFTY)
+        derivative = self.derivative * other.value() + \
+            self.value() * other.derivative
+        return RiemannDual.from_value(value, derivative)
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def inverse(self):
+        """ Compute the inverse 1 / (a + a' eps) = 1 / a - a' / a^2 eps
+
+        :Return value: RiemannDual
+
+        >>> RiemannDual(2, 0, RiemannSphere(1, 0)).inverse()
+        0.5 + (-0.25) eps
+        """
+        value = self.value().inverse()
+        if value.is_infinite():
+            return RiemannDual.from_value(value, INFTY)
+        return RiemannDual.from_value(value, - self.derivative * value * value)
+
+    def __truediv__(self, other):
+        """ Compute the quotient of the current dual number by an other one
+
+        :raised error: ValueError when the division is by a null number
+
+        :Return value: RiemannDual
+        """
+        other = RiemannDual.convert(other)
+        if other.is_null():
+            raise ValueError("Can not compute a division " +
+                             "by a null number!")
+        return self.__mul__(other.inverse())
+
+    def __rtruediv__(self, other):
+        if self.is_null():
+            raise ValueError("Can not compute a division " +
+                             "by a null number!")
+        return RiemannDual.convert(other).__mul__(self.inverse())
+
+    def complex_exp(self):
+        """ Compute exp(a + a' eps) = exp(a) + a' exp(a) eps
+
+        :return value: RiemannDual
+
+        >>> RiemannDual(0, 0, RiemannSphere(2, 0)).complex_exp()
+        1.0 + (2.0) eps
+        """
+        value = self.value().complex_exp()
+        if value.is_infinite():
+            return RiemannDual.from_value(value, INFTY)
+        return RiemannDual.from_value(value, self.derivative * value)
+
+    def complex_log(self):
+        """ Compute log(a + a' eps) = log(a) + a' / a eps
+
+        :raised error: ValueError if the value is null
+
+        :return value: RiemannDual
+
+        >>> RiemannDual(1, 0, RiemannSphere(2, 0)).complex_log()
+        0 + (2.0) eps
+        """
+        value = self.value().complex_log()
+        if value.is_infinite():
+            return RiemannDual.from_value(value, INFTY)
+        return RiemannDual.from_value(value, self.derivative / self.value())
+
+    def conjugate(self):
+        return RiemannDual.from_value(self.value().conjugate(),
+                                      self.derivative.conjugate())
+
+
+def value_and_derivative(function, z):
+    """ Compute the value and the derivative of a holomorphic function,
+    built from RiemannSphere operations, with a single evaluation
+
+    :param function: function, which represents the function C -> C
+                     to differentiate
+    :param z: RiemannSphere complex number
+    :return value: a pair of RiemannSphere complex numbers (f(z), f'(z))
+
+    >>> value_and_derivative(lambda z: z ** 3 + 2 * z, RiemannSphere(1, 0))
+    (3, 5)
+    >>> value_and_derivative(lambda z: z.inverse(), RiemannSphere(0, 0))
+    (oo, oo)
+    >>> value_and_derivative(lambda z: RiemannSphere(1, 2), RiemannSphere(0, 0))
+    (1 + 2 i, 0)
+    """
+    if z.is_infinite():
+        dual = RiemannDual(float('NaN'), float('NaN'), infinite=True)
+    else:
+        dual = RiemannDual(z.real, z.imaginary, RiemannSphere(1, 0))
+    result = RiemannDual.convert(function(dual))
+    return result.value(), result.derivative
+
+
+if __name__ == '__main__':
+    from doctest import testmod
+    testmod()
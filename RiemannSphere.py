@@ -13,6 +13,11 @@
 # 04/04/20   Take into account pylava warnings            #
 # 17/04/20   The flag infinite becomes optionnal          #
 # 10/07/20   Allow instanciation with Fraction components #
+# 10/2026    Elementary functions are provided by the     #
+#            current backend of the NumberBackend module, #
+#            so that components can be mpmath numbers     #
+# 10/2026    The hash is consistent with the equality,    #
+#            and does not collide on anti-diagonals       #
 #                                                         #
 # Next modifications to do:                               #
 # -------------------------                               #
@@ -23,9 +28,10 @@
 ###########################################################
 
 
-from math import sqrt, atan, exp, log, cos, sin, pi
 from math import isnan, isinf
 from fractions import Fraction
+import NumberBackend
+from NumberBackend import REAL_TYPES
 
 
 """ Module which defines:
@@ -119,8 +125,8 @@ class RiemannSphere(object):
             self.imaginary = float('NaN')
             self.infinite = True
         else:
-            if not isinstance(real, (int, float, Fraction)) or \
-                    not isinstance(imaginary, (int, float, Fraction)):
+            if not isinstance(real, REAL_TYPES) or \
+                    not isinstance(imaginary, REAL_TYPES):
                 raise TypeError("Components of RiemannSphere instance are " +
                                 "integers, floats or Fractions")
             if isnan(real) or isnan(imaginary):
@@ -222,7 +228,28 @@ class RiemannSphere(object):
         return self.__repr__()
 
     def __hash__(self):
-        return int((self.real + self.imaginary) * 1000)
+        """ Compute the hash of the current RiemannSphere complex number,
+        consistent with the equality: equal complex numbers, whatever the types
+        of their components, have the same hash, and all the infinite complex
+        numbers have the same hash
+
+        :Return value: int
+
+        >>> hash(RiemannSphere(1, 2)) == hash(RiemannSphere(1.0, Fraction(2)))
+        True
+        >>> hash(RiemannSphere(1, 2)) == hash(RiemannSphere(2, 1))
+        False
+        >>> hash(RiemannSphere(0.5, -0.5)) == hash(RiemannSphere(0, 0))
+        False
+        >>> infinite = RiemannSphere(float('NaN'), float('NaN'), infinite=True)
+        >>> hash(infinite) == hash(INFTY)
+        True
+        >>> len({RiemannSphere(1, 2), RiemannSphere(1, 2), INFTY, infinite})
+        2
+        """
+        if self.is_infinite():
+            return hash(float('inf'))
+        return hash((self.real, self.imaginary))
 
     def __eq__(self, other):
         """ Check the equality of the current RiemannSphere complex number
@@ -393,7 +420,7 @@ class RiemannSphere(object):
         TypeError: Only RiemannSphere, integers or floats ... a RiemannSphere
         """
         if self.is_infinite():
-            if isinstance(other, (int, float, RiemannSphere)):
+            if isinstance(other, REAL_TYPES + (RiemannSphere,)):
                 return INFTY
             else:
                 raise TypeError("Only RiemannSphere, integers or floats " +
@@ -404,7 +431,7 @@ class RiemannSphere(object):
             else:
                 return RiemannSphere(self.real+other.real,
                                      self.imaginary+other.imaginary)
-        elif isinstance(other, (int, float)):
+        elif isinstance(other, REAL_TYPES):
             return RiemannSphere(self.real + other, self.imaginary)
         else:
             raise TypeError("Only RiemannSphere, integers or floats " +
@@ -477,7 +504,7 @@ class RiemannSphere(object):
         TypeError: Only RiemannSphere, integers or floats ... a RiemannSphere
         """
         if self.is_infinite():
-            if isinstance(other, (int, float, RiemannSphere)):
+            if isinstance(other, REAL_TYPES + (RiemannSphere,)):
                 return INFTY
             else:
                 raise TypeError("Only RiemannSphere, integers or floats " +
@@ -488,7 +515,7 @@ class RiemannSphere(object):
             else:
                 return RiemannSphere(self.real+other.real,
                                      self.imaginary+other.imaginary)
-        elif isinstance(other, (int, float)):
+        elif isinstance(other, REAL_TYPES):
             return RiemannSphere(self.real + other, self.imaginary)
         else:
             raise TypeError("Only RiemannSphere, integers or floats " +
@@ -558,7 +585,7 @@ class RiemannSphere(object):
         TypeError: Only RiemannSphere, integers or floats ... a RiemannSphere
         """
         if self.is_infinite():
-            if isinstance(other, (int, float, RiemannSphere)):
+            if isinstance(other, REAL_TYPES + (RiemannSphere,)):
                 return INFTY
             else:
                 raise TypeError("Only RiemannSphere, integers or floats " +
@@ -569,7 +596,7 @@ class RiemannSphere(object):
             else:
                 return RiemannSphere(self.real - other.real,
                                      self.imaginary - other.imaginary)
-        elif isinstance(other, (int, float)):
+        elif isinstance(other, REAL_TYPES):
             return RiemannSphere(self.real - other, self.imaginary)
         else:
             raise TypeError("Only RiemannSphere, integers or floats " +
@@ -624,7 +651,7 @@ class RiemannSphere(object):
         TypeError: Only RiemannSphere, integers or floats ... a RiemannSphere
         """
         if self.is_infinite():
-            if isinstance(other, (int, float, RiemannSphere)):
+            if isinstance(other, REAL_TYPES + (RiemannSphere,)):
                 return INFTY
             else:
                 raise TypeError("Only RiemannSphere, integers or floats " +
@@ -635,7 +662,7 @@ class RiemannSphere(object):
             else:
                 return RiemannSphere(other.real - self.real,
                                      other.imaginary - self.imaginary)
-        elif isinstance(other, (int, float)):
+        elif isinstance(other, REAL_TYPES):
             return RiemannSphere(other - self.real, - self.imaginary)
         else:
             raise TypeError("Only RiemannSphere, integers or floats " +
@@ -736,7 +763,7 @@ class RiemannSphere(object):
         ValueError: oo x 0 is not defined!
         """
         if self.is_infinite():
-            if not isinstance(other, (int, float, RiemannSphere)):
+            if not isinstance(other, REAL_TYPES + (RiemannSphere,)):
                 raise TypeError("Only RiemannSphere, integers or floats " +
                                 "can be multiplied by a RiemannSphere")
             if (isinstance(other, RiemannSphere) and other.is_null()) \
@@ -755,7 +782,7 @@ class RiemannSphere(object):
             real = self.real * other.real - self.imaginary * other.imaginary
             imag = self.real * other.imaginary + self.imaginary * other.real
             return RiemannSphere(real, imag)
-        elif isinstance(other, (int, float)):
+        elif isinstance(other, REAL_TYPES):
             return RiemannSphere(self.real * other,
                                  self.imaginary * other)
         else:
@@ -857,7 +884,7 @@ class RiemannSphere(object):
         ValueError: oo x 0 is not defined!
         """
         if self.is_infinite():
-            if not isinstance(other, (int, float, RiemannSphere)):
+            if not isinstance(other, REAL_TYPES + (RiemannSphere,)):
                 raise TypeError("Only RiemannSphere, integers or floats " +
                                 "can be multiplied by a RiemannSphere")
             if (isinstance(other, RiemannSphere) and other.is_null()) \
@@ -876,7 +903,7 @@ class RiemannSphere(object):
             real = self.real * other.real - self.imaginary * other.imaginary
             imag = self.real * other.imaginary + self.imaginary * other.real
             return RiemannSphere(real, imag)
-        elif isinstance(other, (int, float)):
+        elif isinstance(other, REAL_TYPES):
             return RiemannSphere(self.real * other,
                                  self.imaginary * other)
         else:
@@ -992,7 +1019,7 @@ class RiemannSphere(object):
                                  "by a null number!")
             else:
                 return self * other.inverse()
-        elif isinstance(other, (int, float, Fraction)):
+        elif isinstance(other, REAL_TYPES):
             if other == 0:
                 raise ValueError("Can not compute a division " +
                                  "by a null number!")
@@ -1044,7 +1071,7 @@ class RiemannSphere(object):
                                  "by a null number!")
             else:
                 return other * self.inverse()
-        elif isinstance(other, (int, float, Fraction)):
+        elif isinstance(other, REAL_TYPES):
             if self.is_null():
                 raise ValueError("Can not compute a division " +
                                  "by a null number!")
@@ -1088,6 +1115,7 @@ class RiemannSphere(object):
         oo
         >>> epsilon = 10e-8
         >>> z = RiemannSphere(1, 1).complex_exp()
+        >>> from math import exp, cos, sin
         >>> th = RiemannSphere(exp(1) * cos(1), exp(1) * sin(1))
         >>> abs((z - th)) <= epsilon
         True
@@ -1098,11 +1126,13 @@ class RiemannSphere(object):
         if r == 0:
             return RiemannSphere(1., 0.)
         theta = self.argument()
-        is_Inf = r * cos(theta) >= 709.1  # e^x == Inf if x >= 709.1
+        backend = NumberBackend.BACKEND
+        is_Inf = r * backend.cos(theta) >= 709.1  # e^x == Inf if x >= 709.1
         if self.is_infinite() or is_Inf:
             return INFTY
-        tmp = RiemannSphere(cos(r * sin(theta)), sin(r * sin(theta)))
-        return exp(r * cos(theta)) * tmp
+        tmp = RiemannSphere(backend.cos(r * backend.sin(theta)),
+                            backend.sin(r * backend.sin(theta)))
+        return backend.exp(r * backend.cos(theta)) * tmp
 
     def complex_log(self):
         """ Compute the principal branch of the complex logarithm
@@ -1122,6 +1152,7 @@ class RiemannSphere(object):
         oo
         >>> epsilon = 10e-8
         >>> z = RiemannSphere(1, 1).complex_log()
+        >>> from math import sqrt, atan, log
         >>> th = RiemannSphere(log(sqrt(2)), atan(1))
         >>> abs(z - th) <= epsilon
         True
@@ -1132,7 +1163,7 @@ class RiemannSphere(object):
             return INFTY
         r = abs(self)
         theta = self.argument()
-        return RiemannSphere(log(r), theta)
+        return RiemannSphere(NumberBackend.BACKEND.log(r), theta)
 
     def __pow__(self, other):
         """ Compute the exponentiation of the current RiemannSphere
@@ -1177,6 +1208,7 @@ class RiemannSphere(object):
         oo
         >>> INFTY ** RiemannSphere(1, 2)
         oo
+        >>> from math import sqrt, exp, pi
         >>> z = RiemannSphere(1 / 2, sqrt(3) / 2) ** 2.
         >>> th = RiemannSphere(-1 / 2, sqrt(3) / 2)
         >>> abs(z - th) <= 10e-8
@@ -1195,7 +1227,7 @@ class RiemannSphere(object):
             return p
         if self.is_null():
             raise ValueError("z ** alpha is not defined for z == 0")
-        if isinstance(other, float):
+        if isinstance(other, REAL_TYPES):
             if self.is_infinite():
                 if other == 0:
                     raise ValueError("0 x oo is not defined!")
@@ -1237,6 +1269,7 @@ class RiemannSphere(object):
             ...
         ValueError: z ** alpha is not defined for z == 0
         >>> z = 2 ** RiemannSphere(0, 1)
+        >>> from math import exp, log, cos, sin
         >>> result = RiemannSphere(cos(log(2)), sin(log(2)))
         >>> abs(z - result) <= 10e-8
         True
@@ -1247,7 +1280,7 @@ class RiemannSphere(object):
         """
         if other == 0:
             raise ValueError("z ** alpha is not defined for z == 0")
-        return (self * log(other)).complex_exp()
+        return (self * NumberBackend.BACKEND.log(other)).complex_exp()
 
     def __lshift__(selfself, other):
         raise NotImplementedError
@@ -1323,6 +1356,7 @@ class RiemannSphere(object):
         >>> e = RiemannSphere(2, -1)
         >>> abs(a)
         0.0
+        >>> from math import sqrt
         >>> abs(abs(b) - sqrt(5)) <= epsilon
         True
         >>> abs(abs(c) - sqrt(5)) <= epsilon
@@ -1337,7 +1371,7 @@ class RiemannSphere(object):
         if self.is_infinite():
             return float('Inf')
         else:
-            return sqrt(self.real**2 + self.imaginary**2)
+            return NumberBackend.BACKEND.sqrt(self.real**2 + self.imaginary**2)
 
     def __abs_square__(self):
         """ Compute the module of the current complex number, ie the distance
@@ -1353,6 +1387,7 @@ class RiemannSphere(object):
         >>> e = RiemannSphere(2, -1)
         >>> abs(a)
         0.0
+        >>> from math import sqrt
         >>> abs(abs(b) - sqrt(5)) <= epsilon
         True
         >>> abs(abs(c) - sqrt(5)) <= epsilon
@@ -1402,6 +1437,7 @@ class RiemannSphere(object):
             ...
         ValueError: The infinite complex number has no argument...
 
+        >>> from math import atan, pi
         >>> abs(b.argument() - atan(2)) <= epsilon
         True
         >>> abs(c.argument() - (pi - atan(1/2))) <= epsilon
@@ -1419,17 +1455,18 @@ class RiemannSphere(object):
             raise ValueError('The infinite complex number has no argument...')
         if self.is_null():
             raise ValueError('The zero complex number has no argument...')
+        backend = NumberBackend.BACKEND
         if self.real > 0:
-            return atan(self.imaginary / self.real)
+            return backend.atan(self.imaginary / self.real)
         elif self.real < 0:
             if self.imaginary >= 0:
-                return pi + atan(self.imaginary / self.real)
+                return backend.pi + backend.atan(self.imaginary / self.real)
             else:
-                return -pi + atan(self.imaginary / self.real)
+                return -backend.pi + backend.atan(self.imaginary / self.real)
         elif self.imaginary > 0:
-            return pi / 2
+            return backend.pi / 2
         elif self.imaginary < 0:
-            return - pi / 2
+            return - backend.pi / 2
 
     def conjugate(self):
         """ Compute the conjugaison of the current RiemannSphere
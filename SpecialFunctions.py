@@ -10,7 +10,11 @@
 # Modifications:                                         #
 # --------------                                         #
 #                                                        #
-# .                                                      #
+# 10/2026    complex_sqrt only uses RiemannSphere        #
+#            methods, so that it applies on RiemannBall  #
+#            and RiemannDual numbers                     #
+# 10/2026    gamma and zeta use the constant pi of the   #
+#            current backend of the NumberBackend module #
 #                                                        #
 # Next modifications to do:                              #
 # -------------------------                              #
@@ -20,10 +24,12 @@
 ##########################################################
 
 
-from math import ceil, isinf
+from math import ceil
 from math import pi
-from math import sqrt, atan, log, exp, cos, sin
+from math import atan, log, exp
 from RiemannSphere import RiemannSphere, INFTY
+import NumberBackend
+from NumberBackend import REAL_TYPES
 
 """ Module which defines some of the classical special functions :
 * the identity map
@@ -48,8 +54,14 @@ def id(z):
     return z
 
 
+# Bound of the components of the complex numbers whose square root is
+# computed after a scaling, because their modulus underflows
+SQRT_SCALING_LIMIT = 2.0 ** -500
+
+
 def complex_sqrt(z):
-    """ Compute the principal branch of the square root map
+    """ Compute the principal branch of the square root map, as
+    exp(log(z) / 2), so that it only relies on RiemannSphere operations
 
     :param z: RiemannSphere complex number
     :return value: RiemannSphere complex number
@@ -60,17 +72,24 @@ def complex_sqrt(z):
     oo
     >>> epsilon = 10e-8
     >>> z = complex_sqrt(RiemannSphere(1, 1))
+    >>> from math import sqrt
     >>> th = RiemannSphere(sqrt(2 + sqrt(2)), sqrt(2 - sqrt(2)))
     >>> abs(z - sqrt(sqrt(2)) / 2 * th) <= epsilon
     True
+    >>> abs(complex_sqrt(RiemannSphere(1e-300, 0)) - 1e-150) < 1e-160
+    True
+    >>> abs(complex_sqrt(RiemannSphere(0, 1e-320)) -
+    ...     RiemannSphere(7.07e-161, 7.07e-161)) < 1e-163
+    True
     """
-    r = abs(z)
-    if isinf(r):
-        return INFTY
-    if r == 0:
-        return RiemannSphere(0, 0)
-    theta = z.argument()
-    return sqrt(r) * RiemannSphere(cos(theta / 2), sin(theta / 2))
+    if z.is_infinite() or z.is_null():
+        return z
+    if abs(z.real) < SQRT_SCALING_LIMIT and \
+            abs(z.imaginary) < SQRT_SCALING_LIMIT:
+        # The modulus of z underflows: the square root is computed for
+        # z * 2 ** 600, whose modulus does not
+        return complex_sqrt(z * 2.0 ** 600) / 2.0 ** 300
+    return (z.complex_log() / 2).complex_exp()
 
 
 def complex_cos(z):
@@ -85,6 +104,7 @@ def complex_cos(z):
     oo
     >>> epsilon = 10e-8
     >>> z = complex_cos(RiemannSphere(1, 1))
+    >>> from math import cos, sin
     >>> abs(z.real - (exp(1) + exp(-1)) / 2 * cos(1)) <= epsilon
     True
     >>> abs(z.imaginary + (exp(1) - exp(-1)) / 2 * sin(1)) <= epsilon
@@ -110,6 +130,7 @@ def complex_sin(z):
     oo
     >>> epsilon = 10e-8
     >>> z = complex_sin(RiemannSphere(1, 1))
+    >>> from math import cos, sin
     >>> abs(z.real - (exp(1) + exp(-1)) / 2 * sin(1)) <= epsilon
     True
     >>> abs(z.imaginary - (exp(1) - exp(-1)) / 2 * cos(1)) <= epsilon
@@ -164,6 +185,7 @@ def gamma(z, N=10):
     True
     >>> abs(gamma(4) - 6) <= epsilon
     True
+    >>> from math import sqrt
     >>> abs(gamma(1/2) - sqrt(4 * atan(1))) <= 10e-8
     True
     >>> result = gamma(-1)
@@ -188,8 +210,9 @@ def gamma(z, N=10):
     >>> abs(gamma(z) * gamma(1 - z) - pi / complex_sin(pi * z)) <= epsilon
     True
     """
-    if isinstance(z, (int, float)):
+    if isinstance(z, REAL_TYPES):
         z = RiemannSphere(z, 0)
+    pi = NumberBackend.BACKEND.pi
     g = [1, 1/12, 1/288, -139/51840, -571/2488320, 163879/209018880,
          5246819/75246796800]
     if z.real >= 1/2:
@@ -487,8 +510,9 @@ def zeta(s, d=10):
     True
     """
     N = 10  # translation used in gamma computation
-    if isinstance(s, (int, float)):
+    if isinstance(s, REAL_TYPES):
         s = RiemannSphere(s, 0)
+    pi = NumberBackend.BACKEND.pi
     t = s.imaginary
     if s.real < 1/2:
         deux_puiss_s = 2 ** s
@@ -501,7 +525,9 @@ def zeta(s, d=10):
                    * gamma_un_moins_s * zeta_un_moins_s
         except ValueError as excpt:
             if s.is_null():
-                return RiemannSphere(-1/2, 0)
+                # zeta(0) = -1/2 and zeta'(0) = -log(2 pi) / 2, written as
+                # a first order expansion to also handle RiemannDual numbers
+                return -1/2 - s * (log(2 * pi) / 2)
             print("WARNING : s = ", s, " : ", excpt, " => Mis a 0")
             return RiemannSphere(0, 0)
     if t < 0:
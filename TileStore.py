@@ -0,0 +1,362 @@
+###########################################################
+# Module to save the values of a function by tiles of     #
+# the lattice of a resolution, as compressed BLOBs of     #
+# a SQLite database                                       #
+#                                                         #
+# Author: Olivier Bouillot                                #
+# Email: olivier.bouillot@u-pem.fr                        #
+# Creation Date: october 2026                             #
+#                                                         #
+# Modifications:                                          #
+# --------------                                          #
+#                                                         #
+# 10/2026    The tiles are saved in a cache of            #
+#            the CacheBackends module                     #
+# 10/2026    The tiles are merged in transactions         #
+# 10/2026    The cost of the computation of the tiles is  #
+#            estimated                                    #
+# 10/2026    The tiles are read apart from their decoding #
+#                                                         #
+# Next modifications to do:                               #
+# -------------------------                               #
+#                                                         #
+#   * Save the grids which are not aligned on             #
+#     the lattice of their resolution                     #
+#                                                         #
+###########################################################
+
+
+import zlib
+from fractions import Fraction
+from time import time
+import numpy as np
+from Vectorized import as_complex
+
+
+""" Module which defines the tiled layout of the saved values.
+
+For a resolution r, the points x + i y such that r x and r y are integers
+form a lattice, whose point x + i y has the lattice coordinates (r x, r y).
+The lattice is cut into tiles of TILE_SIZE x TILE_SIZE points: the point of
+lattice coordinates (X, Y) is the point (X % TILE_SIZE, Y % TILE_SIZE) of
+the tile (X // TILE_SIZE, Y // TILE_SIZE).
+
+A tile can be saved in a cache of the CacheBackends module, for instance
+in a row of the ValueTile table of a SQLite database (see the Database
+module), whose key is (function id, resolution, tile x, tile y):
+* its values are a TILE_SIZE x TILE_SIZE array of complex128 numbers,
+  compressed by zlib. The infinite value is represented by an infinite real
+  part, and the values which have not been computed by NaN, as in
+  the Vectorized module.
+* its presence bitmap, packed in TILE_SIZE x TILE_SIZE / 8 bytes, indicates
+  the values which have been computed.
+* its provenance is the block of its values (see the Database module):
+  a tile is merged with the saved tile only if the latter has at least
+  the same precision, and replaces it otherwise.
+* the date of its last access and the estimated cost in seconds of
+  the computation of its values, which are used to evict the tiles of
+  a cache whose size exceeds its budget.
+
+Recovering the values of a window then needs a few BLOB reads, decoded
+by np.frombuffer, instead of a row per value. Only the grids aligned on
+the lattice of their resolution, i.e. whose left below corner has lattice
+coordinates, can be saved by tiles.
+
+This module defines:
+* the TILE_SIZE constant.
+* the is_aligned function.
+* the encode_tile and decode_tile functions.
+* the read_tiles and recover_tiles functions, which read the tiles of
+  a window in the ValueTile table, encoded or decoded.
+* the TileWriter class, which gathers the values to save by tiles in
+  a cache of the CacheBackends module.
+"""
+
+
+# Number of lattice points of a side of a tile
+TILE_SIZE = 64
+
+# Level of compression of zlib, from 0 (none) to 9 (best)
+COMPRESS_LEVEL = 6
+
+# Number of complete tiles written at once by a TileWriter
+TILES_PER_TRANSACTION = 16
+
+# Type of the values of a tile, whose byte order does not depend
+# on the computer
+TILE_DTYPE = np.dtype('<c16')
+
+SELECT_TILES = '''SELECT tile_x, tile_y, presence, data
+                  FROM ValueTile JOIN Provenance
+                    ON Provenance.id = ValueTile.provenance
+                  WHERE function = ? AND resolution = ?
+                    AND tile_x BETWEEN ? AND ?
+                    AND tile_y BETWEEN ? AND ?
+                    AND precision >= ?'''
+
+SELECT_TILE = '''SELECT presence, data, precision
+                 FROM ValueTile JOIN Provenance
+                   ON Provenance.id = ValueTile.provenance
+                 WHERE function = ? AND resolution = ?
+                   AND tile_x = ? AND tile_y = ?'''
+
+INSERT_TILE = '''INSERT OR REPLACE
+                 INTO ValueTile(function, resolution, tile_x, tile_y,
+                                provenance, presence, data, accessed, cost)
+                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'''
+
+TOUCH_TILE = '''UPDATE ValueTile SET accessed = ?
+                WHERE function = ? AND resolution = ?
+                  AND tile_x = ? AND tile_y = ?'''
+
+
+def is_aligned(x, y, resolution):
+    """ Check if the point x + i y has lattice coordinates for
+    a resolution
+
+    :param x: Fraction or int
+    :param y: Fraction or int
+    :param resolution: int
+    :return value: boolean
+
+    >>> is_aligned(Fraction(1, 2), 3, 10)
+    True
+    >>> is_aligned(Fraction(1, 3), 3, 10)
+    False
+    """
+    return (Fraction(x) * resolution).denominator == 1 and \
+        (Fraction(y) * resolution).denominator == 1
+
+
+def empty_tile():
+    """ Create a tile without any value
+
+    :return value: pair (values, presence) of TILE_SIZE x TILE_SIZE arrays,
+                   of complex numbers and of booleans
+    """
+    return (np.full((TILE_SIZE, TILE_SIZE), np.nan, dtype=TILE_DTYPE),
+            np.zeros((TILE_SIZE, TILE_SIZE), dtype=bool))
+
+
+def encode_tile(values, presence, compress_level=COMPRESS_LEVEL):
+    """ Encode a tile into BLOBs
+
+    :param values: TILE_SIZE x TILE_SIZE array of complex numbers
+    :param presence: TILE_SIZE x TILE_SIZE array of booleans
+    :param compress_level: int, the level of compression of zlib
+    :return value: pair of bytes (presence, data)
+
+    >>> values, presence = empty_tile()
+    >>> values[1, 2], presence[1, 2] = 1 + 2j, True
+    >>> blobs = encode_tile(values, presence)
+    >>> len(blobs[0]), len(blobs[1]) < 1000
+    (512, True)
+    >>> decoded_values, decoded_presence = decode_tile(*blobs)
+    >>> complex(decoded_values[1, 2]), int(decoded_presence.sum())
+    ((1+2j), 1)
+    """
+    data = np.ascontiguousarray(values, dtype=TILE_DTYPE).tobytes()
+    return (np.packbits(presence).tobytes(),
+            zlib.compress(data, compress_level))
+
+
+def decode_tile(presence, data):
+    """ Decode the BLOBs of a tile
+
+    :param presence: bytes, the packed presence bitmap
+    :param data: bytes, the compressed values
+    :return value: pair (values, presence) of TILE_SIZE x TILE_SIZE arrays,
+                   of complex numbers and of booleans ; the values are
+                   read-only
+    """
+    values = np.frombuffer(zlib.decompress(data), dtype=TILE_DTYPE)
+    bits = np.unpackbits(np.frombuffer(presence, dtype=np.uint8))
+    return (values.reshape((TILE_SIZE, TILE_SIZE)),
+            bits.astype(bool).reshape((TILE_SIZE, TILE_SIZE)))
+
+
+def read_tiles(cursor, function_id, resolution, x_range, y_range,
+               precision):
+    """ Read the encoded tiles of a function intersecting the window of
+    the lattice [X_min, X_max] x [Y_min, Y_max], whose values have been
+    computed with at least a precision. Nothing is written in the database.
+
+    :param cursor: Cursor object, connected to a sqlite3 database whose
+                   tables have been created
+    :param function_id: int, the id of the function identity
+    :param resolution: int
+    :param x_range: pair of int (X_min, X_max)
+    :param y_range: pair of int (Y_min, Y_max)
+    :param precision: int, the minimal precision in bits of the values
+    :return value: list of quadruplets (tile_x, tile_y, presence, data) where
+                   presence and data are the BLOBs of the tiles
+    """
+    cursor.execute(SELECT_TILES, (function_id, resolution,
+                                  x_range[0] // TILE_SIZE,
+                                  x_range[1] // TILE_SIZE,
+                                  y_range[0] // TILE_SIZE,
+                                  y_range[1] // TILE_SIZE, precision))
+    return cursor.fetchall()
+
+
+def recover_tiles(cursor, function_id, resolution, x_range, y_range,
+                  precision):
+    """ Read and decode the tiles of a function intersecting the window of
+    the lattice [X_min, X_max] x [Y_min, Y_max], whose values have been
+    computed with at least a precision (see the read_tiles function)
+
+    :return value: generator of quadruplets (tile_x, tile_y, values, presence)
+    """
+    for (tile_x, tile_y, presence, data) in \
+            read_tiles(cursor, function_id, resolution, x_range, y_range,
+                       precision):
+        yield (tile_x, tile_y) + decode_tile(presence, data)
+
+
+class TileWriter(object):
+    """ Class that gathers by tiles the values to save in a cache (see
+    the CacheBackends module). The complete tiles are saved
+    TILES_PER_TRANSACTION at a time, and the others when the writer is
+    closed ; close has to be called, even if the computations are
+    interrupted. A tile is merged with the saved tile if the latter has at
+    least the same precision, and replaces it otherwise.
+
+    The cost of a tile is estimated from the rate at which the writer
+    receives the values, which are computed in the meantime: the cost of
+    a value is the duration since the creation of the writer, without
+    the durations of the transactions, divided by the number of values
+    received.
+
+    :attribute cache: TileCache
+    :attribute identity: String, the identity of the function
+    :attribute resolution: int
+    :attribute precision: int, the precision in bits of the values
+    :attribute algorithm: String, the algorithm used to compute the values
+    :attribute tiles: dictionnary whose keys are the coordinates of the tiles
+                      and whose values are the pairs (values, presence) of
+                      the tiles not yet saved
+    :attribute complete: list of the coordinates of the complete tiles
+                         not yet saved
+    :attribute nb_of_saved_values: int
+    :attribute nb_of_saved_tiles: int
+    :attribute nb_of_added_values: int
+    :attribute start: float, the date of the creation of the writer
+    :attribute flush_durations: list of float, the durations in seconds
+                                of the transactions
+
+    >>> from CacheBackends import MemoryCache
+    >>> from RiemannSphere import RiemannSphere, INFTY
+    >>> cache = MemoryCache()
+    >>> writer = TileWriter(cache, "f", 10, 53, "float")
+    >>> for X in range(-10, 100):
+    ...     writer.add(X, 5, RiemannSphere(X, 0))
+    >>> writer.add(0, 6, INFTY)
+    >>> writer.close()
+    >>> writer.nb_of_saved_values, writer.nb_of_saved_tiles
+    (111, 3)
+    >>> tiles = list(cache.get_tiles("f", 10, (0, 10), (0, 10), 53))
+    >>> [(x, y, int(presence.sum())) for (x, y, values, presence) in tiles]
+    [(0, 0, 65)]
+    >>> complex(tiles[0][2][3, 5]), complex(tiles[0][2][0, 6])
+    ((3+0j), (inf+0j))
+    """
+
+    def __init__(self, cache, identity, resolution, precision, algorithm):
+        """ Constructor of the class
+
+        :param cache: TileCache
+        :param identity: String, the identity of the function
+        :param resolution: int
+        :param precision: int, the precision in bits of the values
+        :param algorithm: String, the algorithm used to compute the values
+        """
+        self.cache = cache
+        self.identity = identity
+        self.resolution = resolution
+        self.precision = precision
+        self.algorithm = algorithm
+        self.tiles = {}
+        self.complete = []
+        self.nb_of_saved_values = 0
+        self.nb_of_saved_tiles = 0
+        self.nb_of_added_values = 0
+        self.start = time()
+        self.flush_durations = []
+
+    def add(self, X, Y, value):
+        """ Gather the value at the point of lattice coordinates (X, Y)
+
+        :param X: int
+        :param Y: int
+        :param value: RiemannSphere complex number
+        """
+        key = (X // TILE_SIZE, Y // TILE_SIZE)
+        if key not in self.tiles:
+            self.tiles[key] = empty_tile()
+        values, presence = self.tiles[key]
+        a, b = X % TILE_SIZE, Y % TILE_SIZE
+        if not presence[a, b]:
+            presence[a, b] = True
+            self.nb_of_added_values += 1
+            if presence.all():
+                self.complete.append(key)
+        values[a, b] = as_complex(value)
+        if len(self.complete) >= TILES_PER_TRANSACTION:
+            self.flush(self.complete)
+            self.complete = []
+
+    def flush(self, keys):
+        """ Save some tiles in a single transaction of the cache, merged with
+        the saved tiles of at least the same precision: the tiles saved in
+        the meantime by an other process are not lost
+
+        :param keys: list of the coordinates of the tiles
+        """
+        t_0 = time()
+        cost = self.cost_of_a_value()
+        with self.cache.transaction():
+            for key in keys:
+                values, presence = self.tiles[key]
+                saved = self.cache.get_tile(self.identity, self.resolution,
+                                            key[0], key[1], self.precision)
+                if saved is not None:
+                    values = np.where(presence, values, saved[0])
+                    presence = presence | saved[1]
+                self.cache.put_tile(self.identity, self.resolution, key[0],
+                                    key[1], values, presence, self.precision,
+                                    self.algorithm,
+                                    cost=cost * int(presence.sum()))
+        for key in keys:
+            self.nb_of_saved_values += int(self.tiles.pop(key)[1].sum())
+            self.nb_of_saved_tiles += 1
+        self.flush_durations.append(time() - t_0)
+
+    def cost_of_a_value(self):
+        """ Estimate the cost of the computation of a value
+
+        :return value: float, in seconds
+        """
+        duration = time() - self.start - sum(self.flush_durations)
+        return max(duration, 0) / max(self.nb_of_added_values, 1)
+
+    def close(self):
+        """ Save the tiles not yet saved """
+        if self.tiles:
+            self.flush(list(self.tiles))
+        self.complete = []
+
+    def metrics(self):
+        """ Describe the activity of the writer
+
+        :return value: String
+        """
+        total = sum(self.flush_durations)
+        return (str(self.nb_of_saved_values) + " values saved in " +
+                str(self.nb_of_saved_tiles) + " tiles, in " +
+                str(len(self.flush_durations)) + " transactions of " +
+                str(int(total * 1000) / 1000) + "s. ")
+
+
+if __name__ == '__main__':
+    from doctest import testmod
+    testmod()
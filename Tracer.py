@@ -0,0 +1,404 @@
+###########################################################
+# Module to trace a function built from Riemann Sphere    #
+# complex number operations, and to compile it into       #
+# a NumPy kernel evaluating it on a whole grid at once    #
+#                                                         #
+# Author: Olivier Bouillot                                #
+# Email: olivier.bouillot@u-pem.fr                        #
+# Creation Date: october 2026                             #
+#                                                         #
+# Modifications:                                          #
+# --------------                                          #
+#                                                         #
+# 10/2026    The logarithm does not depend on the sign of #
+#            a null imaginary part                        #
+#                                                         #
+# Next modifications to do:                               #
+# -------------------------                               #
+#                                                         #
+#   * Compile complex_sqrt, gamma and zeta, which branch  #
+#     on the values of their argument                     #
+#                                                         #
+###########################################################
+
+
+import numpy as np
+from RiemannSphere import RiemannSphere
+import NumberBackend
+from NumberBackend import REAL_TYPES
+
+
+""" Module which defines:
+* the TracingError exception, raised when a traced function needs the value
+  of its argument, for instance to branch on it.
+* the TracedRiemannSphere class, a symbolic RiemannSphere complex number
+  which records the operations performed on it.
+* the CompiledFunction class, a NumPy kernel obtained from a trace.
+* the trace function, which traces a function and compiles it, or returns
+  None when the function can not be traced.
+"""
+
+
+class TracingError(Exception):
+    """ Exception raised when a traced function needs the value of
+    a TracedRiemannSphere complex number
+    """
+    pass
+
+
+# Values of exp are infinite for a real part at least EXP_LIMIT,
+# as for the RiemannSphere complex_exp method
+EXP_LIMIT = 709.1
+
+
+def _exp(z):
+    """ Exponential of an array, whose values are NaN where
+    the RiemannSphere complex_exp method returns an infinite number
+    """
+    with np.errstate(all='ignore'):
+        result = np.exp(z)
+    return np.where(np.real(z) >= EXP_LIMIT, np.nan, result)
+
+
+def _log(z):
+    """ Principal logarithm of an array, whose values are NaN at 0. As for
+    the RiemannSphere complex_log method, the imaginary part of the logarithm
+    of a negative real number is pi, whatever the sign of its null
+    imaginary part
+
+    >>> def f(z):
+    ...     return (- z).complex_log() + (z * z).complex_log().conjugate()
+    >>> z = np.array([-2 + 0j, 3 + 0j, complex(-1, -0.0)])
+    >>> compiled = trace(f)(z)
+    >>> expected = [f(RiemannSphere(w.real, w.imag)) for w in z]
+    >>> all(abs(complex(w.real, w.imaginary) - v) < 1e-12
+    ...     for (w, v) in zip(expected, compiled))
+    True
+    """
+    # NumPy follows the sign of a null imaginary part on the branch cut
+    z = np.where(np.imag(z) == 0, np.real(z) + 0j, z)
+    with np.errstate(all='ignore'):
+        result = np.log(z)
+    return np.where(z == 0, np.nan, result)
+
+
+def _inverse(z):
+    """ Inverse of an array, whose values are NaN at 0 """
+    with np.errstate(all='ignore'):
+        result = 1 / z
+    return np.where(z == 0, np.nan, result)
+
+
+def _divide(z, w):
+    """ Quotient of two arrays, whose values are NaN where w is 0 """
+    with np.errstate(all='ignore'):
+        result = z / w
+    return np.where(w == 0, np.nan, result)
+
+
+# Python expressions of the operations, given the names of their arguments
+OPERATIONS = {'add': "{} + {}",
+              'sub': "{} - {}",
+              'mul': "{} * {}",
+              'div': "_divide({}, {})",
+              'neg': "- {}",
+              'inverse': "_inverse({})",
+              'exp': "_exp({})",
+              'log': "_log({})",
+              'conjugate': "np.conj({})"}
+
+
+class Trace(object):
+    """ Class that records the expression graph of a traced function:
+    a list of instructions, each one being the application of an operation
+    to previous instructions, to the variable, or to constants.
+
+    :attribute instructions: list of pairs (operation, arguments), where
+                             arguments is a tuple of names
+    :attribute names: dictionnary whose keys are the pairs (operation,
+                      arguments) already recorded and whose values are
+                      the names of their results ; it realises the common
+                      subexpression elimination
+    :attribute constants: dictionnary whose keys are the names of
+                          the constants and whose values are the constants
+    """
+
+    def __init__(self):
+        self.instructions = []
+        self.names = {}
+        self.constants = {}
+
+    def constant(self, value):
+        """ Record a constant
+
+        :param value: int, float, Fraction or RiemannSphere complex number
+        :return value: the name of the constant
+
+        :raised error: * TracingError when the constant is infinite
+                       * TypeError when the constant is not a number
+        """
+        if isinstance(value, RiemannSphere):
+            if value.is_infinite():
+                raise TracingError("Infinite constants are not compiled")
+            value = complex(float(value.real), float(value.imaginary))
+        elif isinstance(value, REAL_TYPES):
+            value = float(value)
+        else:
+            raise TypeError("Only RiemannSphere, integers, floats or " +
+                            "Fractions can be combined with a RiemannSphere")
+        key = ('constant', (type(value), value))
+        if key not in self.names:
+            name = "c" + str(len(self.constants))
+            self.constants[name] = value
+            self.names[key] = name
+        return self.names[key]
+
+    def record(self, operation, *arguments):
+        """ Record an operation, unless it has already been recorded
+
+        :param operation: string, a key of OPERATIONS
+        :param arguments: names of the arguments of the operation
+        :return value: TracedRiemannSphere, the result of the operation
+        """
+        key = (operation, arguments)
+        if key not in self.names:
+            self.names[key] = "t" + str(len(self.instructions))
+            self.instructions.append(key)
+        return TracedRiemannSphere(self, self.names[key])
+
+    def name_of(self, value):
+        """ Return the name of a traced number or of a constant
+
+        :param value: TracedRiemannSphere, RiemannSphere, int, float, Fraction
+        :return value: string
+        """
+        if isinstance(value, TracedRiemannSphere):
+            if value.trace is not self:
+                raise TracingError("Numbers of two different traces " +
+                                   "can not be combined")
+            return value.name
+        return self.constant(value)
+
+    def compile(self, result):
+        """ Compile the recorded instructions into a NumPy kernel
+
+        :param result: the value returned by the traced function
+        :return value: CompiledFunction
+        """
+        result_name = self.name_of(result)
+        lines = ["def kernel(z):"]
+        for (k, (operation, arguments)) in enumerate(self.instructions):
+            expression = OPERATIONS[operation].format(*arguments)
+            lines.append("    t" + str(k) + " = " + expression)
+        lines.append("    return np.array(np.broadcast_to(" + result_name +
+                     " + 0j, np.shape(z)))")
+        source = "\n".join(lines) + "\n"
+        namespace = {'np': np, '_exp': _exp, '_log': _log,
+                     '_inverse': _inverse, '_divide': _divide}
+        namespace.update(self.constants)
+        exec(compile(source, "<traced function>", "exec"), namespace)
+        return CompiledFunction(namespace['kernel'], source)
+
+
+class TracedRiemannSphere(RiemannSphere):
+    """ Class that modelizes a symbolic RiemannSphere complex number: every
+    operation performed on it is recorded in a Trace instead of
+    being computed.
+
+    :attribute trace: Trace, where the operations are recorded
+    :attribute name: string, the name of the number in the trace
+
+    The components of a TracedRiemannSphere are unknown: reading them,
+    comparing the number, or testing if it is null or infinite raises
+    a TracingError. So are all the RiemannSphere methods not redefined
+    here, as they read the components.
+
+    >>> trace = Trace()
+    >>> z = TracedRiemannSphere(trace, "z")
+    >>> w = (z * z + 1) / (z * z - 1)
+    >>> trace.instructions
+    [('mul', ('z', 'z')), ('add', ('t0', 'c0')), ('sub', ('t0', 'c0')), ('div', ('t1', 't2'))]
+    >>> try:
+    ...     z.real >= 0
+    ... except TracingError as error:
+    ...     print(error)
+    The components of a traced number are unknown
+    """
+
+    def __init__(self, trace, name):
+        """ Constructor of the class
+
+        :param trace: Trace, where the operations are recorded
+        :param name: string, the name of the number in the trace
+        """
+        self.trace = trace
+        self.name = name
+
+    def __unknown(self):
+        raise TracingError("The components of a traced number are unknown")
+
+    real = property(lambda self: self.__unknown())
+    imaginary = property(lambda self: self.__unknown())
+    infinite = property(lambda self: self.__unknown())
+
+    def __repr__(self):
+        return "<traced " + self.name + ">"
+
+    def __str__(self):
+        return self.__repr__()
+
+    def __hash__(self):
+        return hash((id(self.trace), self.name))
+
+    def __eq__(self, other):
+        raise TracingError("A traced number can not be compared")
+
+    def __ne__(self, other):
+        raise TracingError("A traced number can not be compared")
+
+    def __bool__(self):
+        raise TracingError("A traced number can not be compared")
+
+    def __binary(self, operation, left, right):
+        return self.trace.record(operation, self.trace.name_of(left),
+                                 self.trace.name_of(right))
+
+    def __add__(self, other):
+        return self.__binary('add', self, other)
+
+    def __radd__(self, other):
+        return self.__binary('add', other, self)
+
+    def __sub__(self, other):
+        return self.__binary('sub', self, other)
+
+    def __rsub__(self, other):
+        return self.__binary('sub', other, self)
+
+    def __mul__(self, other):
+        return self.__binary('mul', self, other)
+
+    def __rmul__(self, other):
+        return self.__binary('mul', other, self)
+
+    def __truediv__(self, other):
+        return self.__binary('div', self, other)
+
+    def __rtruediv__(self, other):
+        return self.__binary('div', other, self)
+
+    def __neg__(self):
+        return self.trace.record('neg', self.name)
+
+    def inverse(self):
+        return self.trace.record('inverse', self.name)
+
+    def complex_exp(self):
+        return self.trace.record('exp', self.name)
+
+    def complex_log(self):
+        return self.trace.record('log', self.name)
+
+    def conjugate(self):
+        return self.trace.record('conjugate', self.name)
+
+    def __pow__(self, other):
+        """ Record z ** other, as the RiemannSphere __pow__ method computes it
+
+        >>> trace = Trace()
+        >>> z = TracedRiemannSphere(trace, "z")
+        >>> w = z ** 3
+        >>> len(trace.instructions)
+        3
+        """
+        if isinstance(other, int):
+            p = RiemannSphere(1, 0)
+            for i in range(other):
+                p = p * self
+            return p
+        if isinstance(other, REAL_TYPES + (RiemannSphere,)):
+            return (other * self.complex_log()).complex_exp()
+        raise ValueError("A power of a RiemannSphere number has " +
+                         "to be an integer, a float or a RiemannSphere" +
+                         " complex number")
+
+    def __rpow__(self, other):
+        """ Record other ** z, as the RiemannSphere __pow__ and __rpow__
+        methods compute it: log(other) is a constant of the trace
+        """
+        if isinstance(other, RiemannSphere):
+            return (self * other.complex_log()).complex_exp()
+        if isinstance(other, REAL_TYPES):
+            if other == 0:
+                raise ValueError("z ** alpha is not defined for z == 0")
+            return (self * NumberBackend.BACKEND.log(other)).complex_exp()
+        raise TypeError("Only RiemannSphere, integers, floats or " +
+                        "Fractions can be raised to a RiemannSphere power")
+
+
+class CompiledFunction(object):
+    """ Class that modelizes a NumPy kernel compiled from a traced function
+
+    :attribute kernel: function, which maps an array of complex numbers to
+                       the array of the values of the traced function ;
+                       a value is NaN or infinite where the kernel did not
+                       compute it as the RiemannSphere operations would do
+                       (null divisor, logarithm of 0, overflow...), and
+                       the traced function has to be evaluated there
+    :attribute source: string, the Python source of the kernel
+    """
+
+    def __init__(self, kernel, source):
+        self.kernel = kernel
+        self.source = source
+
+    def __call__(self, z):
+        """ Evaluate the kernel
+
+        :param z: numpy array of complex numbers
+        :return value: numpy array of complex numbers, of the same shape
+        """
+        return self.kernel(np.asarray(z, dtype=complex))
+
+
+# Exceptions which show that a function can not be traced
+TRACING_ERRORS = (TracingError, TypeError, ValueError, AttributeError,
+                  ZeroDivisionError, OverflowError)
+
+
+def trace(function):
+    """ Trace a function built from RiemannSphere operations, and compile it
+    into a NumPy kernel
+
+    :param function: function, which represents the function C -> C
+    :return value: CompiledFunction, or None if the function can not be
+                   traced, for instance because it branches on the values
+                   of its argument
+
+    >>> from SpecialFunctions import complex_cos, gamma
+    >>> def f(z):
+    ...     return (z * z + 1) / (z * z - 1) + complex_cos(z)
+    >>> kernel = trace(f)
+    >>> z = np.array([0.5 + 1j, 2 - 1j])
+    >>> th = [f(RiemannSphere(u.real, u.imag)) for u in z]
+    >>> all(abs(complex(w.real, w.imaginary) - u) < 1e-12
+    ...     for (w, u) in zip(th, kernel(z)))
+    True
+    >>> np.isfinite(kernel(np.array([1 + 0j])))
+    array([False])
+    >>> trace(gamma) is None
+    True
+    >>> trace(lambda z: RiemannSphere(1, 2))(np.zeros(2))
+    array([1.+2.j, 1.+2.j])
+    """
+    recording = Trace()
+    try:
+        result = function(TracedRiemannSphere(recording, "z"))
+        return recording.compile(result)
+    except TRACING_ERRORS:
+        return None
+
+
+if __name__ == '__main__':
+    from doctest import testmod
+    testmod()
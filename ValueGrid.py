@@ -0,0 +1,189 @@
+###########################################################
+# Module to keep the values of the pixels of a phase      #
+# portrait in a NumPy array, possibly memory-mapped in    #
+# a file for the portraits larger than the memory         #
+#                                                         #
+# Author: Olivier Bouillot                                #
+# Email: olivier.bouillot@u-pem.fr                        #
+# Creation Date: october 2026                             #
+#                                                         #
+# Modifications:                                          #
+# --------------                                          #
+#                                                         #
+#                                                         #
+# Next modifications to do:                               #
+# -------------------------                               #
+#                                                         #
+#   * Keep the values of the multiprecision backends      #
+#     with their precision                                #
+#                                                         #
+###########################################################
+
+
+import numpy as np
+from RiemannSphere import INFTY, RiemannSphere
+from Vectorized import as_complex
+
+
+""" Module which defines the ValueGrid class, a grid of the values of
+the pixels of a phase portrait kept in a NumPy array of complex128 numbers
+instead of a dictionnary of RiemannSphere complex numbers (see
+the PhasePortrait module). As in the TileStore module, the infinite value is
+represented by an infinite real part, and the pixels which have no value by
+NaN.
+
+The array can be memory-mapped in a .npy file (see numpy.lib.format), so that
+the values of a portrait of several gigapixels are written to the disk while
+they are computed, and read back by strips of STRIP_SIZE columns: the memory
+used by the values does not depend on the size of the portrait. The image
+drawn from them is kept in memory, unless it is saved by strips (see
+the save_by_strips method of the PhasePortrait class). Such a file can be
+opened again with the open class method.
+"""
+
+
+# Number of columns of the strips of a grid
+STRIP_SIZE = 256
+
+
+class ValueGrid(object):
+    """ Class of a grid of values, which can be used as the dictionnary whose
+    keys are the pixels (i, j) and whose values are RiemannSphere complex
+    numbers. The values of the multiprecision backends are converted into
+    floats.
+
+    :attribute size: pair of int, the numbers of columns and rows
+    :attribute path: String, the path of the .npy file where the array is
+                     memory-mapped, or None if the array is in memory
+    :attribute array: NumPy array, or memory-map, of shape size, whose
+                      element [i, j] is the value of the pixel (i, j)
+
+    >>> grid = ValueGrid((3, 2))
+    >>> grid[0, 1] = RiemannSphere(1, 2)
+    >>> grid[2, 0] = INFTY
+    >>> grid[0, 1], grid[2, 0], (1, 1) in grid, len(grid)
+    (1.0 + 2.0 i, oo, False, 2)
+    >>> sorted(grid.keys())
+    [(0, 1), (2, 0)]
+    >>> grid[1, 1]
+    Traceback (most recent call last):
+        ...
+    KeyError: (1, 1)
+
+    Grid memory-mapped in a file:
+
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), "grid.npy")
+    >>> grid = ValueGrid((1000, 500), path)
+    >>> grid.array[:, :250] = 2j
+    >>> grid.close()
+    >>> grid = ValueGrid.open(path)
+    >>> grid.size, len(grid), grid[999, 249]
+    ((1000, 500), 250000, 2.0 i)
+    >>> [(i, strip.shape) for (i, strip) in grid.strips()][-1]
+    (768, (232, 500))
+    """
+
+    def __init__(self, size, path=None, array=None):
+        """ Constructor of the class: a grid without any value
+
+        :param size: pair of int, the numbers of columns and rows
+        :param path: String, the path of the .npy file where the array is
+                     memory-mapped, which is created, or None
+        :param array: NumPy array, or memory-map, of shape size, which is
+                      used as it is, or None
+        """
+        self.size = tuple(size)
+        self.path = path
+        if array is not None:
+            self.array = array
+        elif path is None:
+            self.array = np.full(self.size, complex('nan+nanj'))
+        else:
+            self.array = np.lib.format.open_memmap(path, mode="w+",
+                                                   dtype=complex,
+                                                   shape=self.size)
+            for (i, strip) in self.strips():
+                strip[...] = complex('nan+nanj')
+
+    @classmethod
+    def open(cls, path):
+        """ Open a grid memory-mapped in a .npy file
+
+        :param path: String
+        :return value: ValueGrid
+        """
+        array = np.lib.format.open_memmap(path, mode="r+")
+        return cls(array.shape, path, array)
+
+    def strips(self, size=STRIP_SIZE):
+        """ Cut the grid into strips of columns
+
+        :param size: int, the number of columns of a strip
+        :return value: generator of pairs (i, strip), where strip is the view
+                       of the array from the column i
+        """
+        for i in range(0, self.size[0], size):
+            yield (i, self.array[i:i + size])
+
+    def presence(self, strip):
+        """ Give the pixels of a strip which have a value
+
+        :param strip: NumPy array
+        :return value: NumPy array of booleans
+        """
+        return ~np.isnan(strip)
+
+    def __getitem__(self, pixel):
+        value = complex(self.array[pixel])
+        if value.real != value.real or value.imag != value.imag:
+            raise KeyError(pixel)
+        if value.real in (float('inf'), float('-inf')):
+            return INFTY
+        return RiemannSphere(value.real, value.imag)
+
+    def __setitem__(self, pixel, value):
+        self.array[pixel] = as_complex(value)
+
+    def __contains__(self, pixel):
+        return not np.isnan(self.array[pixel])
+
+    def get(self, pixel, default=None):
+        try:
+            return self[pixel]
+        except KeyError:
+            return default
+
+    def __len__(self):
+        return sum(int(np.count_nonzero(self.presence(strip)))
+                   for (i, strip) in self.strips())
+
+    def keys(self):
+        for (i, strip) in self.strips():
+            rows, columns = np.nonzero(self.presence(strip))
+            for (a, b) in zip(rows.tolist(), columns.tolist()):
+                yield (i + a, b)
+
+    def __iter__(self):
+        return self.keys()
+
+    def items(self):
+        for pixel in self.keys():
+            yield (pixel, self[pixel])
+
+    def flush(self):
+        """ Write the values of a memory-mapped grid in its file """
+        if isinstance(self.array, np.memmap):
+            self.array.flush()
+
+    def close(self):
+        """ Write the values of a memory-mapped grid in its file, and unmap
+        it: the grid can not be used anymore
+        """
+        self.flush()
+        self.array = None
+
+
+if __name__ == '__main__':
+    from doctest import testmod
+    testmod()
@@ -0,0 +1,402 @@
+###########################################################
+# Module to keep in memory the values of the functions    #
+# computed in the process, shared by all the phase        #
+# portraits                                               #
+#                                                         #
+# Author: Olivier Bouillot                                #
+# Email: olivier.bouillot@u-pem.fr                        #
+# Creation Date: october 2026                             #
+#                                                         #
+# Modifications:                                          #
+# --------------                                          #
+#                                                         #
+# 10/2026    Values are kept by dyadic levels, and shared #
+#            by the resolutions r * 2 ** k                #
+# 10/2026    Values are keyed on the function object too  #
+#                                                         #
+# Next modifications to do:                               #
+# -------------------------                               #
+#                                                         #
+#   * Measure the size of the values instead of           #
+#     estimating it                                       #
+#                                                         #
+###########################################################
+
+
+import weakref
+from collections import OrderedDict, Counter
+from threading import Lock
+
+
+""" Module which defines:
+* the ValueMemo class, a least recently used memo of the values of
+  the functions, within a memory budget.
+* a constant SHARED_MEMO, the memo shared by all the phase portraits of
+  the process which use it (see the PhasePortrait module), and so by
+  the graphical interfaces of the PhasePortraitWidget module: panning
+  a window, or computing it again, only evaluates the function at the new
+  points.
+
+A value is identified by the identity of the function (see
+the FunctionIdentity module) and the function object itself (see
+the function_key method), the resolution of the grid, and the coordinates
+X, Y of its point X / resolution + i Y / resolution in the lattice of
+the resolution, which are integers when the corner of the grid is a point of
+the lattice. The identity does not take into account the global variables
+used by a function: keying the values on the function object too, two
+functions with the same identity never share their values, and the values of
+a function are forgotten when it is garbage collected. The memo has to be
+cleared, or the function given a new version, when a global variable it uses
+changes. A value is kept with its precision, and only recovered for
+a precision at most its own.
+
+The lattice of the resolution r is a subset of the lattice of the resolution
+2 r: the values are kept in a dyadic hierarchy (see the dyadic_key function),
+where a point belongs to the level of the coarsest resolution r / 2 ** k of
+its lattice. The values known at a resolution are thus recovered at
+the resolutions r * 2 ** k, and zooming in by a factor 2 only evaluates
+the function at the three quarters of the points which are new. The values
+of a window of a lattice are recovered, from all the levels, by the get_window
+method.
+"""
+
+
+# Default memory budget of a memo, in bytes
+MEMO_BYTES = 256 * 2 ** 20
+
+# Estimated size in bytes of a value kept in a memo: its key, the
+# RiemannSphere complex number and the entry of the OrderedDict
+VALUE_BYTES = 400
+
+
+class ValueMemo(object):
+    """ Least recently used memo of the values of functions, in memory. Its
+    methods can be called by several threads.
+
+    :attribute max_bytes: int, the memory budget in bytes
+    :attribute values: OrderedDict whose keys are (identity, m, k, X_k, Y_k)
+                       (see the dyadic_key function) and whose values are
+                       (value, precision), from the least to the most
+                       recently used
+    :attribute levels: dictionnary whose keys are (identity, m) and whose
+                       values are Counter objects, giving the number of values
+                       of each level k
+    :attribute functions: dictionnary whose keys are the id of
+                          the functions whose values are kept, and whose
+                          values are the functions which can not be weakly
+                          referenced, or None
+    :attribute keys_of_functions: dictionnary whose keys are the id of
+                                  the functions, and whose values are the sets
+                                  of the keys of their values
+    :attribute forgotten: list of the id of the functions which have been
+                          garbage collected, whose values have to be
+                          forgotten
+    :attribute nb_of_hits: int, the number of values found
+    :attribute nb_of_misses: int, the number of values not found
+    :attribute nb_of_puts: int, the number of values kept
+    :attribute nb_of_evictions: int, the number of values evicted
+
+    >>> memo = ValueMemo(max_bytes=3 * VALUE_BYTES)
+    >>> memo.put("f", 10, [((x, 0), x) for x in range(4)], 53)
+    >>> sorted(memo.get("f", 10, [(0, 0), (1, 0), (3, 0)], 53).items())
+    [((1, 0), 1), ((3, 0), 3)]
+    >>> memo.get("f", 10, [(1, 0)], 64)
+    {}
+    >>> memo.get("f", 20, [(1, 0)], 53)
+    {}
+    >>> memo.put("f", 10, [((1, 0), -1)], 24)
+    >>> memo.get("f", 10, [(1, 0)], 53)
+    {(1, 0): 1}
+    >>> statistics = memo.stats()
+    >>> statistics['hits'], statistics['misses'], statistics['evictions']
+    (3, 3, 1)
+    >>> statistics['hit_ratio'], statistics['values']
+    (0.5, 3)
+    >>> memo.resize(VALUE_BYTES)
+    >>> len(memo), memo.get("f", 10, [(1, 0)], 53)
+    (1, {(1, 0): 1})
+
+    Values recovered at the resolutions r * 2 ** k:
+
+    >>> memo = ValueMemo()
+    >>> memo.put("f", 2, [((x, y), x + 10 * y)
+    ...                   for x in range(3) for y in range(3)], 53)
+    >>> memo.put("f", 4, [((x, 1), -x) for x in range(5)], 53)
+    >>> sorted(memo.get_window("f", 8, (4, 8), (0, 4), 53).items())
+    [((4, 0), 1), ((4, 2), -2), ((4, 4), 11), ((6, 2), -3), ((8, 0), 2), \
+((8, 2), -4), ((8, 4), 12)]
+    >>> memo.get("f", 1, [(1, 1)], 53)
+    {(1, 1): 22}
+    """
+
+    def __init__(self, max_bytes=MEMO_BYTES):
+        """ Constructor of the class
+
+        :param max_bytes: int, the memory budget in bytes
+        """
+        self.max_bytes = max_bytes
+        self.values = OrderedDict()
+        self.levels = {}
+        self.functions = {}
+        self.keys_of_functions = {}
+        self.forgotten = []
+        self.lock = Lock()
+        self.nb_of_hits = 0
+        self.nb_of_misses = 0
+        self.nb_of_puts = 0
+        self.nb_of_evictions = 0
+
+    def __len__(self):
+        with self.lock:
+            self.purge()
+            return len(self.values)
+
+    def function_key(self, function, identity):
+        """ Compute the key under which the values of a function are kept:
+        its identity and the id of the function object. As long as values
+        may be kept under this key, the id is not reused: the values of
+        the function are forgotten when it is garbage collected, and
+        the functions which can not be weakly referenced are kept alive
+
+        :param function: function
+        :param identity: String, the identity of the function
+        :return value: pair (identity, id of the function)
+
+        >>> from functools import partial
+        >>> memo = ValueMemo()
+        >>> def power(z, n):
+        ...     return z ** n
+        >>> square, cube = partial(power, n=2), partial(power, n=3)
+        >>> memo.put(memo.function_key(square, "power"), 1, [((1, 1), 4)], 53)
+        >>> memo.get(memo.function_key(cube, "power"), 1, [(1, 1)], 53)
+        {}
+        >>> memo.get(memo.function_key(square, "power"), 1, [(1, 1)], 53)
+        {(1, 1): 4}
+        >>> del square
+        >>> len(memo), memo.functions == {id(cube): None}
+        (0, True)
+        """
+        key = id(function)
+        with self.lock:
+            # The values of a collected function whose id is reused are
+            # forgotten first
+            self.purge()
+            if key not in self.functions:
+                try:
+                    weakref.finalize(function, self.forgotten.append, key)
+                    self.functions[key] = None
+                except TypeError:
+                    self.functions[key] = function
+        return (identity, key)
+
+    def purge(self):
+        """ Forget the values of the functions which have been garbage
+        collected ; the lock has to be held. The garbage collector only
+        records their id in the forgotten list, without taking the lock:
+        it may collect a function while the lock is held by the same thread
+        """
+        while self.forgotten:
+            key = self.forgotten.pop()
+            self.functions.pop(key, None)
+            for value_key in self.keys_of_functions.pop(key, ()):
+                del self.values[value_key]
+                self.levels.pop(value_key[:2], None)
+
+    def get(self, identity, resolution, coordinates, precision):
+        """ Recover values of a function
+
+        :param identity: the identity of the function, or its key (see
+                         the function_key method)
+        :param resolution: the resolution of the grid
+        :param coordinates: iterable of pairs (X, Y), the coordinates of
+                            the points in the lattice of the resolution
+        :param precision: int, the precision in bits of the values
+        :return value: dictionnary whose keys are the coordinates of
+                       the points whose values have been found with at least
+                       the precision, and whose values are these values
+        """
+        found = {}
+        with self.lock:
+            self.purge()
+            for (X, Y) in coordinates:
+                key = (identity,) + dyadic_key(resolution, X, Y)
+                entry = self.values.get(key)
+                if entry is None or entry[1] < precision:
+                    self.nb_of_misses += 1
+                    continue
+                self.values.move_to_end(key)
+                found[X, Y] = entry[0]
+            self.nb_of_hits += len(found)
+        return found
+
+    def get_window(self, identity, resolution, x_range, y_range, precision):
+        """ Recover the values of a function in a window of a lattice, from
+        all the levels of the hierarchy
+
+        :param identity: the identity of the function, or its key (see
+                         the function_key method)
+        :param resolution: int, the resolution of the lattice
+        :param x_range: pair of int (X_0, X_1), the range of the coordinates
+                        X in the lattice of the points of the window
+        :param y_range: pair of int (Y_0, Y_1), the range of the coordinates
+                        Y
+        :param precision: int, the precision in bits of the values
+        :return value: dictionnary whose keys are the coordinates (X, Y) of
+                       the points whose values have been found with at least
+                       the precision, and whose values are these values
+        """
+        m, level = dyadic_level(resolution)
+        (X_0, X_1), (Y_0, Y_1) = x_range, y_range
+        found = {}
+        with self.lock:
+            self.purge()
+            levels = self.levels.get((identity, m), {})
+            for k in [k for k in levels if k <= level]:
+                # The point (X_k, Y_k) of the level k is the point
+                # (X_k * scale, Y_k * scale) of the lattice
+                scale = 1 << (level - k)
+                for X_k in range(-(-X_0 // scale), X_1 // scale + 1):
+                    for Y_k in range(-(-Y_0 // scale), Y_1 // scale + 1):
+                        key = (identity, m, k, X_k, Y_k)
+                        entry = self.values.get(key)
+                        if entry is None or entry[1] < precision:
+                            continue
+                        self.values.move_to_end(key)
+                        found[X_k * scale, Y_k * scale] = entry[0]
+            self.nb_of_hits += len(found)
+            self.nb_of_misses += ((X_1 - X_0 + 1) * (Y_1 - Y_0 + 1) -
+                                  len(found))
+        return found
+
+    def put(self, identity, resolution, values, precision):
+        """ Keep values of a function, which only replace the values kept with
+        at most the same precision. The least recently used values are then
+        evicted until the memo is within its budget
+
+        :param identity: the identity of the function, or its key (see
+                         the function_key method)
+        :param resolution: the resolution of the grid
+        :param values: iterable of pairs ((X, Y), value), where X, Y are
+                       the coordinates of a point in the lattice of
+                       the resolution
+        :param precision: int, the precision in bits of the values
+        """
+        with self.lock:
+            self.purge()
+            for ((X, Y), value) in values:
+                key = (identity,) + dyadic_key(resolution, X, Y)
+                entry = self.values.get(key)
+                if entry is not None and entry[1] > precision:
+                    continue
+                if entry is None:
+                    self.levels.setdefault(key[:2], Counter())[key[2]] += 1
+                    if isinstance(identity, tuple):
+                        self.keys_of_functions.setdefault(identity[1], set()) \
+                            .add(key)
+                self.values[key] = (value, precision)
+                self.values.move_to_end(key)
+                self.nb_of_puts += 1
+            self.evict()
+
+    def evict(self):
+        """ Evict the least recently used values until the memo is within its
+        budget ; the lock has to be held
+        """
+        max_values = max(self.max_bytes // VALUE_BYTES, 0)
+        while len(self.values) > max_values:
+            key, _ = self.values.popitem(last=False)
+            levels = self.levels[key[:2]]
+            levels[key[2]] -= 1
+            if not levels[key[2]]:
+                del levels[key[2]]
+            if isinstance(key[0], tuple):
+                keys = self.keys_of_functions[key[0][1]]
+                keys.discard(key)
+                if not keys:
+                    del self.keys_of_functions[key[0][1]]
+            self.nb_of_evictions += 1
+
+    def resize(self, max_bytes):
+        """ Change the memory budget of the memo
+
+        :param max_bytes: int, the memory budget in bytes
+        """
+        with self.lock:
+            self.purge()
+            self.max_bytes = max_bytes
+            self.evict()
+
+    def clear(self):
+        """ Forget all the values """
+        with self.lock:
+            self.purge()
+            self.values.clear()
+            self.levels.clear()
+            self.keys_of_functions.clear()
+
+    def size(self):
+        """ Estimate the memory used by the values
+
+        :return value: int, in bytes
+        """
+        return len(self.values) * VALUE_BYTES
+
+    def stats(self):
+        """ Describe the activity of the memo
+
+        :return value: dictionnary
+        """
+        nb_of_lookups = self.nb_of_hits + self.nb_of_misses
+        return {'hits': self.nb_of_hits, 'misses': self.nb_of_misses,
+                'hit_ratio': self.nb_of_hits / max(nb_of_lookups, 1),
+                'puts': self.nb_of_puts, 'evictions': self.nb_of_evictions,
+                'values': len(self.values), 'bytes': self.size(),
+                'max_bytes': self.max_bytes}
+
+
+def dyadic_level(resolution):
+    """ Decompose a resolution in its odd part and its dyadic level
+
+    :param resolution: int, or Fraction
+    :return value: pair (m, k) such that resolution = m * 2 ** k, where m
+                   is odd ; k is 0 if the resolution is not an integer
+
+    >>> dyadic_level(12), dyadic_level(7)
+    ((3, 2), (7, 0))
+    """
+    if not isinstance(resolution, int) or resolution == 0:
+        return (resolution, 0)
+    k = (resolution & -resolution).bit_length() - 1
+    return (resolution >> k, k)
+
+
+def dyadic_key(resolution, X, Y):
+    """ Compute the key of a point in the dyadic hierarchy of the lattices:
+    the point X / resolution + i Y / resolution belongs to the level k of
+    the coarsest lattice m * 2 ** k, for resolution = m * 2 ** l, of which it
+    is a point
+
+    :param resolution: int, or Fraction
+    :param X: int, or Fraction
+    :param Y: int, or Fraction
+    :return value: quadruplet (m, k, X_k, Y_k), where X_k, Y_k are
+                   the coordinates of the point in the lattice m * 2 ** k
+
+    >>> dyadic_key(8, 4, 6), dyadic_key(4, 2, 3), dyadic_key(8, 0, 0)
+    ((1, 2, 2, 3), (1, 2, 2, 3), (1, 0, 0, 0))
+    """
+    m, k = dyadic_level(resolution)
+    if isinstance(X, int) and isinstance(Y, int) and k:
+        shift = min(k, ((X | Y) & -(X | Y)).bit_length() - 1
+                    if X | Y else k)
+        return (m, k - shift, X >> shift, Y >> shift)
+    return (m, k, X, Y)
+
+
+# Memo shared by the phase portraits of the process
+SHARED_MEMO = ValueMemo()
+
+
+if __name__ == '__main__':
+    from doctest import testmod
+    testmod()
@@ -0,0 +1,201 @@
+###########################################################
+# Module to define the protocol of the functions which    #
+# accept whole NumPy arrays of complex numbers, so that   #
+# a phase portrait evaluates them on a whole grid at once #
+#                                                         #
+# Author: Olivier Bouillot                                #
+# Email: olivier.bouillot@u-pem.fr                        #
+# Creation Date: october 2026                             #
+#                                                         #
+# Modifications:                                          #
+# --------------                                          #
+#                                                         #
+#                                                         #
+# Next modifications to do:                               #
+# -------------------------                               #
+#                                                         #
+#                                                         #
+###########################################################
+
+
+import numpy as np
+from math import isinf, isnan
+from RiemannSphere import RiemannSphere, INFTY
+
+
+""" Module which defines the protocol of vectorized functions, i.e. functions
+which map a NumPy array of complex numbers to the NumPy array of their values.
+In these arrays, a number with an infinite component represents the infinite
+RiemannSphere complex number, and a number with a NaN component represents
+a value which has not been computed.
+
+This module defines:
+* the vectorized decorator, which marks a function as vectorized.
+* the is_vectorized function, which checks the mark.
+* the probe function, which checks if an unmarked function accepts arrays.
+* the as_complex and as_riemann_sphere functions, which convert numbers
+  between the two representations.
+* the partial_function function, which fixes one of the two variables of
+  a function of two variables, and keeps the mark.
+"""
+
+
+def vectorized(function):
+    """ Decorator which marks a function as vectorized
+
+    :param function: function, which maps a NumPy array of complex numbers to
+                     the NumPy array of its values
+    :return value: the same function
+
+    >>> @vectorized
+    ... def f(z):
+    ...     return np.exp(z)
+    >>> is_vectorized(f)
+    True
+    """
+    function.vectorized = True
+    return function
+
+
+def is_vectorized(function):
+    """ Check if a function is marked as vectorized
+
+    :param function: function
+    :return value: boolean
+
+    >>> is_vectorized(lambda z: z)
+    False
+    """
+    return getattr(function, 'vectorized', False) is True
+
+
+def as_complex(z):
+    """ Convert a RiemannSphere complex number into a Python complex number
+
+    :param z: RiemannSphere complex number
+    :return value: complex
+
+    >>> as_complex(RiemannSphere(1, 2))
+    (1+2j)
+    >>> as_complex(INFTY)
+    (inf+0j)
+    """
+    if z.is_infinite():
+        return complex(float('Inf'), 0)
+    return complex(float(z.real), float(z.imaginary))
+
+
+def as_riemann_sphere(w):
+    """ Convert a complex number into a RiemannSphere complex number
+
+    :param w: complex
+    :return value: RiemannSphere complex number, or None if w has
+                   a NaN component
+
+    >>> as_riemann_sphere(1 + 2j)
+    1.0 + 2.0 i
+    >>> as_riemann_sphere(complex(float('Inf'), float('NaN')))
+    oo
+    >>> as_riemann_sphere(complex(float('NaN'), 0)) is None
+    True
+    """
+    w = complex(w)
+    if isinf(w.real) or isinf(w.imag):
+        return INFTY
+    if isnan(w.real) or isnan(w.imag):
+        return None
+    return RiemannSphere(w.real, w.imag)
+
+
+# Exceptions which show that a function does not accept arrays
+PROBING_ERRORS = (TypeError, ValueError, AttributeError, ZeroDivisionError,
+                  OverflowError, IndexError)
+
+
+def probe(function, sample, tolerance=1e-9):
+    """ Check if a function, which is not marked as vectorized, accepts
+    NumPy arrays of complex numbers: it has to return an array of the same
+    shape, whose values coincide with the values of the function on
+    RiemannSphere complex numbers.
+
+    :param function: function, which represents the function C -> C
+    :param sample: list of complex numbers, where the function is tested
+    :param tolerance: float, the allowed relative difference between
+                      the values on arrays and on RiemannSphere complex numbers
+    :return value: boolean
+
+    >>> sample = [0.5 + 1j, -1 + 2j]
+    >>> probe(lambda z: z * z + 1, sample)
+    True
+    >>> probe(lambda z: z.complex_exp(), sample)
+    False
+    >>> probe(lambda z: z.conjugate() ** 2, sample)
+    True
+    >>> probe(lambda z: abs(z), sample)
+    True
+    >>> probe(lambda z: [z], sample)
+    False
+    """
+    array = np.array(sample, dtype=complex)
+    try:
+        with np.errstate(all='ignore'):
+            images = function(array)
+        images = np.asarray(images)
+        if images.shape != array.shape or \
+                not np.issubdtype(images.dtype, np.number):
+            return False
+    except PROBING_ERRORS:
+        return False
+    for (z, image) in zip(array.tolist(), images.tolist()):
+        try:
+            value = function(RiemannSphere(z.real, z.imag))
+        except PROBING_ERRORS:
+            continue
+        if isinstance(value, RiemannSphere):
+            value = as_complex(value)
+        elif not isinstance(value, (int, float, complex)):
+            return False
+        if np.isfinite(value) and np.isfinite(image):
+            if abs(value - image) > tolerance * max(1, abs(value)):
+                return False
+        elif np.isinf(value) != np.isinf(image):
+            return False
+    return True
+
+
+def partial_function(function, fixed, position):
+    """ Fix one of the two variables of a function of two variables. If the
+    function is vectorized, so is the partial function: the fixed variable
+    is then given as a complex number
+
+    :param function: function, which represents the function C x C -> C
+    :param fixed: RiemannSphere complex number, the value of the fixed variable
+    :param position: 0 or 1, the position of the fixed variable
+    :return value: function, which represents the function C -> C
+
+    >>> f = partial_function(lambda z, w: z - w, RiemannSphere(1, 0), 0)
+    >>> f(RiemannSphere(0, 1))
+    1 - 1 i
+    >>> g = partial_function(vectorized(lambda z, w: z - w),
+    ...                      RiemannSphere(1, 0), 1)
+    >>> is_vectorized(g)
+    True
+    >>> g(np.array([1j]))
+    array([-1.+1.j])
+    """
+    if is_vectorized(function):
+        fixed = as_complex(fixed)
+    if position == 0:
+        def partial(z):
+            return function(fixed, z)
+    else:
+        def partial(z):
+            return function(z, fixed)
+    if is_vectorized(function):
+        partial = vectorized(partial)
+    return partial
+
+
+if __name__ == '__main__':
+    from doctest import testmod
+    testmod()